@@ -4,49 +4,49 @@ Simple example using the tile structure creation task.
 
 from __future__ import print_function
 import os
-import time
 
 import neat
-import gym
 from gym_multi_robot import visualize
+from gym_multi_robot.batch_network import BatchNetwork
+from gym_multi_robot.envs import VectorTilingPatternEnv
+from gym_multi_robot.genome_evaluator import GenomeEvaluator
 from gym_multi_robot.object_serializer import ObjectSerializer
 
 num_steps = 3000
 num_robots = 5
 num_trials = 5
 num_generations = 100
+num_workers = None     # The number of worker processes, defaults to the number of cpus.
 
-env = gym.make('tiling-pattern-v0')
 
+def create_env():
+    """ Creates the environment of a worker, every trial runs in its own world and all trials are stepped at once."""
+    return VectorTilingPatternEnv(num_trials, num_robots=num_robots)
+
+
+def eval_genome(genome, config, env):
+    net = BatchNetwork.create(genome, config)
+    return run_environment(net, env)
 
-def eval_genomes(genomes, config):
-    count = 0
-    for genome_id, genome in genomes:
-        count += 1
-        net = neat.nn.FeedForwardNetwork.create(genome, config)
-        start_time = time.time()
-        genome.fitness = run_environment(net)
-        # sub rewards.
-        end_time = time.time()
-        avg_time = end_time - start_time
 
-        print("%d : avg_runtime: %s seconds ---" %(count, avg_time / num_trials))
+evaluator = GenomeEvaluator(create_env, eval_genome, num_workers=num_workers)
 
 
-def run_environment(net):
-    reward = 0
+def eval_genomes(genomes, config):
+    evaluator.evaluate(genomes, config)
+
+    for count, (genome_id, genome) in enumerate(genomes, 1):
+        print("%d : avg_runtime: %s seconds ---" % (count, evaluator.timings[genome_id] / num_trials))
 
-    for _ in range(num_trials):
-        observation = env.reset()
 
-        for i in range(num_steps):
-            output = [net.activate(observation[i]) for i in range(len(observation))]
-            observation, _, _, _ = env.step(output)
+def run_environment(net, env):
+    observations = env.reset()
 
-        sub_reward = env.get_fitness()
-        reward += sub_reward
+    for i in range(num_steps):
+        # All robots of all worlds are activated at once.
+        observations, _, _, _ = env.step(net.activate(observations))
 
-    return reward / num_trials
+    return float(env.get_fitness().mean())
 
 
 def run(config_file):
@@ -4,40 +4,44 @@ Simple example using the tile structure creation task.
 
 from __future__ import print_function
 import os
-import time
 
 import neat
 import gym
 from gym_multi_robot import visualize
+from gym_multi_robot.batch_network import BatchNetwork
+from gym_multi_robot.genome_evaluator import GenomeEvaluator
 from gym_multi_robot.object_serializer import ObjectSerializer
 
 num_steps = 3000
 num_robots = 5
 num_generations = 100
+num_workers = None     # The number of worker processes, defaults to the number of cpus.
 
-env = gym.make('tiling-pattern7x5-static-v0')
+
+def create_env():
+    return gym.make('tiling-pattern7x5-static-v0')
+
+
+def eval_genome(genome, config, env):
+    net = BatchNetwork.create(genome, config)
+    return run_environment(net, env)
+
+
+evaluator = GenomeEvaluator(create_env, eval_genome, num_workers=num_workers)
 
 
 def eval_genomes(genomes, config):
-    count = 0
-    for genome_id, genome in genomes:
-        count += 1
-        net = neat.nn.FeedForwardNetwork.create(genome, config)
-        start_time = time.time()
-        genome.fitness = run_environment(net)
-        # sub rewards.
-        end_time = time.time()
-        avg_time = end_time - start_time
+    evaluator.evaluate(genomes, config)
 
-        print("%d : avg_runtime: %s seconds ---" %(count, avg_time))
+    for count, (genome_id, genome) in enumerate(genomes, 1):
+        print("%d : avg_runtime: %s seconds ---" % (count, evaluator.timings[genome_id]))
 
 
-def run_environment(net):
+def run_environment(net, env):
     observation = env.reset()
 
     for i in range(num_steps):
-        output = [net.activate(observation[i]) for i in range(len(observation))]
-        observation, _, _, _ = env.step(output)
+        observation, _, _, _ = env.step(net.activate(observation))
 
     reward = env.get_fitness()
 
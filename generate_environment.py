@@ -1,23 +1,8 @@
-# This file generates and stores a grid generated.
-from gym_multi_robot.envs.foraging_game import ForagingGame
-
-from gym_multi_robot.envs.tiling_pattern_game import TilingPatternGame
+# This file generates and stores a bank of seeded random scenarios, for example:
+#   python generate_environment.py foraging50x50_bank.json --game foraging --size 50 50 --tiles 1000 \
+#       --target-area 0 0 2 2 --robots 5 --count 1000
+# See gym_multi_robot.generate_scenarios for all options.
+from gym_multi_robot.generate_scenarios import main
 
 if __name__ == '__main__':
-
-    x_dim = 11
-    y_dim = 11
-    output_file = 'foraging50x50.pickle'
-
-    game = ForagingGame((50, 50), 1000, (0, 0, 2, 2))
-    game.reset()
-
-    print('Initial fitness:' + str(game.get_fitness()))
-    print(game.num_tiles)
-    print(game.grid)
-    print(game.target_area)
-
-    game.write(output_file)
-
-
-
+    main()
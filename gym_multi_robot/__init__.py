@@ -16,32 +16,32 @@ register(
 register(
     id='tiling-pattern7x5-static-v0',
     entry_point='gym_multi_robot.envs:TilingPatternEnv',
-    kwargs={'env_storage_path': 'tiles7x5.pickle'}
+    kwargs={'env_storage_path': 'tiles7x5.json'}
 )
 
 register(
     id='tiling-pattern11x11-static-v0',
     entry_point='gym_multi_robot.envs:TilingPatternEnv',
-    kwargs={'env_storage_path': 'tiles11x11_2_5.pickle'}
+    kwargs={'env_storage_path': 'tiles11x11_2_5.json'}
 )
 
 # This environment has all the tiles distributed in a 6x6 block giving a fitness of 67.24
 register(
     id='tiling-pattern11x11-block-v0',
     entry_point='gym_multi_robot.envs:TilingPatternEnv',
-    kwargs={'env_storage_path': 'tiles11x11_block.pickle'}
+    kwargs={'env_storage_path': 'tiles11x11_block.json'}
 )
 
 register(
     id='tiling-pattern11x11-block-alt-v0',
     entry_point='gym_multi_robot.envs:TilingPatternEnv',
-    kwargs={'env_storage_path': 'tiles11x11_block.pickle', 'game_cls': CountTilingPatternGame}
+    kwargs={'env_storage_path': 'tiles11x11_block.json', 'game_cls': CountTilingPatternGame}
 )
 
 register(
     id='foraging11x11-static-v0',
     entry_point='gym_multi_robot.envs:ForagingEnv',
-    kwargs={'env_storage_path': 'foraging11x11.pickle'}
+    kwargs={'env_storage_path': 'foraging11x11.json'}
 )
 
 register(
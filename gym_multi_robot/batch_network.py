@@ -0,0 +1,147 @@
+import numpy as np
+
+
+def _clamped(low, high, scale, function):
+    return lambda z: function(np.clip(scale * z, low, high))
+
+
+def _inverse(z):
+    with np.errstate(divide='ignore'):
+        return np.where(z == 0, 0.0, 1 / np.where(z == 0, 1, z))
+
+
+# The NumPy versions of the activation functions of neat.activations.
+ACTIVATIONS = {
+    'sigmoid_activation': _clamped(-60.0, 60.0, 5.0, lambda z: 1.0 / (1.0 + np.exp(-z))),
+    'tanh_activation': _clamped(-60.0, 60.0, 2.5, np.tanh),
+    'sin_activation': _clamped(-60.0, 60.0, 5.0, np.sin),
+    'gauss_activation': _clamped(-3.4, 3.4, 1.0, lambda z: np.exp(-5.0 * z ** 2)),
+    'relu_activation': lambda z: np.where(z > 0.0, z, 0.0),
+    'softplus_activation': _clamped(-60.0, 60.0, 5.0, lambda z: 0.2 * np.log(1 + np.exp(z))),
+    'identity_activation': lambda z: z,
+    'clamped_activation': _clamped(-1.0, 1.0, 1.0, lambda z: z),
+    'inv_activation': _inverse,
+    'log_activation': lambda z: np.log(np.maximum(1e-7, z)),
+    'exp_activation': _clamped(-60.0, 60.0, 1.0, np.exp),
+    'abs_activation': np.abs,
+    'hat_activation': lambda z: np.maximum(0.0, 1 - np.abs(z)),
+    'square_activation': lambda z: z ** 2,
+    'cube_activation': lambda z: z ** 3,
+}
+
+
+def _maxabs(values):
+    return np.take_along_axis(values, np.abs(values).argmax(axis=1)[:, None], axis=1)[:, 0]
+
+
+# The NumPy versions of the aggregation functions of neat.aggregations, which reduce (batch, num_links) arrays.
+AGGREGATIONS = {
+    'product_aggregation': lambda values: np.prod(values, axis=1),
+    'max_aggregation': lambda values: np.max(values, axis=1),
+    'min_aggregation': lambda values: np.min(values, axis=1),
+    'maxabs_aggregation': _maxabs,
+    'median_aggregation': lambda values: np.median(values, axis=1),
+}
+
+# Aggregations that are computed with a matrix product, with the scale of the weights given the number of links.
+LINEAR_AGGREGATIONS = {
+    'sum_aggregation': lambda num_links: 1,
+    'mean_aggregation': lambda num_links: 1 / num_links,
+}
+
+
+def numpy_function(function, functions, fallback):
+    """ Returns the NumPy version of a neat function, or the given fallback of the function if there is none."""
+    if getattr(function, '__module__', '').startswith('neat.') and function.__name__ in functions:
+        return functions[function.__name__]
+
+    return fallback(function)
+
+
+def elementwise(function):
+    return np.vectorize(function, otypes=[float])
+
+
+def rowwise(function):
+    return lambda values: np.array([function(list(row)) for row in values], dtype=float)
+
+
+class BatchNetwork:
+    """ This class compiles a neat FeedForwardNetwork into a NumPy evaluation plan, which activates the network for
+    a whole batch of inputs at once, for example the observations of all robots in all worlds of a vector env.
+    The nodes are evaluated layer by layer, the nodes of a layer with the same activation function that sum (or
+    average) their inputs are evaluated with a single matrix product.
+    The results equal those of FeedForwardNetwork.activate up to floating point rounding.
+    """
+
+    def __init__(self, network):
+        self.num_inputs = len(network.input_nodes)
+
+        # Every node gets a column in the value matrix, inputs first.
+        columns = {}
+        for node in list(network.input_nodes) + list(network.output_nodes) + [e[0] for e in network.node_evals]:
+            columns.setdefault(node, len(columns))
+        self.num_values = len(columns)
+        self.output_columns = np.array([columns[node] for node in network.output_nodes], dtype=int)
+
+        # Group the nodes by layer, activation and aggregation.
+        layers = {node: 0 for node in network.input_nodes}
+        groups = {}
+        for node, activation, aggregation, bias, response, links in network.node_evals:
+            layers[node] = 1 + max((layers.get(i, 0) for i, _ in links), default=0)
+            key = layers[node], activation, aggregation if aggregation.__name__ not in LINEAR_AGGREGATIONS else None
+            groups.setdefault(key, []).append((columns[node], aggregation, bias, response, links))
+
+        self.plan = [self.__compile_group(activation, nodes, columns)
+                     for (_, activation, _), nodes in sorted(groups.items(), key=lambda item: item[0][0])]
+        self.values = np.zeros((0, self.num_values))
+
+    @staticmethod
+    def create(genome, config):
+        """ Returns the batch network of the given genome."""
+        import neat
+        return BatchNetwork(neat.nn.FeedForwardNetwork.create(genome, config))
+
+    def __compile_group(self, activation, nodes, columns):
+        """ Returns the step of the plan that evaluates the given nodes: their columns, a function giving their
+        aggregated inputs, their biases, responses and the activation function."""
+        node_columns = np.array([node[0] for node in nodes], dtype=int)
+        biases = np.array([node[2] for node in nodes], dtype=float)
+        responses = np.array([node[3] for node in nodes], dtype=float)
+
+        aggregation = nodes[0][1]
+        if aggregation.__name__ in LINEAR_AGGREGATIONS:
+            weights = np.zeros((self.num_values, len(nodes)))
+            for index, (_, node_aggregation, _, _, links) in enumerate(nodes):
+                scale = LINEAR_AGGREGATIONS[node_aggregation.__name__](max(len(links), 1))
+                for i, w in links:
+                    weights[columns[i], index] += w * scale
+
+            def aggregate(values):
+                return values @ weights
+        else:
+            reduce = numpy_function(aggregation, AGGREGATIONS, rowwise)
+            gathers = [(np.array([columns[i] for i, _ in links], dtype=int), np.array([w for _, w in links]))
+                       for _, _, _, _, links in nodes]
+
+            def aggregate(values):
+                return np.stack([reduce(values[:, links] * weights) for links, weights in gathers], axis=1)
+
+        return node_columns, aggregate, biases, responses, numpy_function(activation, ACTIVATIONS, elementwise)
+
+    def activate(self, inputs):
+        """ Activates the network for the given (..., num_inputs) inputs and returns the (..., num_outputs) outputs."""
+        inputs = np.asarray(inputs)
+        if inputs.shape[-1] != self.num_inputs:
+            raise RuntimeError("Expected {0:n} inputs, got {1:n}".format(self.num_inputs, inputs.shape[-1]))
+
+        batch = inputs.reshape((-1, self.num_inputs))
+        if len(self.values) != len(batch):
+            self.values = np.zeros((len(batch), self.num_values))
+        values = self.values
+        values[:, :self.num_inputs] = batch
+
+        for columns, aggregate, biases, responses, activation in self.plan:
+            values[:, columns] = activation(biases + responses * aggregate(values))
+
+        return values[:, self.output_columns].reshape(inputs.shape[:-1] + (len(self.output_columns),))
@@ -0,0 +1,245 @@
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import sys
+import time
+from collections import namedtuple
+
+import gym
+import numpy as np
+
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), 'benchmark_baseline.json')
+
+# The metrics of a case, with the direction in which they get better.
+RATE_METRICS = ('steps_per_sec', 'resets_per_sec')
+COST_METRICS = ('fitness_seconds', 'peak_rss_kb')
+
+CONTROLLERS = ('random', 'fixed')
+
+Case = namedtuple('Case', ['name', 'env_id', 'kwargs'])
+
+
+def registered_env_ids():
+    """ Returns the ids of all environments registered by this package, in registration order."""
+    return [spec.id for spec in gym.envs.registry.values()
+            if isinstance(spec.entry_point, str) and spec.entry_point.startswith('gym_multi_robot.')]
+
+
+def sweep_cases(grid_sizes=((7, 5), (11, 11), (25, 25), (50, 50)), robot_counts=(1, 5, 20, 50),
+                robot_grid_size=(25, 25)):
+    """ Returns the cases of the random tiling pattern and foraging environments with the given grid sizes
+    (with 5 robots) and with the given numbers of robots (on the robot_grid_size grid).
+    Foraging worlds get a tile on one in ten cells."""
+    configurations = [(size, 5) for size in grid_sizes]
+    configurations += [(tuple(robot_grid_size), n) for n in robot_counts if (tuple(robot_grid_size), n) not in
+                       configurations]
+
+    cases = []
+    for (x_dim, y_dim), num_robots in configurations:
+        cases.append(Case('tiling-%dx%d-r%d' % (x_dim, y_dim, num_robots), 'tiling-pattern-v0',
+                          {'x_dim': x_dim, 'y_dim': y_dim, 'num_robots': num_robots}))
+    for (x_dim, y_dim), num_robots in configurations:
+        cases.append(Case('foraging-%dx%d-r%d' % (x_dim, y_dim, num_robots), 'foraging50x50-v0',
+                          {'x_dim': x_dim, 'y_dim': y_dim, 'num_robots': num_robots,
+                           'num_tiles': max(x_dim * y_dim // 10, 1), 'target_area': (0, 0, 2, 2)}))
+    return cases
+
+
+def default_cases():
+    """ Returns the cases of all registered environments followed by the sweep of grid sizes and robot counts."""
+    return [Case(env_id, env_id, {}) for env_id in registered_env_ids()] + sweep_cases()
+
+
+def controller_actions(controller, num_robots, seed, num_actions=256):
+    """ Returns a block of (num_actions, num_robots, 4) actions of the given controller, which are used cyclically.
+    The random controller draws seeded uniform actions in [-1, 2), the fixed controller always moves forward while
+    turning right and trying to pick up and drop (so every phase of the step is exercised)."""
+    if controller == 'random':
+        return np.random.RandomState(seed).uniform(-1, 2, size=(num_actions, num_robots, 4))
+    if controller == 'fixed':
+        return np.tile(np.array([1.0, 1.0, 1.0, 1.0]), (num_actions, num_robots, 1))
+
+    raise ValueError("Unknown controller %s." % controller)
+
+
+def best_time(function, repeats):
+    """ Returns the lowest of repeats wall clock times of calling function."""
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def peak_rss_kb():
+    """ Returns the peak resident set size of this process in kilobytes."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == 'darwin' else peak
+
+
+def run_case(case, controller, num_steps=2000, num_resets=50, num_fitness=200, repeats=3, seed=0):
+    """ Measures a case with the given controller and returns its result as dictionary.
+    Every measurement is repeated and the best time is kept, the environment is reseeded before every repeat so all
+    repeats measure the same episodes. Steps reset the environment when its game is over."""
+    env = gym.make(case.env_id, disable_env_checker=True, **case.kwargs).unwrapped
+    env.reset(seed=seed)
+    actions = controller_actions(controller, len(env.game.robots), seed)
+
+    def steps():
+        env.reset(seed=seed)
+        for t in range(num_steps):
+            env.step(actions[t % len(actions)])
+            if env.game.game_over:
+                env.reset()
+
+    def resets():
+        env.seed(seed)
+        for _ in range(num_resets):
+            env.reset()
+
+    def fitness():
+        for _ in range(num_fitness):
+            env.get_fitness()
+
+    step_time = best_time(steps, repeats)
+    reset_time = best_time(resets, repeats)
+    fitness_time = best_time(fitness, repeats)     # Of the state at the end of the resets.
+
+    return {
+        'case': case.name,
+        'env_id': case.env_id,
+        'kwargs': case.kwargs,
+        'controller': controller,
+        'grid_size': list(env.game.grid.shape),
+        'num_robots': len(env.game.robots),
+        'steps_per_sec': num_steps / step_time,
+        'resets_per_sec': num_resets / reset_time,
+        'fitness_seconds': fitness_time / num_fitness,
+        'peak_rss_kb': peak_rss_kb(),
+    }
+
+
+def _run_task(task):
+    return run_case(*task[0], **task[1])
+
+
+def run_benchmark(cases=None, controllers=CONTROLLERS, isolate=True, **kwargs):
+    """ Runs every case with every controller (see run_case for the keyword arguments) and returns the results.
+    With isolate every run takes place in a fresh process, so the peak RSS is of that run only (plus the interpreter
+    and the imported modules)."""
+    cases = default_cases() if cases is None else cases
+    tasks = [((case, controller), kwargs) for case in cases for controller in controllers]
+
+    if not isolate:
+        return [_run_task(task) for task in tasks]
+
+    with multiprocessing.Pool(1, maxtasksperchild=1) as pool:
+        return pool.map(_run_task, tasks, chunksize=1)
+
+
+def environment_info():
+    """ Returns a description of the machine and versions the benchmark ran with."""
+    return {
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'gym': gym.__version__,
+        'platform': platform.platform(),
+        'processor': platform.processor(),
+        'cpu_count': os.cpu_count(),
+    }
+
+
+def write_results(path, results, **settings):
+    """ Writes the results with the given settings and a description of the machine to the given json file."""
+    with open(path, 'w') as handle:
+        json.dump({'environment': environment_info(), 'settings': settings, 'results': results}, handle, indent=2)
+
+
+def read_results(path):
+    with open(path) as handle:
+        return json.load(handle)['results']
+
+
+def compare(results, baseline, tolerance=0.2):
+    """ Returns the regressions of the results against the baseline results, as list of
+    (case, controller, metric, baseline value, value) tuples. A rate that dropped or a cost that rose by more than the
+    given fraction is a regression. Runs that are missing from either side are skipped."""
+    baseline = {(result['case'], result['controller']): result for result in baseline}
+
+    regressions = []
+    for result in results:
+        reference = baseline.get((result['case'], result['controller']))
+        if reference is None:
+            continue
+
+        for metric in RATE_METRICS + COST_METRICS:
+            if metric not in result or metric not in reference:
+                continue
+            old, new = reference[metric], result[metric]
+            if metric in RATE_METRICS and new < old * (1 - tolerance) or \
+                    metric in COST_METRICS and new > old * (1 + tolerance):
+                regressions.append((result['case'], result['controller'], metric, old, new))
+
+    return regressions
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description="Measures the steps and resets per second, the cost of a fitness "
+                                                 "call and the peak memory of all registered environments and a "
+                                                 "sweep of grid sizes and robot counts, and compares them to a "
+                                                 "baseline.")
+    parser.add_argument('--output', default='benchmark.json', help="The json file to write the results to.")
+    parser.add_argument('--baseline', default=BASELINE_PATH, help="The json file of the baseline results.")
+    parser.add_argument('--save-baseline', action='store_true', help="Writes the results as the new baseline.")
+    parser.add_argument('--cases', nargs='*', default=None, help="The cases to run (all by default).")
+    parser.add_argument('--controllers', nargs='*', choices=CONTROLLERS, default=CONTROLLERS)
+    parser.add_argument('--steps', type=int, default=2000, help="The number of steps per measurement.")
+    parser.add_argument('--resets', type=int, default=50, help="The number of resets per measurement.")
+    parser.add_argument('--fitness-calls', type=int, default=200, help="The number of fitness calls per measurement.")
+    parser.add_argument('--repeats', type=int, default=3, help="The number of repeats of which the best is kept.")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help="The fraction a metric may be worse than the baseline before it is a regression.")
+    parser.add_argument('--no-isolate', action='store_true', help="Runs all cases in this process.")
+    args = parser.parse_args(args)
+
+    cases = default_cases()
+    if args.cases is not None:
+        unknown = set(args.cases) - {case.name for case in cases}
+        if unknown:
+            parser.error("Unknown cases: %s." % ', '.join(sorted(unknown)))
+        cases = [case for case in cases if case.name in args.cases]
+
+    settings = {'steps': args.steps, 'resets': args.resets, 'fitness_calls': args.fitness_calls,
+                'repeats': args.repeats, 'seed': args.seed}
+    results = run_benchmark(cases, args.controllers, not args.no_isolate, num_steps=args.steps,
+                            num_resets=args.resets, num_fitness=args.fitness_calls, repeats=args.repeats,
+                            seed=args.seed)
+
+    for result in results:
+        print("%-32s %-7s %10.0f steps/s %9.0f resets/s %9.2f us/fitness %8d kB" % (
+            result['case'], result['controller'], result['steps_per_sec'], result['resets_per_sec'],
+            result['fitness_seconds'] * 1e6, result['peak_rss_kb']))
+
+    write_results(args.output, results, **settings)
+    if args.save_baseline:
+        write_results(args.baseline, results, **settings)
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print("No baseline at %s." % args.baseline)
+        return 0
+
+    regressions = compare(results, read_results(args.baseline), args.tolerance)
+    for case, controller, metric, old, new in regressions:
+        print("Regression in %s (%s): %s %.4g -> %.4g" % (case, controller, metric, old, new))
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -2,3 +2,5 @@ from gym_multi_robot.envs.tiling_pattern_env import TilingPatternEnv
 from gym_multi_robot.envs.foraging_env import ForagingEnv
 from gym_multi_robot.envs.tiling_pattern_game_alternative import SummedTilingPatternEnv, WeightedSumTilingPatternEnv
 from gym_multi_robot.envs.foraging_game_alternative import SteppedForagingEnv, WeightedSumForagingEnv
+from gym_multi_robot.envs.vector_env import VectorTilingPatternEnv, VectorForagingEnv
+from gym_multi_robot.envs.async_vector_env import AsyncVectorTilingPatternEnv, AsyncVectorForagingEnv
@@ -0,0 +1,302 @@
+import functools
+import multiprocessing
+import traceback
+
+import numpy as np
+
+from gym_multi_robot.envs.foraging_env import ForagingEnv
+from gym_multi_robot.envs.shared_scenario import share_array, shared_memory
+from gym_multi_robot.envs.tiling_pattern_env import TilingPatternEnv
+
+# The commands a worker executes, written to its entry of the commands array.
+STEP, RESET, SEED, FITNESS, CLOSE = range(5)
+# The status a worker writes after a command.
+OK, ERROR = range(2)
+
+NO_SEED = -1    # Marks that a world is seeded randomly.
+
+
+def _attach(shared_arrays):
+    """ Attaches to the given SharedArrays, returns the shared memory blocks and writable arrays by name."""
+    memories, arrays = [], {}
+    for key, shared in shared_arrays.items():
+        memory = shared_memory.SharedMemory(name=shared.name)
+        memories.append(memory)
+        arrays[key] = np.ndarray(shared.shape, np.dtype(shared.dtype), buffer=memory.buf)
+
+    return memories, arrays
+
+
+def _close(memories):
+    """ Closes the given shared memory blocks, blocks of which arrays are still in use are unmapped when they are
+    gone."""
+    for memory in memories:
+        try:
+            memory.close()
+        except BufferError:
+            pass
+
+
+def _run_worker(index, env_fn, shared_arrays, max_steps, command_event, result_event, errors):
+    """ Runs the environment of world index in a worker process, executing the commands of the main process.
+    A command is written to the commands array and signalled with command_event, the results are written to the
+    shared arrays and signalled with result_event."""
+    memories, arrays = _attach(shared_arrays)
+    env = game = observations = None
+    try:
+        env = env_fn()
+        game = getattr(env, 'unwrapped', env).game
+        observations = arrays['observations'][index]
+        game.array_observations = True
+        game.observations = observations
+
+        running = True
+        while running:
+            command_event.wait()
+            command_event.clear()
+
+            try:
+                command = arrays['commands'][index]
+                if command == STEP:
+                    observation, reward, done, _ = env.step(arrays['actions'][index])
+                    arrays['rewards'][index] = reward
+                    arrays['steps'][index] += 1
+                    done = done or max_steps is not None and arrays['steps'][index] >= max_steps
+                    arrays['dones'][index] = done
+                    arrays['final_fitness'][index] = env.get_fitness() if done else np.nan
+                    if done:
+                        observation = env.reset()
+                        arrays['steps'][index] = 0
+                elif command == RESET:
+                    observation = env.reset()
+                    arrays['steps'][index] = 0
+                elif command == SEED:
+                    seed = int(arrays['seeds'][index])
+                    env.seed(None if seed == NO_SEED else seed)
+                elif command == FITNESS:
+                    arrays['fitness'][index] = env.get_fitness()
+                elif command == CLOSE:
+                    running = False
+
+                if command in (STEP, RESET):
+                    if np.shape(observation) != observations.shape:
+                        raise ValueError("The number of robots of a world should not change on reset.")
+                    observations[...] = observation
+                arrays['status'][index] = OK
+            except Exception:
+                arrays['status'][index] = ERROR
+                errors.put((index, traceback.format_exc()))
+
+            result_event.set()
+    except Exception:
+        arrays['status'][index] = ERROR
+        errors.put((index, traceback.format_exc()))
+        result_event.set()
+    finally:
+        if env is not None:
+            env.close()
+        env = game = observations = None
+        arrays.clear()
+        _close(memories)
+
+
+class AsyncVectorMultiRobotEnv:
+    """ This class runs a number of independent environments, each in its own worker process.
+    The environments are created in the workers by the given env_fns, which should be picklable (for example a
+    functools.partial of an environment class) and create environments with the same number of robots.
+    Actions, observations and the results of the steps are exchanged through preallocated arrays in shared memory
+    instead of pipes, a command to a worker and its completion are signalled with an event each.
+    Like VectorMultiRobotEnv, actions are given as (num_worlds, num_robots, 4) array and observations are returned as
+    (num_worlds, num_robots, observation_size) array, which is reused by the next step or reset.
+    A world is reset by its worker when its game is over or after max_steps steps (if given), the fitness it reached
+    is then given in info['final_fitness'] (which is nan for the other worlds).
+    step is split in step_async and step_wait, so the main process can work while the worlds step.
+    The workers are stopped and the shared memory is freed by close.
+    """
+
+    poll_interval = 1.0     # The seconds between the checks whether a worker is still alive while waiting.
+
+    def __init__(self, env_fns, max_steps=None, context=None):
+        if shared_memory is None:
+            raise RuntimeError("The asynchronous vector environment needs shared memory (Python 3.8 or later).")
+
+        self.env_fns = list(env_fns)
+        self.max_steps = max_steps
+        self.waiting = False
+        self.closed = False
+
+        # Create one environment here to know the shapes of the observations.
+        env = self.env_fns[0]()
+        observations = np.asarray(env.reset())
+        observation_dtype = getattr(env, 'unwrapped', env).game.observation_dtype
+        env.close()
+
+        num_worlds, num_robots = self.num_worlds, observations.shape[0]
+        templates = {
+            'actions': np.zeros((num_worlds, num_robots, 4)),
+            'observations': np.zeros((num_worlds,) + observations.shape, dtype=observation_dtype),
+            'rewards': np.zeros(num_worlds),
+            'dones': np.zeros(num_worlds, dtype=bool),
+            'final_fitness': np.full(num_worlds, np.nan),
+            'fitness': np.zeros(num_worlds),
+            'steps': np.zeros(num_worlds, dtype=np.int64),
+            'seeds': np.full(num_worlds, NO_SEED, dtype=np.int64),
+            'commands': np.zeros(num_worlds, dtype=np.int8),
+            'status': np.zeros(num_worlds, dtype=np.int8),
+        }
+        self.memories, shared_arrays = [], {}
+        for key, template in templates.items():
+            memory, shared_arrays[key] = share_array(template)
+            self.memories.append(memory)
+            setattr(self, key, np.ndarray(template.shape, template.dtype, buffer=memory.buf))
+
+        context = multiprocessing.get_context(context)
+        self.errors = context.SimpleQueue()
+        self.command_events = [context.Event() for _ in range(num_worlds)]
+        self.result_events = [context.Event() for _ in range(num_worlds)]
+        self.processes = [context.Process(target=_run_worker, daemon=True,
+                                          args=(index, env_fn, shared_arrays, max_steps, self.command_events[index],
+                                                self.result_events[index], self.errors))
+                          for index, env_fn in enumerate(self.env_fns)]
+        for process in self.processes:
+            process.start()
+
+        try:
+            self.reset()
+        except BaseException:
+            self.close()
+            raise
+
+    @property
+    def num_worlds(self):
+        return len(self.env_fns)
+
+    def seed(self, seed=None):
+        """ Seeds the environment of world i with seed + i, or randomly if no seed is given."""
+        self.seeds[...] = NO_SEED if seed is None else seed + np.arange(self.num_worlds)
+        self.__run(SEED)
+        return [None if seed is None else seed + index for index in range(self.num_worlds)]
+
+    def reset(self, seed=None):
+        """ Resets all worlds and returns their observations, seeding them first if a seed is given."""
+        if seed is not None:
+            self.seed(seed)
+
+        self.__run(RESET)
+        return self.observations
+
+    def step_async(self, actions):
+        """ Starts executing the (num_worlds, num_robots, 4) actions in all worlds."""
+        if self.waiting:
+            raise RuntimeError("The previous step should be finished with step_wait first.")
+
+        self.actions[...] = actions
+        self.__send(STEP)
+        self.waiting = True
+
+    def step_wait(self):
+        """ Waits for the steps started by step_async and returns their results."""
+        if not self.waiting:
+            raise RuntimeError("A step should be started with step_async first.")
+
+        self.waiting = False
+        self.__wait(range(self.num_worlds))
+        return self.observations, self.rewards.copy(), self.dones.copy(), {'final_fitness': self.final_fitness.copy()}
+
+    def step(self, actions):
+        """ Executes the (num_worlds, num_robots, 4) actions in all worlds."""
+        self.step_async(actions)
+        return self.step_wait()
+
+    def get_fitness(self, index=None):
+        """ Returns the fitness of the world with the given index, or an array with the fitness of every world."""
+        if index is not None:
+            self.__run(FITNESS, [index])
+            return float(self.fitness[index])
+
+        self.__run(FITNESS)
+        return self.fitness.copy()
+
+    def close(self):
+        """ Stops the workers and frees the shared memory."""
+        if self.closed:
+            return
+
+        self.closed = True
+        try:
+            if self.waiting:
+                self.waiting = False
+                self.__wait(range(self.num_worlds))
+        finally:
+            for index, process in enumerate(self.processes):
+                if process.is_alive():
+                    self.commands[index] = CLOSE
+                    self.command_events[index].set()
+            for process in self.processes:
+                process.join(self.poll_interval)
+                if process.is_alive():
+                    process.terminate()
+
+            for key in ('actions', 'observations', 'rewards', 'dones', 'final_fitness', 'fitness', 'steps', 'seeds',
+                        'commands', 'status'):
+                delattr(self, key)
+            _close(self.memories)
+            for memory in self.memories:
+                memory.unlink()
+            self.memories = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __del__(self):
+        if not getattr(self, 'closed', True):
+            self.close()
+
+    def __run(self, command, indices=None):
+        """ Executes the command in the workers of the given worlds (all by default)."""
+        if self.waiting:
+            raise RuntimeError("The previous step should be finished with step_wait first.")
+
+        indices = range(self.num_worlds) if indices is None else indices
+        self.__send(command, indices)
+        self.__wait(indices)
+
+    def __send(self, command, indices=None):
+        for index in range(self.num_worlds) if indices is None else indices:
+            self.commands[index] = command
+            self.command_events[index].set()
+
+    def __wait(self, indices):
+        """ Waits until the workers of the given worlds are done, raises the errors of the workers if any."""
+        for index in indices:
+            while not self.result_events[index].wait(self.poll_interval):
+                if not self.processes[index].is_alive():
+                    raise RuntimeError("The worker of world %d stopped unexpectedly." % index)
+            self.result_events[index].clear()
+
+        if (self.status[list(indices)] != OK).any():
+            messages = []
+            while not self.errors.empty():
+                index, message = self.errors.get()
+                messages.append("World %d:\n%s" % (index, message))
+            raise RuntimeError("Error in the workers.\n" + '\n'.join(messages))
+
+
+class AsyncVectorTilingPatternEnv(AsyncVectorMultiRobotEnv):
+    """ This class runs num_worlds tiling pattern environments, created with the given arguments, in worker
+    processes."""
+
+    def __init__(self, num_worlds, max_steps=None, seed=None, context=None, **kwargs):
+        super().__init__([functools.partial(TilingPatternEnv, seed=None if seed is None else seed + i, **kwargs)
+                          for i in range(num_worlds)], max_steps, context)
+
+
+class AsyncVectorForagingEnv(AsyncVectorMultiRobotEnv):
+    """ This class runs num_worlds foraging environments, created with the given arguments, in worker processes."""
+
+    def __init__(self, num_worlds, max_steps=None, seed=None, context=None, **kwargs):
+        super().__init__([functools.partial(ForagingEnv, seed=None if seed is None else seed + i, **kwargs)
+                          for i in range(num_worlds)], max_steps, context)
@@ -1,7 +1,8 @@
-from gym_multi_robot.envs.foraging_game import ForagingGame, ForagingGameStorage
+from gym_multi_robot.envs.foraging_game import ForagingGame
 from gym_multi_robot.envs.foraging_robot import ForagingRobot
 from gym_multi_robot.envs.multi_robot_env import MultiRobotEnv
 from gym_multi_robot.envs.robot_reset import RandomRobotReset, StaticRobotReset
+from gym_multi_robot.envs.scenario import Scenario
 from gym_multi_robot.envs.world_reset import RandomWorldReset, StaticWorldReset
 
 
@@ -9,15 +10,21 @@ class ForagingEnv(MultiRobotEnv):
     """ This class defines the environment for the foraging task.
     A grid world is used an one part of the world compromises a grid, and robots are required to bring all tiles to
     a designated area.
+    Actions can be given as (num_robots, 4) array, which is not changed, and the observations are returned as a
+    (num_robots, observation_size) int8 array, which is reused by the next step or reset
+    (or as lists without array_observations).
+    The env_storage_path is either a scenario or a scenario bank, of which scenario_index selects the scenario.
+    The grid_backend selects how the game stores its tiles, see MultiRobotGame.
     """
 
     def __init__(self, x_dim=7, y_dim=5, num_tiles=2, target_area=(0, 0, 1, 1), seed=None, num_robots=5,
-                 env_storage_path=None, game_cls=ForagingGame):
+                 env_storage_path=None, game_cls=ForagingGame, array_observations=True, scenario_index=None,
+                 grid_backend='dense'):
         super().__init__(seed)
 
         if env_storage_path is not None:
-            env_storage = self.get_static_storage(env_storage_path)
-            assert isinstance(env_storage, ForagingGameStorage)
+            env_storage = self.get_static_storage(env_storage_path, scenario_index)
+            assert env_storage.game_type == Scenario.FORAGING
 
             world_size = env_storage.grid.shape
             num_tiles = env_storage.num_tiles
@@ -29,4 +36,7 @@ class ForagingEnv(MultiRobotEnv):
             robot_reset = RandomRobotReset(ForagingRobot, num_robots)
             world_reset = RandomWorldReset()
 
-        self.game = game_cls(world_size, num_tiles, target_area, robot_reset, world_reset)
+        self.game = game_cls(world_size, num_tiles, target_area, robot_reset, world_reset, grid_backend=grid_backend)
+        self.game.array_observations = array_observations
+        self.game.np_random = self.np_random
+        self.create_spaces()
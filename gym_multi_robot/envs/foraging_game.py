@@ -1,8 +1,7 @@
-import pickle
-
 import numpy as np
 
 from gym_multi_robot.envs.multi_robot_game import MultiRobotGame
+from gym_multi_robot.envs.scenario import Scenario
 
 
 class ForagingGame(MultiRobotGame):
@@ -10,9 +9,13 @@ class ForagingGame(MultiRobotGame):
     This class represent the foraging game, with as goal bringing as many tiles as possible to the foraging area.
     """
 
-    def __init__(self, grid_size, num_tiles, target_area, robot_reset, world_reset):
+    view_entry_point = 'gym_multi_robot.envs.foraging_view_2d:ForagingView2D'
+    view_parameters = ('target_area',)
+    view_counters = ('collected',)
+
+    def __init__(self, grid_size, num_tiles, target_area, robot_reset, world_reset, grid_backend='dense'):
         """ Target Area should be a tuple (x, y, x_length, y_length). """
-        super().__init__(grid_size, num_tiles, robot_reset, world_reset)
+        super().__init__(grid_size, num_tiles, robot_reset, world_reset, grid_backend)
 
         self.target_area = target_area
         self.collected = 0
@@ -22,9 +25,31 @@ class ForagingGame(MultiRobotGame):
         self.collected = 0
         return observations
 
+    def state_fields(self):
+        return super().state_fields() + [('collected', np.int64, ())]
+
+    def save_state(self, state):
+        super().save_state(state)
+        state['collected'] = self.collected
+
+    def load_state(self, state):
+        super().load_state(state)
+        self.collected = int(state['collected'])
+
     def valid_initial_drop(self, location):
         return not self.has_tile(location) and not self.on_target_area(location)
 
+    def initial_drop_mask(self):
+        mask = super().initial_drop_mask()
+        x, y, x_length, y_length = self.target_area
+        mask[max(x, 0):max(x + x_length, 0), max(y, 0):max(y + y_length, 0)] = False
+        return mask
+
+    def valid_initial_drops(self, x, y):
+        area_x, area_y, area_w, area_h = self.target_area
+        on_target_area = (area_x <= x) & (x < area_x + area_w) & (area_y <= y) & (y < area_y + area_h)
+        return super().valid_initial_drops(x, y) & ~on_target_area
+
     def on_target_area(self, loc):
         """ Returns true if the given position is within the target area of the robot."""
         return self.target_area[0] <= loc[0] < self.target_area[0] + self.target_area[2] \
@@ -41,10 +66,9 @@ class ForagingGame(MultiRobotGame):
         is_west = location[0] >= self.target_area[0] + self.target_area[2]
         return is_north, is_east, is_south, is_west
 
-    def write(self, storage_file='foraging_game.pickle'):
-        """ Writes the current configuration of robots and tiles to 2 different files."""
-        storage = ForagingGameStorage(self)
-        pickle.dump(storage, open(storage_file, 'wb'))
+    def write(self, storage_file='foraging_game.json'):
+        """ Writes the current configuration of robots and tiles as scenario (a header and a grid file)."""
+        Scenario.from_storage(ForagingGameStorage(self)).save(storage_file)
 
 
 class ForagingGameStorage:
@@ -1,63 +1,97 @@
+import functools
 import math
 
+import numpy as np
+
 from gym_multi_robot.envs import ForagingEnv
 from gym_multi_robot.envs.foraging_game import ForagingGame
 
 
+@functools.lru_cache(maxsize=32)
+def distance_weights(grid_size, target_area):
+    """ Returns a read-only grid with for each location 1 minus its distance to the corner of the target area,
+    relative to the diagonal of the grid."""
+    max_distance = math.sqrt(math.pow(grid_size[0], 2) + math.pow(grid_size[1], 2))
+    x, y = np.ogrid[:grid_size[0], :grid_size[1]]
+    weights = 1 - np.sqrt((x - target_area[0]) ** 2 + (y - target_area[1]) ** 2) / max_distance
+    weights.flags.writeable = False
+
+    return weights
+
+
 class ClosestGame(ForagingGame):
-    """ This class offers an alternative fitness function calculation for the tiling pattern game.
-    It takes the difference of each lattice block from having 4 tiles (the required number).
+    """ This class offers an alternative fitness function calculation for the foraging game.
+    Besides the collected tiles, every tile counts for how close it is to the target area.
     """
 
     def get_fitness(self):
-        """ This function returns the difference by taking the difference from the ideal field."""
-        fitness = self.collected
-
-        max_distance = math.sqrt(math.pow(self.GRID_W, 2) + math.pow(self.GRID_H, 2))
-        for i in range(self.GRID_W):  # -1 to not take into account the last block.
-            for j in range(self.GRID_H):
-                if self.grid[i][j]:
-                    distance = math.sqrt(math.pow(i - self.target_area[0], 2) + math.pow(j - self.target_area[1], 2))
-                    fitness += 1 - distance / max_distance
+        """ This function returns the number of collected tiles plus the distance weight of every tile."""
+        weights = distance_weights((self.GRID_W, self.GRID_H), tuple(self.target_area))
 
-        return fitness
+        return self.collected + float(weights[np.nonzero(self.grid)].sum())
 
 
 class SteppedForagingEnv(ForagingEnv):
     """ Child classes of this class should set summed_reward in update function which can be returned by get_fitness."""
 
     def __init__(self, lattice_size=2, x_dim=7, y_dim=5, target_area=(0, 0, 1, 1), seed=None, num_robots=5, env_storage_path=None,
-                 game_cls=ForagingEnv):
-        super().__init__(lattice_size, x_dim, y_dim, target_area, seed, num_robots, env_storage_path, game_cls)
+                 game_cls=ForagingEnv, array_observations=True, scenario_index=None,
+                 grid_backend='dense'):
+        super().__init__(lattice_size, x_dim, y_dim, target_area, seed, num_robots, env_storage_path, game_cls,
+                         array_observations=array_observations, scenario_index=scenario_index,
+                         grid_backend=grid_backend)
 
         self.summed_reward = 0
 
-    def reset(self):
+    def reset(self, seed=None):
         self.summed_reward = 0
-        return super().reset()
+        return super().reset(seed)
 
     def get_fitness(self):
         return self.summed_reward
 
+    def state_fields(self):
+        return super().state_fields() + [('summed_reward', np.float64, ())]
+
+    def save_state(self, state):
+        super().save_state(state)
+        state['summed_reward'] = self.summed_reward
+
+    def load_state(self, state):
+        super().load_state(state)
+        self.summed_reward = float(state['summed_reward'])
+
 
 class WeightedSumForagingEnv(SteppedForagingEnv):
     """ This class calculates the fitness by getting a weighted sum over all timesteps. (weight increases with step) """
 
     def __init__(self, lattice_size=2, x_dim=7, y_dim=5, target_area=(0, 0, 1, 1), seed=None, num_robots=5, env_storage_path=None,
-                 game_cls=ForagingGame):
-        super().__init__(lattice_size, x_dim, y_dim, target_area, seed, num_robots, env_storage_path, game_cls)
+                 game_cls=ForagingGame, array_observations=True, scenario_index=None,
+                 grid_backend='dense'):
+        super().__init__(lattice_size, x_dim, y_dim, target_area, seed, num_robots, env_storage_path, game_cls,
+                         array_observations=array_observations, scenario_index=scenario_index,
+                         grid_backend=grid_backend)
 
         self.step_nr = 0
 
-    def reset(self):
+    def reset(self, seed=None):
         self.step_nr = 0
-        return super().reset()
+        return super().reset(seed)
+
+    def state_fields(self):
+        return super().state_fields() + [('step_nr', np.int64, ())]
+
+    def save_state(self, state):
+        super().save_state(state)
+        state['step_nr'] = self.step_nr
+
+    def load_state(self, state):
+        super().load_state(state)
+        self.step_nr = int(state['step_nr'])
 
     def step(self, actions):
-        observation = self.game.update_robots(actions)
-        reward = self.game.get_fitness()
-        done = self.game.game_over
-        info = dict()
+        observation, _, done, info = super().step(actions)
+        reward = self.game_fitness()
 
         self.summed_reward += (reward * self.step_nr)
         self.step_nr += 1
@@ -1,3 +1,5 @@
+import numpy as np
+
 from gym_multi_robot.envs.gripping_robot import GripperRobot, Heading
 
 
@@ -5,6 +7,9 @@ class ForagingRobot(GripperRobot):
     """ This class is an extension of a gripper robot, that can sense the ground it is on and gets a direction
     of the robot. """
 
+    observation_size = GripperRobot.observation_size + 9
+    world_attributes = ('target_area',)
+
     def __init__(self, identifier, heading=Heading.NORTH, location=(0, 0)):
         super().__init__(identifier, heading, location)
 
@@ -16,7 +21,7 @@ class ForagingRobot(GripperRobot):
             if game.on_target_area(self.location):  # If on the target area the object disappears and is collected.
                 game.collected += 1
             else:
-                game.grid[self.location[0]][self.location[1]] = True
+                game.set_tile(self.location, True)
 
             self.hold_object = False
 
@@ -32,3 +37,25 @@ class ForagingRobot(GripperRobot):
     def heading_to_observation(self):
         """ Returns an observation for every heading."""
         return [self.heading == heading for heading in Heading]
+
+    @classmethod
+    def collect_mask(cls, game, x, y):
+        area_x, area_y, area_w, area_h = game.target_area
+        return (area_x <= x) & (x < area_x + area_w) & (area_y <= y) & (y < area_y + area_h)
+
+    @classmethod
+    def collect(cls, game, count):
+        game.collected += count
+
+    @classmethod
+    def fill_observations(cls, game, observations, locations, headings):
+        x, y = locations[..., 0], locations[..., 1]
+        area_x, area_y, area_w, area_h = game.target_area
+        size = GripperRobot.observation_size
+
+        observations[..., size] = cls.collect_mask(game, x, y)
+        observations[..., size + 1] = y >= area_y + area_h     # North
+        observations[..., size + 2] = x < area_x               # East
+        observations[..., size + 3] = y < area_y               # South
+        observations[..., size + 4] = x >= area_x + area_w     # West
+        observations[..., size + 5:size + 9] = headings[..., None] == np.arange(len(Heading))
@@ -0,0 +1,20 @@
+from gym_multi_robot.envs.grid_view_2d import GridView2D
+
+
+class ForagingView2D(GridView2D):
+    """ This class renders the foraging game, with the target area as shaded cells and the number of collected tiles
+    in the status bar, see GridView2D."""
+
+    background_colours = [(255, 255, 255), (200, 235, 200)]
+
+    def __init__(self, game, maze_name="Foraging2D", screen_size=(600, 600)):
+        super().__init__(game, maze_name, screen_size)
+
+    def status(self):
+        return self.game.collected
+
+    def cell_backgrounds(self):
+        backgrounds = super().cell_backgrounds()
+        x, y, x_length, y_length = self.game.target_area
+        backgrounds[max(x, 0):max(x + x_length, 0), max(y, 0):max(y + y_length, 0)] = 1
+        return backgrounds
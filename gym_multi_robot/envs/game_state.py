@@ -0,0 +1,47 @@
+import numpy as np
+
+
+class ClonableState:
+    """ This mixin lets the state of a game (or environment) be cloned into and restored from a record, a 0-d
+    structured array of fixed size whose fields are given by state_fields as (name, dtype, shape) tuples.
+    Classes write and read their fields with save_state and load_state, extending those of their parent.
+    A record can be passed to clone_state again, which then fills it without allocating.
+    """
+
+    _state_layout = None    # The fields and dtype of the last record.
+
+    def state_fields(self):
+        """ Returns the fields of the record as (name, dtype, shape) tuples."""
+        return []
+
+    def save_state(self, state):
+        """ Writes the fields of this class into the given record."""
+        pass
+
+    def load_state(self, state):
+        """ Reads the fields of this class from the given record."""
+        pass
+
+    def state_dtype(self):
+        """ Returns the dtype of the records of the current game, which depends on its size and number of robots."""
+        fields = self.state_fields()
+        if self._state_layout is None or self._state_layout[0] != fields:
+            self._state_layout = fields, np.dtype(fields)
+
+        return self._state_layout[1]
+
+    def clone_state(self, state=None):
+        """ Returns a record of the current state, written into the given record if it has the right layout."""
+        dtype = self.state_dtype()
+        if state is None or state.dtype != dtype:
+            state = np.zeros((), dtype=dtype)
+
+        self.save_state(state)
+        return state
+
+    def restore_state(self, state):
+        """ Restores the state of the given record, which should be cloned from a game of the same layout."""
+        if state.dtype != self.state_dtype():
+            raise ValueError("The state does not have the layout of this %s." % type(self).__name__)
+
+        self.load_state(state)
@@ -0,0 +1,205 @@
+import numpy as np
+from numpy.lib.mixins import NDArrayOperatorsMixin
+
+# The ways a game can store its tiles:
+#   dense: a padded int grid (the default).
+#   uint8: a padded grid of one byte per location, for large worlds.
+#   sparse: a SparseGrid, for huge worlds with few tiles, which are stepped one robot after another.
+GRID_BACKENDS = ('dense', 'uint8', 'sparse')
+
+
+class SparseGrid(NDArrayOperatorsMixin):
+    """ This class stores a grid as hash map from the (x, y) locations with a non zero value to the value, so the
+    memory it takes and the time to clear it depend on the number of tiles instead of the size of the grid.
+    It can be indexed like a two dimensional array with a location, with arrays of x and y coordinates or with slices.
+    Indexing with a single x gives a SparseRow, so grid[x][y] reads and writes the grid like grid[x, y].
+    Other uses, such as comparisons and ufuncs, np.copy and np.asarray, work on a dense copy of the grid.
+    """
+
+    ndim = 2
+
+    def __init__(self, shape, dtype=np.uint8):
+        self.shape = tuple(int(size) for size in shape)
+        self.dtype = np.dtype(dtype)
+        self.tiles = {}
+
+    @property
+    def size(self):
+        return self.shape[0] * self.shape[1]
+
+    def __len__(self):
+        return self.shape[0]
+
+    def __location(self, key):
+        """ Returns the location of a key of two integers (negative coordinates count from the end), None for other
+        keys. Raises an IndexError for locations outside the grid."""
+        if type(key) is not tuple or len(key) != 2:
+            return None
+
+        location = []
+        for index, size in zip(key, self.shape):
+            if not isinstance(index, (int, np.integer)) or isinstance(index, (bool, np.bool_)):
+                return None
+            if not -size <= index < size:
+                raise IndexError("Index %d is out of bounds for size %d." % (index, size))
+            location.append(int(index) % size)
+
+        return tuple(location)
+
+    def __coordinates(self, key):
+        """ Returns the flattened x and y arrays and the shape of a key of two coordinate arrays,
+        None for other keys."""
+        if type(key) is not tuple or len(key) != 2 or any(isinstance(index, slice) or index is Ellipsis
+                                                          for index in key):
+            return None
+
+        x, y = np.broadcast_arrays(*key)
+        if x.dtype.kind not in 'iu' or y.dtype.kind not in 'iu':
+            return None
+
+        shape = x.shape
+        x, y = x.ravel(), y.ravel()
+        if len(x) and (x.min() < -self.shape[0] or x.max() >= self.shape[0] or
+                       y.min() < -self.shape[1] or y.max() >= self.shape[1]):
+            raise IndexError("Index out of bounds for shape %s." % (self.shape,))
+
+        return x % self.shape[0], y % self.shape[1], shape
+
+    def __getitem__(self, key):
+        location = self.__location(key)
+        if location is not None:
+            return self.dtype.type(self.tiles.get(location, 0))
+
+        if isinstance(key, (int, np.integer)) and not isinstance(key, (bool, np.bool_)):
+            if not -self.shape[0] <= key < self.shape[0]:
+                raise IndexError("Index %d is out of bounds for size %d." % (key, self.shape[0]))
+            return SparseRow(self, int(key) % self.shape[0])
+
+        coordinates = self.__coordinates(key)
+        if coordinates is None:
+            return np.asarray(self)[key]
+
+        x, y, shape = coordinates
+        tiles = self.tiles
+        values = np.fromiter((tiles.get(location, 0) for location in zip(x.tolist(), y.tolist())),
+                             dtype=self.dtype, count=len(x))
+        return values.reshape(shape)
+
+    def __setitem__(self, key, value):
+        location = self.__location(key)
+        if location is not None:
+            self.__set(location, self.dtype.type(value))
+            return
+
+        if isinstance(key, (int, np.integer)) and not isinstance(key, (bool, np.bool_)):
+            self[key][:] = value
+            return
+
+        coordinates = self.__coordinates(key)
+        if coordinates is None:
+            dense = np.asarray(self)
+            dense[key] = value
+            self.assign(dense)
+            return
+
+        x, y, shape = coordinates
+        values = np.broadcast_to(np.asarray(value).astype(self.dtype), shape).ravel()
+        for location, tile in zip(zip(x.tolist(), y.tolist()), values.tolist()):
+            self.__set(location, tile)
+
+    def __set(self, location, value):
+        if value:
+            self.tiles[location] = value
+        else:
+            self.tiles.pop(location, None)
+
+    def assign(self, grid):
+        """ Replaces the values of this grid by those of the given grid of the same shape."""
+        if isinstance(grid, SparseGrid):
+            if grid.shape != self.shape:
+                raise ValueError("Cannot assign a grid of shape %s to a grid of shape %s." % (grid.shape, self.shape))
+            self.tiles = grid.tiles.copy()
+            return
+
+        grid = np.broadcast_to(np.asarray(grid), self.shape).astype(self.dtype)
+        x, y = np.nonzero(grid)
+        self.tiles = dict(zip(zip(x.tolist(), y.tolist()), grid[x, y].tolist()))
+
+    def fill(self, value):
+        if value:
+            self.assign(value)
+        else:
+            self.tiles.clear()
+
+    def nonzero(self):
+        """ Returns the x and y coordinates of the non zero locations, in the order of np.nonzero of a dense grid."""
+        if not self.tiles:
+            return np.zeros(0, dtype=np.intp), np.zeros(0, dtype=np.intp)
+
+        x, y = np.array(sorted(self.tiles), dtype=np.intp).T
+        return x, y
+
+    def sum(self, *args, **kwargs):
+        if args or kwargs:
+            return np.asarray(self).sum(*args, **kwargs)
+        return sum(self.tiles.values())
+
+    def copy(self):
+        grid = SparseGrid(self.shape, self.dtype)
+        grid.tiles = self.tiles.copy()
+        return grid
+
+    def __array__(self, dtype=None, copy=None):
+        dense = np.zeros(self.shape, dtype=self.dtype if dtype is None else dtype)
+        if self.tiles:
+            x, y = zip(*self.tiles)
+            dense[x, y] = list(self.tiles.values())
+        return dense
+
+    def __array_ufunc__(self, ufunc, method, *inputs, **kwargs):
+        """ Applies ufuncs to a dense copy, grids cannot be the output of a ufunc."""
+        if any(isinstance(output, SparseGrid) for output in kwargs.get('out', ())):
+            return NotImplemented
+
+        inputs = tuple(np.asarray(x) if isinstance(x, SparseGrid) else x for x in inputs)
+        return getattr(ufunc, method)(*inputs, **kwargs)
+
+    def __repr__(self):
+        return "SparseGrid(shape=%s, tiles=%d)" % (self.shape, len(self.tiles))
+
+
+class SparseRow:
+    """ This class is the row of a SparseGrid at an x coordinate, which reads and writes the grid itself.
+    Other uses work on a dense copy of the row."""
+
+    def __init__(self, grid, x):
+        self.grid = grid
+        self.x = x
+
+    def __len__(self):
+        return self.grid.shape[1]
+
+    def __getitem__(self, y):
+        if isinstance(y, (int, np.integer)):
+            return self.grid[self.x, y]
+        return np.asarray(self)[y]
+
+    def __setitem__(self, y, value):
+        if isinstance(y, (int, np.integer)):
+            self.grid[self.x, y] = value
+            return
+
+        row = np.asarray(self)
+        row[y] = value
+        for index, tile in enumerate(row.tolist()):
+            self.grid[self.x, index] = tile
+
+    def __array__(self, dtype=None, copy=None):
+        row = np.zeros(self.grid.shape[1], dtype=self.grid.dtype if dtype is None else dtype)
+        for (x, y), value in self.grid.tiles.items():
+            if x == self.x:
+                row[y] = value
+        return row
+
+    def __repr__(self):
+        return "SparseRow(x=%d, %s)" % (self.x, self.grid)
@@ -0,0 +1,262 @@
+import importlib
+
+import numpy as np
+
+from gym_multi_robot.envs.gripping_robot import Heading
+
+# 3x5 bitmaps of the digits, used to draw numbers in the status bar without a font.
+DIGITS = np.array([[int(c) for c in row] for digit in (
+    '111 101 101 101 111', '010 110 010 010 111', '111 001 111 100 111', '111 001 111 001 111', '101 101 111 001 001',
+    '111 100 111 001 111', '111 100 111 101 111', '111 001 001 001 001', '111 101 111 101 111', '111 101 111 001 111',
+) for row in digit.split()], dtype=bool).reshape((10, 5, 3))
+
+
+def blend(colour, transparency, background=(255, 255, 255)):
+    """ Returns the given colour drawn with the given transparency (0-255) over the background colour."""
+    alpha = transparency / 255
+    return tuple(int(round(c * alpha + b * (1 - alpha))) for c, b in zip(colour, background))
+
+
+def create_view(game, **kwargs):
+    """ Creates the view of the given game, of the class given by the view_entry_point ('module:class') of the game."""
+    module_name, class_name = game.view_entry_point.split(':')
+    return getattr(importlib.import_module(module_name), class_name)(game, **kwargs)
+
+
+class GridView2D:
+    """ This class renders a game as (height, width, 3) uint8 image, composed with NumPy without a display.
+    Every cell of the grid is a block of pixels, on which a sprite is stamped for its state: empty, a tile or a robot
+    (with a sprite for every heading and hold flag, with and without a tile).
+    The frame is kept in a buffer that is reused by the next update, only the cells of which the state changed since
+    the last update are drawn again. The grid lines and the background of every cell (see cell_backgrounds) are drawn
+    once, when the layers are created.
+    Views can show a number in a status bar below the grid (see status).
+    Only the human mode opens a pygame display, on which the frame is shown.
+    Games select their view with view_entry_point, see create_view.
+    """
+
+    line_colour = (0, 0, 0)
+    background_colours = [(255, 255, 255)]
+    tile_colour = blend((0, 0, 150), 235)
+    robot_colour = (150, 0, 0)
+    object_colour = (0, 0, 150)
+    text_colour = (0, 0, 0)
+    text_scale = 3      # The size in pixels of the pixels of the digits.
+
+    def __init__(self, game, maze_name="Grid2D", screen_size=(600, 600)):
+
+        self.__game_over = False
+        self.__game = game
+        self.maze_name = maze_name
+
+        # to show the right and bottom border
+        self.__screen_size = tuple(map(sum, zip(screen_size, (-1, -1))))
+        self.screen = None          # The pygame display, which is opened by the first update in human mode.
+
+        self.grid_shape = None      # The grid size the layers are created for.
+        self.frame = None
+        self.cells = None           # The (GRID_H, CELL_H, GRID_W, CELL_W, 3) view of the cells of the frame.
+        self.status_bar = None      # The view of the status bar of the frame, if any.
+        self.backgrounds = None     # The background index of every cell.
+        self.sprites = None         # The sprites of every background and cell state.
+        self.codes = None           # The state of every cell, see cell_codes.
+        self.drawn_codes = None     # The state of every cell in the frame.
+        self.drawn_status = None
+
+    @property
+    def background_colour(self):
+        return self.background_colours[0]
+
+    def update(self, mode="human"):
+        """ Renders the game and returns the frame, which is shown on the display in human mode."""
+        try:
+            img_output = self.__view_update(mode)
+            self.__controller_update()
+        except Exception as e:
+            self.__game_over = True
+            self.quit_game()
+            raise e
+        else:
+            return img_output
+
+    def quit_game(self):
+        self.__game_over = True
+        if self.screen is not None:
+            try:
+                import pygame
+                pygame.display.quit()
+                pygame.quit()
+            except Exception:
+                pass
+            self.screen = None
+
+    def __view_update(self, mode="human"):
+        if not self.__game_over:
+            frame = self.render_frame()
+
+            if mode == "human":
+                self.__show(frame)
+
+            return frame
+
+    def render_frame(self):
+        """ Draws the changed cells and status of the current game into the reused frame buffer and returns it."""
+        if self.grid_shape != self.__game.grid.shape:
+            self.create_layers()
+
+        codes = self.cell_codes()
+        x, y = np.nonzero(codes != self.drawn_codes)
+        codes = codes[x, y]
+        self.cells[y, :, x] = self.sprites[self.backgrounds[x, y], codes]
+        self.drawn_codes[x, y] = codes
+
+        status = self.status()
+        if status != self.drawn_status:
+            self.draw_status(status)
+
+        return self.frame
+
+    def cell_codes(self):
+        """ Returns the state of every cell: 0 when empty, 1 with a tile and with a robot
+        2 + 8 * tile + 2 * heading value + hold flag."""
+        grid = self.__game.grid
+        codes = self.codes
+        np.not_equal(grid, 0, out=codes)
+
+        robots = self.__game.robots
+        num_robots = len(robots)
+        x, y = robots.locations[:num_robots, 0], robots.locations[:num_robots, 1]
+        inside = (x >= 0) & (x < self.__game.GRID_W) & (y >= 0) & (y < self.__game.GRID_H)
+        x, y = x[inside], y[inside]
+        codes[x, y] = 2 + 8 * codes[x, y] + 2 * robots.headings[:num_robots][inside] + robots.holds[:num_robots][inside]
+
+        return codes
+
+    def status(self):
+        """ Returns the number shown in the status bar, None if there is no status bar."""
+        return None
+
+    def cell_backgrounds(self):
+        """ Returns the index in background_colours of the background of every cell."""
+        return np.zeros(self.__game.grid.shape, dtype=int)
+
+    def create_layers(self):
+        """ Creates the frame buffer with the grid lines and cell backgrounds and the sprites for the grid size."""
+        self.grid_shape = self.__game.grid.shape
+        grid_w, grid_h = self.__game.GRID_W, self.__game.GRID_H
+        cell_w, cell_h = self.CELL_W, self.CELL_H
+        bar_h = 0 if self.status() is None else 7 * self.text_scale
+
+        self.frame = np.empty((grid_h * cell_h + 1 + bar_h, grid_w * cell_w + 1, 3), dtype=np.uint8)
+        self.frame[...] = self.background_colour
+        self.frame[:grid_h * cell_h + 1:cell_h] = self.line_colour
+        self.frame[:grid_h * cell_h + 1, ::cell_w] = self.line_colour
+        self.cells = self.frame[:grid_h * cell_h, :grid_w * cell_w]
+        self.cells.shape = (grid_h, cell_h, grid_w, cell_w, 3)     # Raises if the cells cannot be a view.
+        self.status_bar = self.frame[grid_h * cell_h + 1:]
+
+        self.sprites = np.stack([self.create_sprites(colour) for colour in self.background_colours])
+        self.backgrounds = self.cell_backgrounds()
+        self.codes = np.zeros(self.grid_shape, dtype=int)
+        self.drawn_codes = np.full(self.grid_shape, -1)         # Draws all cells in the first frame.
+        self.drawn_status = None
+
+    def create_sprites(self, background_colour):
+        """ Returns the sprites of all cell states (see cell_codes) on the given background colour."""
+        empty_sprite = np.empty((self.CELL_H, self.CELL_W, 3), dtype=np.uint8)
+        empty_sprite[...] = background_colour
+        empty_sprite[0], empty_sprite[:, 0] = self.line_colour, self.line_colour
+
+        tile_sprite = self.create_tile_sprite(empty_sprite)
+        robot_sprites = [self.create_robot_sprite(base, heading, hold)
+                         for base in (empty_sprite, tile_sprite) for heading in Heading for hold in (False, True)]
+
+        return np.stack([empty_sprite, tile_sprite] + robot_sprites)
+
+    def create_tile_sprite(self, base):
+        """ Returns the sprite of a cell with a tile, drawn on the given cell."""
+        sprite = base.copy()
+        x = int(0.1 * self.CELL_W + 1)
+        y = int(0.1 * self.CELL_H + 1)
+        w = int(self.CELL_W / 5 * 4 + 0.5 - 1)
+        h = int(self.CELL_H / 5 * 4 + 0.5 - 1)
+        sprite[y:y + h, x:x + w] = self.tile_colour
+        return sprite
+
+    def create_robot_sprite(self, base, heading, hold_object):
+        """ Returns the sprite of a robot with the given heading and hold flag, drawn on the given cell."""
+        sprite = base.copy()
+        yy, xx = np.mgrid[:self.CELL_H, :self.CELL_W]
+        x = int(self.CELL_W * 0.5 + 0.5)
+        y = int(self.CELL_H * 0.5 + 0.5)
+        r = int(min(self.CELL_W, self.CELL_H) / 2)
+
+        sprite[(xx - x) ** 2 + (yy - y) ** 2 <= r ** 2] = self.robot_colour
+
+        dx, dy = Heading.heading_to_change(heading)
+        along = (xx - x) * dx + (yy - y) * dy
+        sprite[((xx - x) * dy - (yy - y) * dx == 0) & (along >= 0) & (along <= r)] = self.line_colour
+
+        if hold_object:
+            r_object = int(min(self.CELL_W, self.CELL_H) / 4 + 0.5)
+            sprite[(xx - x) ** 2 + (yy - y) ** 2 <= r_object ** 2] = self.object_colour
+
+        # Keep the grid lines of the cell.
+        sprite[0], sprite[:, 0] = self.line_colour, self.line_colour
+        return sprite
+
+    def draw_status(self, status):
+        """ Draws the given number in the status bar."""
+        self.status_bar[...] = self.background_colour
+
+        scale = self.text_scale
+        for i, digit in enumerate(str(int(status))[:self.status_bar.shape[1] // (4 * scale)]):
+            glyph = np.kron(DIGITS[int(digit)], np.ones((scale, scale), dtype=bool))
+            x = scale + 4 * scale * i
+            self.status_bar[scale:6 * scale, x:x + 3 * scale][glyph] = self.text_colour
+
+        self.drawn_status = status
+
+    def __show(self, frame):
+        import pygame
+
+        if self.screen is None:
+            pygame.init()
+            pygame.display.set_caption(self.maze_name)
+            self.screen = pygame.display.set_mode(frame.shape[1::-1])
+
+        pygame.surfarray.blit_array(self.screen, frame.swapaxes(0, 1))
+        pygame.display.flip()
+
+    def __controller_update(self):
+        if not self.__game_over and self.screen is not None:
+            import pygame
+
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    self.__game_over = True
+                    self.quit_game()
+
+    @property
+    def game(self):
+        return self.__game
+
+    @property
+    def game_over(self):
+        return self.__game_over
+
+    @property
+    def SCREEN_W(self):
+        return int(self.__screen_size[0])
+
+    @property
+    def SCREEN_H(self):
+        return int(self.__screen_size[1])
+
+    @property
+    def CELL_W(self):
+        return max(self.SCREEN_W // self.__game.GRID_W, 1)
+
+    @property
+    def CELL_H(self):
+        return max(self.SCREEN_H // self.__game.GRID_H, 1)
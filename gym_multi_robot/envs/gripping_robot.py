@@ -1,7 +1,8 @@
 import operator
-from random import choice
 from enum import Enum
 
+import numpy as np
+
 
 class Heading(Enum):
     """""This enum indicates the heading of the robot."""
@@ -23,8 +24,15 @@ class Heading(Enum):
             return -1, 0
 
     @staticmethod
-    def random_heading():
-        return choice(list(Heading))
+    def random_heading(np_random=None):
+        """ Returns a heading drawn with the given random generator, or a new unseeded one if not given."""
+        if np_random is None:
+            np_random = np.random.default_rng()
+        return HEADINGS[np_random.integers(0, len(HEADINGS))]
+
+
+# The headings indexed by their value, used to convert stored heading values back to headings.
+HEADINGS = tuple(Heading)
 
 
 class Rotation(Enum):
@@ -35,18 +43,74 @@ class Rotation(Enum):
 
 
 class GripperRobot:
-    """This class comprises a simple gripper robot."""
+    """This class comprises a simple gripper robot.
+    Once a robot is added to a game, its state is stored in the robot list of that game (see RobotList),
+    the location, heading and hold_object attributes then read and write that state, and setting the location keeps
+    the robot occupancy of the game up to date.
+    """
 
     # This variable stores the locations of the robot relative to (0, 0)
     relative_locations = ((-1, 0), (-1, -1), (0, -1), (1, -1), (1, 0), (1, 1), (0, 1), (-1, 1))
 
+    # The number of values in the observation of this robot.
+    observation_size = 17
+
+    # The attributes of the game read by collect_mask and fill_observations, which may differ between worlds.
+    world_attributes = ()
+
     def __init__(self, identifier, heading=Heading.NORTH, location=(0, 0)):
+        self.robot_list = None      # The robot list that stores the state of this robot, if any.
+        self.index = None           # The index of this robot in the robot list.
+
         self.hold_object = False
         self.heading = heading
 
         self.location = location
         self.identifier = identifier
 
+    @property
+    def location(self):
+        if self.robot_list is None:
+            return self._location
+        return tuple(self.robot_list.locations[self.index].tolist())
+
+    @location.setter
+    def location(self, location):
+        if self.robot_list is None:
+            self._location = location
+        else:
+            game = self.robot_list.game
+            game.occupy(self.location, -1)
+            self.robot_list.locations[self.index] = location
+            self.robot_list.checked = False
+            game.occupy(location, 1)
+
+    @property
+    def heading(self):
+        if self.robot_list is None:
+            return self._heading
+        return HEADINGS[self.robot_list.headings[self.index]]
+
+    @heading.setter
+    def heading(self, heading):
+        if self.robot_list is None:
+            self._heading = heading
+        else:
+            self.robot_list.headings[self.index] = heading.value
+
+    @property
+    def hold_object(self):
+        if self.robot_list is None:
+            return self._hold_object
+        return bool(self.robot_list.holds[self.index])
+
+    @hold_object.setter
+    def hold_object(self, hold_object):
+        if self.robot_list is None:
+            self._hold_object = hold_object
+        else:
+            self.robot_list.holds[self.index] = hold_object
+
     def pickup(self, game):
         """This method picks up a object if it is not already holding one."""
 
@@ -55,13 +119,13 @@ class GripperRobot:
 
         if not self.hold_object and game.has_tile(self.location):
             self.hold_object = True
-            game.grid[self.location[0]][self.location[1]] = False
+            game.set_tile(self.location, False)
 
     def drop(self, game):
         """This method drops an object if it is holding any."""
 
         if self.hold_object and not game.has_tile(self.location):
-            game.grid[self.location[0]][self.location[1]] = True
+            game.set_tile(self.location, True)
             self.hold_object = False
 
     def rotate(self, rotation):
@@ -85,7 +149,7 @@ class GripperRobot:
             if game.has_robot(new_location):    # TODO: maybe it is better to leave this out.
                 return
 
-            self.location = new_location
+            game.move_robot(self, new_location)
 
     def step(self, actions, game):
         """This function executes the action of this robot and returns a new observation.
@@ -107,8 +171,8 @@ class GripperRobot:
 
         move_bool = bool(round(actions[0])) and not actions[0] < 0
 
-        actions[1] = int(round(actions[1]))
-        rotate = int(actions[1] > 0) - int(actions[1] < 0)
+        rotation = int(round(actions[1]))
+        rotate = int(rotation > 0) - int(rotation < 0)
 
         self.move(move_bool, rotate, game)
 
@@ -141,3 +205,20 @@ class GripperRobot:
         locations = [(location[0] + self.location[0], location[1] + self.location[1]) for location in rel_locations]
 
         return locations
+
+    @classmethod
+    def collect_mask(cls, game, x, y):
+        """ Batched counterpart of drop, returns which drops at the given locations are collected instead of
+        put on the grid."""
+        return np.zeros(np.shape(x), dtype=bool)
+
+    @classmethod
+    def collect(cls, game, count):
+        """ Batched counterpart of drop, registers count collected objects in the game."""
+        pass
+
+    @classmethod
+    def fill_observations(cls, game, observations, locations, headings):
+        """ Batched counterpart of get_observation, fills the observation values beyond the sensor values
+        given arrays with the locations and heading values of the robots."""
+        pass
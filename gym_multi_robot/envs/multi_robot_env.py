@@ -2,9 +2,15 @@ import os
 import pickle
 
 import gym
+import numpy as np
+from gym import spaces
 from gym.utils import seeding
 
-from gym_multi_robot.envs.tiling_pattern_view_2d import TilingPatternView2D
+from gym_multi_robot.envs.game_state import ClonableState
+from gym_multi_robot.envs.grid_view_2d import create_view
+from gym_multi_robot.envs.profiler import PhaseProfiler
+from gym_multi_robot.envs.scenario import Scenario, ScenarioBank, ScenarioCache, load_scenario_file
+from gym_multi_robot.envs.shared_scenario import SharedScenarios, shared_memory
 
 
 def check_path(path):
@@ -21,17 +27,30 @@ def check_path(path):
     return path
 
 
-class MultiRobotEnv(gym.Env):
-    """ This abstract environment contains gives a template for a multi robot environment"""
+class MultiRobotEnv(gym.Env, ClonableState):
+    """ This abstract environment contains gives a template for a multi robot environment
+    All randomness of the environment comes from its own random generator, which the game uses for resets.
+    Seeding it with seed() or reset(seed=...) fixes the following episodes.
+    The state of the game and the counters of the environment can be cloned with clone_state and restored with
+    restore_state.
+    After enable_profiling the phases of the resets and steps are timed, their statistics are returned by stats()
+    and the times of the last step are given in info['phase_times'].
+    """
 
-    metadata = {'render.modes': ['human']}
+    metadata = {'render.modes': ['human', 'rgb_array']}
+
+    # The scenarios loaded by get_static_storage, shared by all environments of a process.
+    storage_cache = ScenarioCache()
+    # The scenarios in shared memory used by the environments of this process, see attach_static_storage.
+    shared_storage = None
 
     def __init__(self, seed=None):
         self.game = None
         self.game_view = None
+        self.profiler = None
 
         # Simulation related variables.
-        self._seed(seed)
+        self.seed(seed)
 
         # Just need to initialize the relevant attributes
         self._configure()
@@ -40,33 +59,96 @@ class MultiRobotEnv(gym.Env):
         if self.game_view is not None:
             self.game_view.quit_game()
 
-    def _seed(self, seed=None):
-        # TODO: Use this random seed.
+    def seed(self, seed=None):
+        """ Seeds the random generator of the environment, which the game uses for resets, returns the used seed."""
         self.np_random, seed = seeding.np_random(seed)
+        if self.game is not None:
+            self.game.np_random = self.np_random
         return [seed]
 
+    def _seed(self, seed=None):
+        return self.seed(seed)
+
+    def create_spaces(self):
+        """ Declares the spaces of the actions and observations of all robots of the game.
+        The actions of a robot are rounded: it moves, picks up and drops if the value rounds to a positive number and
+        rotates in the direction of the sign of the rounded rotation value."""
+        num_robots = self.game.robot_reset.num_robots
+        observation_size = self.game.robot_reset.robot_cls.observation_size
+
+        self.action_space = spaces.Box(-1, 1, (num_robots, 4), dtype=np.float32)
+        self.observation_space = spaces.Box(0, 1, (num_robots, observation_size), dtype=self.game.observation_dtype)
+
     def _configure(self, display=None):
         self.display = display
 
+    def enable_profiling(self, profiler=None):
+        """ Times the phases of the resets and steps with the given profiler (a new one by default), returns it."""
+        self.profiler = PhaseProfiler() if profiler is None else profiler
+        self.game.profiler = self.profiler
+        return self.profiler
+
+    def disable_profiling(self):
+        self.profiler = None
+        self.game.profiler = None
+
+    def stats(self):
+        """ Returns the statistics of the timed phases, see PhaseProfiler.stats."""
+        return {} if self.profiler is None else self.profiler.stats()
+
     def get_fitness(self):
         """ This function returns the fitness of the current game."""
-        return self.game.get_fitness()
+        return self.game_fitness()
+
+    def game_fitness(self):
+        """ Returns the fitness of the game, which is timed when profiling."""
+        profiler = self.profiler
+        if profiler is None:
+            return self.game.get_fitness()
+
+        start = profiler.clock()
+        fitness = self.game.get_fitness()
+        profiler.add('fitness', profiler.clock() - start)
+        return fitness
 
     def step(self, actions):
+        profiler = self.profiler
+        if profiler is not None:
+            profiler.last.clear()
+            start = profiler.clock()
 
         observation = self.game.update_robots(actions)
         reward = 0  # 0 during running, for speed, can be requested by env.get_fitness()
         done = self.game.game_over
         info = dict()
 
+        if profiler is not None:
+            profiler.add('step', profiler.clock() - start)
+            info['phase_times'] = dict(profiler.last)
         return observation, reward, done, info
 
-    def reset(self):
+    def reset(self, seed=None):
+        """ Resets the game, seeding the environment first if a seed is given."""
+        if seed is not None:
+            self.seed(seed)
         return self.game.reset()
 
+    def state_fields(self):
+        return super().state_fields() + self.game.state_fields()
+
+    def save_state(self, state):
+        super().save_state(state)
+        self.game.save_state(state)
+
+    def load_state(self, state):
+        super().load_state(state)
+        self.game.load_state(state)
+
     def render(self, mode='human', close=False):
+        """ Renders the game, returns the frame as (height, width, 3) uint8 array which is reused by the next render.
+        The rgb_array mode does not need a display."""
         if self.game_view is None:      # Set the pygame environment if required.
-            self.game_view = TilingPatternView2D(self.game)     # TODO: update to generic.
+            self.game_view = create_view(self.game)
 
         if close:
             self.game_view.quit_game()
@@ -79,10 +161,63 @@ class MultiRobotEnv(gym.Env):
         pass
 
     @classmethod
-    def get_static_storage(cls, game_storage_path):
+    def get_static_storage(cls, game_storage_path, scenario_index=None):
+        """ Returns the scenario stored at the given path, possibly in the samples folder, which is cached.
+        For a scenario bank the scenario with the given index is returned.
+        The grid of the scenario is read-only as it is shared by all environments using it.
+        Scenarios in the shared storage of this process (see attach_static_storage) are used without loading them."""
 
         # Check the tile paths.
         game_storage_path = check_path(game_storage_path)
-        game_storage = pickle.load(open(game_storage_path, 'rb'))
+        storage = None
+        if cls.shared_storage is not None:
+            storage = cls.shared_storage.get(os.path.realpath(game_storage_path))
+        if storage is None:
+            storage = cls.storage_cache.get(game_storage_path, cls.load_static_storage)
+
+        if isinstance(storage, ScenarioBank):
+            if scenario_index is None:
+                raise ValueError("%s is a scenario bank, a scenario index is required." % game_storage_path)
+            return storage[scenario_index]
+        if scenario_index is not None:
+            raise ValueError("%s is a single scenario, it has no scenario index." % game_storage_path)
+
+        return storage
 
-        return game_storage
+    @classmethod
+    def share_static_storage(cls, game_storage_paths):
+        """ Places the scenarios (and scenario banks) at the given paths in shared memory and returns them as
+        SharedScenarios, which should be closed to free the memory. Other processes use them after
+        attach_static_storage with their handles.
+        Returns None if shared memory is not available, the processes then load the scenarios themselves."""
+        if shared_memory is None:
+            return None
+
+        storages = {}
+        for path in game_storage_paths:
+            path = check_path(path)
+            storages[os.path.realpath(path)] = cls.storage_cache.get(path, cls.load_static_storage)
+
+        return SharedScenarios.create(storages)
+
+    @classmethod
+    def attach_static_storage(cls, handles):
+        """ Makes the environments of this process use the shared scenarios of the given handles
+        (see share_static_storage), None detaches them."""
+        if cls.shared_storage is not None and not cls.shared_storage.owner:
+            cls.shared_storage.close()
+
+        cls.shared_storage = None if handles is None else SharedScenarios.attach(handles)
+
+    @staticmethod
+    def load_static_storage(game_storage_path):
+        """ Loads the scenario at the given path.
+        Scenario and scenario bank headers (.json) are loaded with memory mapped arrays,
+        pickled game storages are still supported."""
+        if game_storage_path.endswith('.pickle'):
+            with open(game_storage_path, 'rb') as handle:
+                scenario = Scenario.from_storage(pickle.load(handle))
+            scenario.grid.flags.writeable = False
+            return scenario
+
+        return load_scenario_file(game_storage_path)
@@ -1,46 +1,446 @@
+import copyreg
+
 import numpy as np
 
+from gym_multi_robot.envs.game_state import ClonableState
+from gym_multi_robot.envs.grid_backend import GRID_BACKENDS, SparseGrid
+from gym_multi_robot.envs.robot_engine import RobotEngine
+
+
+class RobotList(list):
+    """ This list holds the robots of a game.
+    The state of the robots is stored in arrays, so that all robots can be stepped at once (see RobotEngine),
+    and the robot occupancy grid of the game is kept up to date.
+    """
+
+    def __init__(self, game, capacity=8):
+        super().__init__()
+        self.game = game
+        self.robot_cls = None       # The class of the robots, None if there are robots of different classes.
+        self.checked = False        # Whether the robots are known to be on their own location within the grid.
+
+        self.locations = np.zeros((capacity, 2), dtype=int)
+        self.headings = np.zeros(capacity, dtype=int)
+        self.holds = np.zeros(capacity, dtype=bool)
+
+    def append(self, robot):
+        index = len(self)
+        if index == len(self.headings):
+            self.__grow(max(2 * index, 1))
+
+        self.locations[index] = robot.location
+        self.headings[index] = robot.heading.value
+        self.holds[index] = robot.hold_object
+        robot.robot_list, robot.index = self, index
+        self.checked = False
+
+        self.robot_cls = type(robot) if index == 0 or self.robot_cls is type(robot) else None
+        super().append(robot)
+        self.game.occupy(robot.location, 1)
+
+    def bind_arrays(self, locations, headings, holds):
+        """ Makes this list store the state of its robots in the given arrays (for example parts of larger arrays),
+        which determine the maximum number of robots."""
+        num_robots = len(self)
+        locations[:num_robots] = self.locations[:num_robots]
+        headings[:num_robots] = self.headings[:num_robots]
+        holds[:num_robots] = self.holds[:num_robots]
+        self.locations, self.headings, self.holds = locations, headings, holds
+
+    def place(self, locations, headings):
+        """ Moves the robots to the given locations with the given heading values and makes them drop their objects
+        without placing them, writing the state arrays in place."""
+        num_robots = len(self)
+        self.locations[:num_robots] = locations
+        self.headings[:num_robots] = headings
+        self.holds[:num_robots] = False
+        self.checked = False
+
+        x, y = self.locations[:num_robots, 0], self.locations[:num_robots, 1]
+        inside = (x >= 0) & (x < self.game.GRID_W) & (y >= 0) & (y < self.game.GRID_H)
+        self.game.robot_grid.fill(0)
+        np.add.at(self.game.robot_grid, (x[inside], y[inside]), 1)
+
+    def extend(self, robots):
+        for robot in robots:
+            self.append(robot)
+
+    def __iadd__(self, robots):
+        self.extend(robots)
+        return self
+
+    def remove(self, robot):
+        self.pop(self.index(robot))
+
+    def pop(self, index=-1):
+        index = range(len(self))[index]
+        robot = self[index]
+        self.game.occupy(robot.location, -1)
+        self.__release(robot)
+        super().pop(index)
+
+        # Shift the state of the robots after the removed robot.
+        num_robots = len(self)
+        for array in (self.locations, self.headings, self.holds):
+            array[index:num_robots] = array[index + 1:num_robots + 1]
+        for i in range(index, num_robots):
+            self[i].index = i
+
+        robot_classes = {type(robot) for robot in self}
+        self.robot_cls = robot_classes.pop() if len(robot_classes) == 1 else None
+        return robot
+
+    def clear(self):
+        for robot in self:
+            self.__release(robot)
+        super().clear()
+        self.robot_cls = None
+        self.checked = False
+        self.game.robot_grid.fill(0)
+
+    def insert(self, index, robot):
+        raise TypeError("Robots can only be appended to the robot list.")
 
-class MultiRobotGame:
-    """ This class defines a multi-robot game in a grid world."""
+    def __setitem__(self, index, robot):
+        raise TypeError("Robots can only be appended to the robot list.")
+
+    def __delitem__(self, index):
+        raise TypeError("Robots can only be removed using remove or pop.")
+
+    def __contains__(self, robot):
+        """ Robots are compared on identity, which can be done without walking the list."""
+        return getattr(robot, 'robot_list', None) is self
+
+    def index(self, robot, *args):
+        if robot not in self:
+            raise ValueError("Robot is not in the robot list.")
+        return robot.index
+
+    def batchable(self):
+        """ Returns whether all robots can be stepped at once, for which they should be of the same class and each be
+        on their own location within the grid."""
+        if self.robot_cls is None:
+            return False
+
+        if not self.checked:
+            x, y = self.locations[:len(self), 0], self.locations[:len(self), 1]
+            self.checked = x.min() >= 0 and y.min() >= 0 and x.max() < self.game.GRID_W and y.max() < self.game.GRID_H \
+                and self.game.robot_grid[x, y].max() == 1
+
+        return self.checked
+
+    def __reduce__(self):
+        return copyreg.__newobj__, (type(self),), (self.__dict__, list(self))
+
+    def __setstate__(self, state):
+        attributes, robots = state
+        self.__dict__.update(attributes)
+        super().extend(robots)
+
+    @staticmethod
+    def __release(robot):
+        """ Moves the state of the robot back into the robot itself."""
+        location, heading, hold_object = robot.location, robot.heading, robot.hold_object
+        robot.robot_list, robot.index = None, None
+        robot.location, robot.heading, robot.hold_object = location, heading, hold_object
+
+    def __grow(self, capacity):
+        self.locations = np.resize(self.locations, (capacity, 2))
+        self.headings = np.resize(self.headings, capacity)
+        self.holds = np.resize(self.holds, capacity)
+
+
+class MultiRobotGame(ClonableState):
+    """ This class defines a multi-robot game in a grid world.
+    The grid of tiles and the robot occupancy grid are views on padded grids (see allocate_grids), the state of both
+    can be cloned and restored (see ClonableState).
+    """
+
+    tracks_tiles = False    # Whether tiles_changed is called for every change of the tiles, see tiles_changed.
+
+    # The view that renders the game, see grid_view_2d.create_view. The other attributes the view reads are named in
+    # view_parameters, which are fixed, and view_counters, integers that change with the steps.
+    view_entry_point = 'gym_multi_robot.envs.grid_view_2d:GridView2D'
+    view_parameters = ()
+    view_counters = ()
+
+    def __init__(self, grid_size, num_tiles, robot_reset, world_reset, grid_backend='dense'):
+        if grid_backend not in GRID_BACKENDS:
+            raise ValueError("Unknown grid backend %s, should be one of %s." % (grid_backend,
+                                                                               ', '.join(GRID_BACKENDS)))
 
-    def __init__(self, grid_size, num_tiles, robot_reset, world_reset):
         self.grid_size = grid_size
         self.num_tiles = num_tiles
         self.world_reset = world_reset
-        self.grid = np.zeros((self.GRID_W, self.GRID_H), dtype=int)
+        self.grid_backend = grid_backend    # How the tiles are stored, see GRID_BACKENDS and allocate_grids.
+        self.allocate_grids()
         self.robot_reset = robot_reset
-        self.robots = []
+        self.np_random = np.random.default_rng()   # The random generator used by the resets.
+        self.robots = RobotList(self)
+        self.robot_engine = None
+        self.batched = True                 # Whether all robots should be stepped at once if possible.
+        self.array_observations = False     # Whether observations are returned as array instead of lists.
+        self.observation_dtype = np.int8
+        self.observations = np.zeros((0, 0), dtype=self.observation_dtype)
         self.done = False
+        self.profiler = None                # Times the phases of the resets and steps if set, see PhaseProfiler.
+        self.tile_listeners = []
+
+    def allocate_grids(self):
+        """ Allocates the padded grids for the current grid size. Their border of one location allows the observations
+        of all robots to be looked up at once (see RobotEngine). The sparse backend has a SparseGrid of tiles instead
+        of a padded one, of which the robots are stepped one after another. The robot grid of the compact backends
+        counts the robots in int16."""
+        padded_shape = (self.GRID_W + 2, self.GRID_H + 2)
+        if self.grid_backend == 'sparse':
+            self.padded_grid = None
+            self.sparse_grid = SparseGrid(self.grid_size)
+        else:
+            self.padded_grid = np.zeros(padded_shape, dtype=np.uint8 if self.grid_backend == 'uint8' else int)
+
+        self.padded_robot_grid = np.zeros(padded_shape, dtype=int if self.grid_backend == 'dense' else np.int16)
+        self.__create_views()
+
+    def bind_grids(self, padded_grid, padded_robot_grid):
+        """ Makes this game use the given padded grids (for example parts of larger arrays), copying the current grids
+        into them."""
+        if self.padded_grid is None:
+            raise ValueError("Games with a sparse grid cannot use padded grids.")
+
+        padded_grid[...] = self.padded_grid
+        padded_robot_grid[...] = self.padded_robot_grid
+        self.padded_grid, self.padded_robot_grid = padded_grid, padded_robot_grid
+        self.__create_views()
+
+    def __create_views(self):
+        self.__grid = self.sparse_grid if self.padded_grid is None else self.padded_grid[1:-1, 1:-1]
+        self.robot_grid = self.padded_robot_grid[1:-1, 1:-1]    # Number of robots on each location.
+
+    @property
+    def grid(self):
+        return self.__grid
+
+    @grid.setter
+    def grid(self, grid):
+        """ Copies the given grid into the grid of this game, which is resized if needed."""
+        if np.shape(grid) != self.__grid.shape:
+            self.grid_size = np.shape(grid)
+            self.allocate_grids()
+            for robot in self.robots:
+                self.occupy(robot.location, 1)
+            self.robots.checked = False
+
+        if self.padded_grid is None:
+            self.__grid.assign(grid)
+        else:
+            np.copyto(self.__grid, grid, casting='unsafe')
+        self.count_tiles()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_MultiRobotGame__grid'], state['robot_grid']
+        # Listeners belong to the objects that follow this game, not to its copies.
+        state['tile_listeners'] = []
+        state.pop('tracks_tiles', None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.__create_views()
+
+    def state_fields(self):
+        """ The tiles are stored as uint8 and the locations as int16, which fits all grid sizes in use.
+        A sparse grid is stored as the locations (as int32) and values of its tiles, with room for num_tiles tiles or
+        the current number of tiles if there are more."""
+        num_robots = len(self.robots)
+        if self.padded_grid is None:
+            capacity = max(self.num_tiles, len(self.grid.tiles))
+            grid_fields = [('tile_locations', np.int32, (capacity, 2)), ('tile_values', np.uint8, (capacity,)),
+                           ('num_grid_tiles', np.int32, ())]
+        else:
+            grid_fields = [('grid', np.uint8, self.grid.shape)]
+
+        return super().state_fields() + grid_fields + [('locations', np.int16, (num_robots, 2)),
+                                                       ('headings', np.int8, (num_robots,)),
+                                                       ('holds', np.bool_, (num_robots,)), ('done', np.bool_, ())]
+
+    def save_state(self, state):
+        super().save_state(state)
+        num_robots = len(self.robots)
+        if self.padded_grid is None:
+            tiles = self.grid.tiles
+            if tiles:
+                state['tile_locations'][:len(tiles)] = list(tiles)
+                state['tile_values'][:len(tiles)] = list(tiles.values())
+            state['num_grid_tiles'] = len(tiles)
+        else:
+            state['grid'] = self.grid
+        state['locations'] = self.robots.locations[:num_robots]
+        state['headings'] = self.robots.headings[:num_robots]
+        state['holds'] = self.robots.holds[:num_robots]
+        state['done'] = self.done
+
+    def load_state(self, state):
+        super().load_state(state)
+        if self.padded_grid is None:
+            num_grid_tiles = int(state['num_grid_tiles'])
+            tiles = self.grid.tiles
+            tiles.clear()
+            tiles.update(zip(map(tuple, state['tile_locations'][:num_grid_tiles].tolist()),
+                             state['tile_values'][:num_grid_tiles].tolist()))
+        else:
+            self.grid[...] = state['grid']
+        self.robots.place(state['locations'], state['headings'])
+        self.robots.holds[:len(self.robots)] = state['holds']
+        self.done = bool(state['done'])
 
     def update_robots(self, actions):
-        if len(actions) is not len(self.robots):
+        """ Executes the given actions, one for each robot, and returns the new observations of the robots.
+        If array_observations is set these are returned as (num_robots, observation_size) array, which is reused. """
+        if len(actions) != len(self.robots):
             raise TypeError("Should give an action for each robot.")
 
-        return [self.robots[i].step(actions[i], self) for i in range(len(actions))]
+        profiler = self.profiler
+        if not self.batchable():
+            if profiler is not None:
+                profiler.start()
+            observations = [self.robots[i].step(actions[i], self) for i in range(len(actions))]
+            if profiler is not None:
+                profiler.lap('sequential_step')
+            return self.__observation_array(observations) if self.array_observations else observations
+
+        num_robots = len(self.robots)
+        observations = self.__observation_array()
+        collected = self.__robot_engine().step(self, self.padded_grid[None], self.padded_robot_grid[None],
+                                               self.robots.locations[None, :num_robots],
+                                               self.robots.headings[None, :num_robots],
+                                               self.robots.holds[None, :num_robots], actions, observations[None])
+        if collected[0]:
+            self.robots.robot_cls.collect(self, int(collected[0]))
+        if self.tracks_tiles:
+            x, y, changes = self.robot_engine.tile_changes
+            if changes.any():
+                self.tiles_changed(x[0], y[0], changes[0])
+        if profiler is not None:
+            profiler.lap('tiles')
+
+        return observations if self.array_observations else observations.tolist()
 
     def reset(self):
+        profiler = self.profiler
+        if profiler is not None:
+            profiler.start()
+
         self.world_reset.reset(self)
         self.robot_reset.reset(self)
-        return [robot.get_observation(self) for robot in self.robots]
+        observations = self.get_observations() if self.array_observations else self.get_observations().tolist()
+
+        if profiler is not None:
+            profiler.lap('reset')
+        return observations
+
+    def get_observations(self):
+        """ Returns the observations of all robots as (num_robots, observation_size) array, which is reused."""
+        if not self.batchable():
+            return self.__observation_array([robot.get_observation(self) for robot in self.robots])
+
+        num_robots = len(self.robots)
+        observations = self.__observation_array()
+        self.__robot_engine().observe(self, self.padded_grid[None], self.padded_robot_grid[None],
+                                      self.robots.locations[None, :num_robots],
+                                      self.robots.headings[None, :num_robots],
+                                      self.robots.holds[None, :num_robots], observations[None])
+        return observations
+
+    def batchable(self):
+        """ Returns whether the robots are stepped at once, which needs a padded grid."""
+        return self.batched and self.padded_grid is not None and self.robots.batchable()
+
+    def __robot_engine(self):
+        if self.robot_engine is None or self.robot_engine.robot_cls is not self.robots.robot_cls:
+            self.robot_engine = RobotEngine(self.robots.robot_cls)
+
+        return self.robot_engine
+
+    def __observation_array(self, observations=None):
+        """ Returns the reused observation array, filled with the given observations if any."""
+        if observations is None:
+            shape = (len(self.robots), self.robots.robot_cls.observation_size)
+        else:
+            shape = np.shape(observations)
+
+        if self.observations.shape != shape or self.observations.dtype != self.observation_dtype:
+            self.observations = np.zeros(shape, dtype=self.observation_dtype)
+
+        if observations is not None:
+            self.observations[...] = observations
+
+        return self.observations
 
     def add_robot(self, robot):
         self.robots.append(robot)
 
+    def move_robot(self, robot, location):
+        """ Moves the given robot to the given location, the location setter of the robot keeps track of the
+        occupancy if it is part of a game."""
+        robot.location = location
+
+    def occupy(self, location, count):
+        """ Adds count robots to the occupancy of the given location, locations outside the grid are not tracked."""
+        if self.inside_grid(location):
+            self.robot_grid[location[0], location[1]] += count
+
+    def set_tile(self, location, value):
+        """ Sets the tile value of the given location within the grid."""
+        x, y = location[0], location[1]
+        change = int(value) - int(self.grid[x, y])
+        self.grid[x, y] = value
+
+        if self.tracks_tiles and change:
+            self.tiles_changed(x, y, change)
+
+    def tiles_changed(self, x, y, changes):
+        """ This function is called with the locations (or arrays of locations) of which the tile value changed by
+        the given amount, if the game tracks tiles, for every change made with set_tile or by a step. The arrays of a
+        step hold the locations of all robots, with a change of 0 where nothing changed. Tiles written directly into
+        the grid are not tracked. The changes are passed on to the tile listeners, games that extend
+        this function should call it."""
+        for listener in self.tile_listeners:
+            listener(x, y, changes)
+
+    def add_tile_listener(self, listener):
+        """ Makes the given function be called with the changes of the tiles like tiles_changed, the game then tracks
+        its tiles."""
+        self.tile_listeners.append(listener)
+        self.tracks_tiles = True
+
+    def remove_tile_listener(self, listener):
+        self.tile_listeners.remove(listener)
+        if not self.tile_listeners:
+            del self.tracks_tiles   # Back to the tracking of the class.
+
+    def count_tiles(self):
+        """ This function is called when a new grid is assigned, games that track tiles count them again."""
+        pass
+
     def valid_initial_drop(self, location):
         return not self.has_tile(location)
 
+    def initial_drop_mask(self):
+        """ Returns a grid that marks the locations that are valid initial drops (see valid_initial_drop)."""
+        return self.grid == 0
+
+    def valid_initial_drops(self, x, y):
+        """ Returns which of the locations with the given x and y coordinates are valid initial drops."""
+        return self.grid[x, y] == 0
+
     def has_tile(self, location):
         """ Returns true if the location has a grid."""
-        return self.inside_grid(location) and bool(self.grid[location[0]][location[1]])
+        return self.inside_grid(location) and bool(self.grid[location[0], location[1]])
 
     def has_robot(self, location):
         """" Returns true if the given location contains a robot."""
-        for robot in self.robots:
-            if location == robot.location:
-                return True
-
-        return False
+        return self.inside_grid(location) and bool(self.robot_grid[location[0], location[1]])
 
     def inside_grid(self, location):
         """ Returns whether the the given locations is within the grid."""
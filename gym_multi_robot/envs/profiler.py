@@ -0,0 +1,97 @@
+import json
+import math
+import time
+
+
+class PhaseProfiler:
+    """ This class counts the calls and the time spent in the phases of the resets and steps of a game:
+        reset: resetting the world and the robots and making the first observations.
+        actions: picking up, dropping and rotating (batched steps).
+        movement: resolving the moves and collisions of the robots (batched steps).
+        observations: making the observations after a step (batched steps).
+        tiles: counting the collected and changed tiles after a step (batched steps).
+        sequential_step: stepping the robots one after another, when they cannot be batched.
+        fitness: computing the fitness.
+        step: the whole step of the environment.
+    Per phase the number of calls, the total, minimum and maximum time and a histogram of the times in power of two
+    buckets of nanoseconds are kept. The last time of every phase is kept in last, which the environments clear at
+    the start of every step.
+    """
+
+    NUM_BUCKETS = 40    # The last bucket holds all times of 2^38 ns (about 4.6 minutes) and more.
+
+    def __init__(self):
+        self.clock = time.perf_counter
+        self.phases = {}        # The count, total, minimum, maximum and histogram of every phase.
+        self.last = {}
+        self.start_time = 0.0
+
+    def start(self):
+        """ Starts timing the phases that are ended with lap."""
+        self.start_time = self.clock()
+
+    def lap(self, phase):
+        """ Adds the time since the start or the last lap to the given phase."""
+        now = self.clock()
+        self.add(phase, now - self.start_time)
+        self.start_time = now
+
+    def add(self, phase, seconds):
+        """ Adds a call of the given phase that took the given time."""
+        entry = self.phases.get(phase)
+        if entry is None:
+            entry = self.phases[phase] = [0, 0.0, math.inf, 0.0, [0] * self.NUM_BUCKETS]
+
+        entry[0] += 1
+        entry[1] += seconds
+        if seconds < entry[2]:
+            entry[2] = seconds
+        if seconds > entry[3]:
+            entry[3] = seconds
+        entry[4][min(int(seconds * 1e9).bit_length(), self.NUM_BUCKETS - 1)] += 1
+        self.last[phase] = seconds
+
+    def stats(self):
+        """ Returns the statistics of every phase as dictionary, times are in seconds.
+        The histogram maps the upper bound in nanoseconds of every non empty bucket to its count, bucket 2^k holds
+        the times from 2^(k - 1) up to 2^k ns."""
+        return {phase: {
+            'count': count,
+            'total': total,
+            'mean': total / count,
+            'min': minimum,
+            'max': maximum,
+            'histogram': {str(2 ** bucket): n for bucket, n in enumerate(histogram) if n},
+        } for phase, (count, total, minimum, maximum, histogram) in self.phases.items()}
+
+    def clear(self):
+        """ Removes all counts and times."""
+        self.phases.clear()
+        self.last.clear()
+
+    def write_json(self, path, **extra):
+        """ Writes the statistics to the given json file, with the given extra entries (such as the generation)."""
+        with open(path, 'w') as handle:
+            json.dump(dict(extra, phases=self.stats()), handle, indent=2)
+
+
+def merge_stats(stats, other):
+    """ Returns the statistics (see PhaseProfiler.stats) of both given statistics together."""
+    merged = {phase: dict(phase_stats, histogram=dict(phase_stats['histogram']))
+              for phase, phase_stats in stats.items()}
+
+    for phase, phase_stats in other.items():
+        if phase not in merged:
+            merged[phase] = dict(phase_stats, histogram=dict(phase_stats['histogram']))
+            continue
+
+        entry = merged[phase]
+        entry['count'] += phase_stats['count']
+        entry['total'] += phase_stats['total']
+        entry['mean'] = entry['total'] / entry['count']
+        entry['min'] = min(entry['min'], phase_stats['min'])
+        entry['max'] = max(entry['max'], phase_stats['max'])
+        for bucket, count in phase_stats['histogram'].items():
+            entry['histogram'][bucket] = entry['histogram'].get(bucket, 0) + count
+
+    return merged
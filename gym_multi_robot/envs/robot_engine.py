@@ -0,0 +1,207 @@
+import numpy as np
+
+from gym_multi_robot.envs.gripping_robot import GripperRobot
+
+# The change in location when moving forward, indexed by heading value (see Heading.heading_to_change).
+HEADING_CHANGES = np.array([(0, -1), (1, 0), (0, 1), (-1, 0)])
+
+# The location of the robot and the locations it observes relative to its location, indexed by heading value
+# (see GripperRobot.generate_observed_locations).
+OBSERVED_OFFSETS = np.array([[(0, 0)] + [GripperRobot.relative_locations[(2 * heading + i) % 8] for i in range(5)]
+                             for heading in range(4)])
+
+
+class GridTables:
+    """ This class holds the lookup tables for a grid that is padded with a border of one location.
+    Locations are indexed in the flattened padded grid, so (x, y) has index (x + 1) * (height + 2) + y + 1.
+        moves: the index offset of the location in front of the robot per heading value.
+        sensed: the index offsets of the location of the robot and its 5 observed locations per heading value.
+        obstacles: whether an index is on the border of the grid.
+    """
+
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+
+        strides = np.array([height + 2, 1])
+        self.origin = height + 3
+        self.moves = HEADING_CHANGES @ strides
+        self.sensed = OBSERVED_OFFSETS @ strides
+
+        obstacles = np.ones((width + 2, height + 2), dtype=bool)
+        obstacles[1:-1, 1:-1] = False
+        self.obstacles = obstacles.ravel()
+
+    def indices(self, locations):
+        """ Returns the indices of the given (..., 2) locations."""
+        return locations[..., 0] * (self.height + 2) + locations[..., 1] + self.origin
+
+    def locations(self, indices):
+        """ Returns the x and y coordinate of the given indices."""
+        return np.divmod(indices - self.origin, self.height + 2)
+
+
+class RobotEngine:
+    """ This class executes the actions of all robots in one or more equally sized worlds at once.
+    The worlds are given as (num_worlds, width + 2, height + 2) contiguous tile and robot count grids that are padded
+    with a border of one location, and the robots are stored as a structure of arrays:
+        locations: (num_worlds, num_robots, 2) robot locations.
+        headings: (num_worlds, num_robots) robot heading values.
+        holds: (num_worlds, num_robots) whether the robot holds an object.
+    The result is the same as stepping the robots one after another with GripperRobot.step, including the order in
+    which moves are resolved and the observations, which each robot makes right after its own step.
+    This requires every robot to be on its own location within the grid.
+    Robot classes can change the drop and observation behaviour through collect_mask, collect and fill_observations.
+    If the game tracks tiles, the (num_worlds, num_robots) x, y and change arrays of the tile changes of the last step
+    are kept in tile_changes, with a change for the location of every robot before its move (0 if it did not change).
+    If the game has a profiler, the actions, movement and observations phases of a step are timed.
+    """
+
+    NO_ROBOT = -1                       # Marks a location without a robot in the old location map.
+    NO_MOVE = np.iinfo(np.int64).max    # Marks a location without a robot in the new location map.
+
+    def __init__(self, robot_cls):
+        self.robot_cls = robot_cls
+        self.tables = None
+        self.tile_changes = None
+
+        # Maps from world locations to robot numbers, which are only filled during a step.
+        self.old_map = np.zeros(0, dtype=np.int64)
+        self.new_map = np.zeros(0, dtype=np.int64)
+
+    def step(self, game, grids, robot_grids, locations, headings, holds, actions, observations):
+        """ Executes the actions of all robots, updating all given arrays in place.
+        The game gives the settings of the worlds (such as the target area), see WorldSettings for several worlds.
+        The (num_worlds, num_robots, observation_size) observations are written to the given array,
+        the number of collected objects per world is returned.
+        """
+        profiler = game.profiler
+        if profiler is not None:
+            profiler.start()
+
+        num_worlds, num_robots = headings.shape
+        tables = self.__tables(grids.shape)
+        old_map, new_map = self.__maps(grids.size)
+
+        # Robots are numbered over all worlds, as are the locations.
+        numbers = np.arange(num_worlds * num_robots).reshape(headings.shape)
+        world_offsets = np.arange(0, grids.size, grids[0].size)[:, None]
+        tiles_flat = grids.reshape(-1)
+        robots_flat = robot_grids.reshape(-1)
+
+        # An action is active if it rounds to a non zero value and is not negative (see GripperRobot.step).
+        actions = np.asarray(actions, dtype=float).reshape((num_worlds, num_robots, 4))
+        rounded = np.round(actions)
+        active = (rounded != 0) & (actions >= 0)
+
+        local_cells = tables.indices(locations)
+        cells = local_cells + world_offsets
+
+        # Pickup before drop, both at the location of the robot before moving.
+        old_values = tiles_flat[cells]
+        old_tiles = old_values != 0
+        picked = active[..., 2] & ~holds & old_tiles
+        holding = holds | picked
+        tiles = old_tiles & ~picked
+        dropped = active[..., 3] & holding & ~tiles
+        holds[...] = holding & ~dropped
+
+        collected = self.robot_cls.collect_mask(game, locations[..., 0], locations[..., 1]) & dropped
+        changed = picked | dropped
+        new_values = np.where(changed, (tiles | dropped) & ~collected, old_values)
+        tiles_flat[cells] = new_values
+
+        if game.tracks_tiles:
+            self.tile_changes = (locations[..., 0].copy(), locations[..., 1].copy(),
+                                 np.subtract(new_values, old_values, dtype=int))
+
+        headings[...] = (headings + np.sign(rounded[..., 1]).astype(int)) % 4
+
+        if profiler is not None:
+            profiler.lap('actions')
+
+        # Resolve the moves, a robot is blocked by robots before it on their new location
+        # and by robots after it on their old location.
+        move_offsets = tables.moves[headings]
+        targets = cells + move_offsets
+        candidates = active[..., 0] & ~tables.obstacles[local_cells + move_offsets]
+
+        old_map[cells] = numbers
+        candidates &= old_map[targets] <= numbers
+
+        # Each iteration fixes the move of at least one more robot, starting with the first.
+        moved = candidates
+        while True:
+            new_cells = np.where(moved, targets, cells)
+            np.minimum.at(new_map, new_cells.ravel(), numbers.ravel())
+
+            resolved = candidates & (new_map[targets] >= numbers)
+            if np.array_equal(resolved, moved):
+                break
+
+            new_map[new_cells] = self.NO_MOVE
+            moved = resolved
+
+        robots_flat[cells] -= moved
+        robots_flat[new_cells] += moved
+        locations[..., 0], locations[..., 1] = tables.locations(new_cells - world_offsets)
+
+        if profiler is not None:
+            profiler.lap('movement')
+
+        # Observe the world as it is right after the step of each robot: robots after it have not acted yet.
+        offsets = tables.sensed[headings]
+        sensed = new_cells[..., None] + offsets
+        changed_by = old_map[sensed]
+        later = changed_by > numbers[..., None]
+
+        self.__write_observations(game, observations, locations, headings, holds,
+                                  tables.obstacles[(new_cells - world_offsets)[..., None] + offsets],
+                                  np.where(later, old_tiles.ravel()[changed_by], tiles_flat[sensed] != 0),
+                                  later | (new_map[sensed] <= numbers[..., None]))
+
+        old_map[cells] = self.NO_ROBOT
+        new_map[new_cells] = self.NO_MOVE
+
+        if profiler is not None:
+            profiler.lap('observations')
+
+        return collected.sum(axis=1)
+
+    def observe(self, game, grids, robot_grids, locations, headings, holds, observations):
+        """ Writes the (num_worlds, num_robots, observation_size) observations of all robots to the given array."""
+        tables = self.__tables(grids.shape)
+        local_cells = tables.indices(locations)
+        local_sensed = local_cells[..., None] + tables.sensed[headings]
+        sensed = local_sensed + np.arange(0, grids.size, grids[0].size)[:, None, None]
+
+        self.__write_observations(game, observations, locations, headings, holds, tables.obstacles[local_sensed],
+                                  grids.reshape(-1)[sensed] != 0, robot_grids.reshape(-1)[sensed] != 0)
+
+    def __write_observations(self, game, observations, locations, headings, holds, obstacles, tiles, robots):
+        """ Writes the observations given whether the location of the robot and its observed locations are obstacles,
+        have tiles or have robots."""
+        num_worlds, num_robots = headings.shape
+        sensors = np.stack((obstacles, tiles, robots), axis=-1)
+
+        observations[..., 0] = holds
+        observations[..., 1] = tiles[..., 0]
+        observations[..., 2:GripperRobot.observation_size] = sensors[..., 1:, :].reshape((num_worlds, num_robots, 15))
+
+        self.robot_cls.fill_observations(game, observations, locations, headings)
+
+    def __tables(self, shape):
+        """ Returns the tables of the padded grids with the given shape."""
+        width, height = shape[-2] - 2, shape[-1] - 2
+        if self.tables is None or (self.tables.width, self.tables.height) != (width, height):
+            self.tables = GridTables(width, height)
+
+        return self.tables
+
+    def __maps(self, size):
+        """ Returns the old and new location maps, which are empty between steps."""
+        if self.old_map.size != size:
+            self.old_map = np.full(size, self.NO_ROBOT, dtype=np.int64)
+            self.new_map = np.full(size, self.NO_MOVE, dtype=np.int64)
+
+        return self.old_map, self.new_map
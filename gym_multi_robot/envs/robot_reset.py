@@ -1,6 +1,6 @@
-import random
+import numpy as np
 
-from gym_multi_robot.envs.gripping_robot import Heading
+from gym_multi_robot.envs.gripping_robot import HEADINGS
 
 
 class RobotReset:
@@ -23,6 +23,19 @@ class RobotReset:
         """ This function adds the robot to the given game."""
         game.robots.append(robot)
 
+    def place_robots(self, game, locations, headings):
+        """ This function puts robots without objects at the given locations with the given headings.
+        The robots of the game are reused if they are the same robots that a reset would create."""
+        robots = game.robots
+        if len(robots) == len(locations) and robots.robot_cls is self.robot_cls \
+                and all(robot.identifier == i for i, robot in enumerate(robots)):
+            robots.place(locations, [heading.value for heading in headings])
+            return
+
+        self.clear_robots(game)
+        for i in range(len(locations)):
+            self.add_robot(game, self.robot_cls(i, headings[i], locations[i]))
+
 
 class StaticRobotReset(RobotReset):
     """ This class resets the robots by putting them on the grid at predefined locations."""
@@ -31,30 +44,28 @@ class StaticRobotReset(RobotReset):
         super().__init__(robot_cls)
         self.robot_pos = robot_pos
 
-    def reset(self, game):
-        self.clear_robots(game)
+    @property
+    def num_robots(self):
+        return len(self.robot_pos)
 
-        for i in range(len(self.robot_pos)):
-            robot = self.robot_cls(i, self.robot_pos[i][1], self.robot_pos[i][0])
-            self.add_robot(game, robot)
+    def reset(self, game):
+        self.place_robots(game, [pos[0] for pos in self.robot_pos], [pos[1] for pos in self.robot_pos])
 
 
 class RandomRobotReset(RobotReset):
-    """ This class resets the robots by randomly putting them in the grid."""
+    """ This class resets the robots by randomly putting them in the grid, each on its own location,
+    using the random generator of the game."""
 
     def __init__(self, robot_cls, num_robots):
         super().__init__(robot_cls)
         self.num_robots = num_robots
 
     def reset(self, game):
-        self.clear_robots(game)
+        if self.num_robots > game.GRID_W * game.GRID_H:
+            raise ValueError("Cannot place %d robots on %d locations." % (self.num_robots, game.GRID_W * game.GRID_H))
 
-        for i in range(self.num_robots):
-            while True:  # Return statement breaks the loop.
-                rand_loc = (random.randrange(0, game.GRID_W), random.randrange(0, game.GRID_H))
+        cells = game.np_random.choice(game.GRID_W * game.GRID_H, self.num_robots, replace=False)
+        x, y = np.unravel_index(cells, game.grid.shape)
+        headings = game.np_random.integers(0, len(HEADINGS), self.num_robots)
 
-                if not game.has_robot(rand_loc):
-                    rand_heading = Heading.random_heading()
-                    robot = self.robot_cls(i, rand_heading, rand_loc)
-                    self.add_robot(game, robot)
-                    break
+        self.place_robots(game, list(zip(x.tolist(), y.tolist())), [HEADINGS[heading] for heading in headings])
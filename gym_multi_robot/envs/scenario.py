@@ -0,0 +1,299 @@
+import argparse
+import collections
+import json
+import os
+import pickle
+
+import numpy as np
+
+from gym_multi_robot.envs.gripping_robot import Heading
+
+SCENARIO_FORMAT = 'gym_multi_robot.scenario'
+SCENARIO_VERSION = 1
+BANK_FORMAT = 'gym_multi_robot.scenario_bank'
+BANK_VERSION = 1
+
+
+def read_header(header_path, header_format=None):
+    """ Reads the json header at the given path and checks its format (if given) and version."""
+    with open(header_path) as handle:
+        header = json.load(handle)
+
+    versions = {SCENARIO_FORMAT: SCENARIO_VERSION, BANK_FORMAT: BANK_VERSION}
+    if header.get('format') not in versions or header_format not in (None, header['format']):
+        raise ValueError("%s is not a %s file." % (header_path, header_format or 'scenario'))
+    if header.get('version', 0) > versions[header['format']]:
+        raise ValueError("%s has version %s, only versions up to %d are supported."
+                         % (header_path, header.get('version'), versions[header['format']]))
+
+    return header
+
+
+def write_array(path, array):
+    """ Writes the array to the given .npy path, replacing rather than overwriting the file, so arrays that are
+    memory mapped keep their content."""
+    with open(path + '.tmp', 'wb') as handle:
+        np.save(handle, array)
+    os.replace(path + '.tmp', path)
+
+
+def load_scenario_file(header_path, mmap_mode='r'):
+    """ Loads the scenario or scenario bank of the given header path."""
+    if read_header(header_path)['format'] == BANK_FORMAT:
+        return ScenarioBank.load(header_path, mmap_mode)
+
+    return Scenario.load(header_path, mmap_mode)
+
+
+class Scenario:
+    """ This class stores a fixed layout of a game: the grid, the robot positions and the settings of the game.
+    A scenario is stored without pickle as a small json header and a raw .npy grid next to it, so the grid can be
+    memory mapped and shared through the page cache by all processes that load it.
+    The header looks like:
+        {"format": "gym_multi_robot.scenario", "version": 1, "game_type": "tiling_pattern",
+         "grid": "tiles7x5.grid.npy", "robots": [[x, y, heading value], ...],
+         "lattice_size": 2, "target_area": null, "num_tiles": null}
+    """
+
+    TILING_PATTERN = 'tiling_pattern'
+    FORAGING = 'foraging'
+
+    def __init__(self, game_type, grid, robot_pos, lattice_size=None, target_area=None, num_tiles=None):
+        self.game_type = game_type
+        self.grid = grid
+        self.robot_pos = robot_pos          # List of (location, heading) pairs.
+        self.lattice_size = lattice_size
+        self.target_area = target_area
+        self.num_tiles = num_tiles
+
+    @classmethod
+    def from_storage(cls, storage):
+        """ Creates the scenario of a TilingPatternGameStorage or ForagingGameStorage."""
+        if hasattr(storage, 'lattice_size'):
+            return cls(cls.TILING_PATTERN, storage.grid, storage.robot_pos, lattice_size=storage.lattice_size)
+
+        return cls(cls.FORAGING, storage.grid, storage.robot_pos, target_area=tuple(storage.target_area),
+                   num_tiles=storage.num_tiles)
+
+    @staticmethod
+    def grid_path(header_path):
+        """ Returns the path of the grid that belongs to the given header path."""
+        return os.path.splitext(header_path)[0] + '.grid.npy'
+
+    def save(self, header_path):
+        """ Writes the scenario to the given header path (.json) and its grid next to it."""
+        grid_path = self.grid_path(header_path)
+        write_array(grid_path, np.asarray(self.grid, dtype=np.uint8))
+
+        header = {
+            'format': SCENARIO_FORMAT,
+            'version': SCENARIO_VERSION,
+            'game_type': self.game_type,
+            'grid': os.path.basename(grid_path),
+            'robots': self.robot_array(self.robot_pos).tolist(),
+            'lattice_size': self.lattice_size,
+            'target_area': None if self.target_area is None else [int(value) for value in self.target_area],
+            'num_tiles': self.num_tiles,
+        }
+        with open(header_path, 'w') as handle:
+            json.dump(header, handle)
+
+    @classmethod
+    def load(cls, header_path, mmap_mode='r'):
+        """ Loads the scenario of the given header path, the grid is memory mapped (read-only) by default."""
+        header = read_header(header_path, SCENARIO_FORMAT)
+        grid = np.load(os.path.join(os.path.dirname(header_path), header['grid']), mmap_mode=mmap_mode)
+        target_area = None if header['target_area'] is None else tuple(header['target_area'])
+
+        return cls(header['game_type'], grid, cls.robot_positions(header['robots']), header['lattice_size'],
+                   target_area, header['num_tiles'])
+
+    @staticmethod
+    def robot_array(robot_pos):
+        """ Returns the given (location, heading) pairs as (num_robots, 3) array of x, y and heading value."""
+        return np.array([(location[0], location[1], Heading(heading).value) for location, heading in robot_pos],
+                        dtype=np.int16).reshape((-1, 3))
+
+    @staticmethod
+    def robot_positions(robot_array):
+        """ Returns the (location, heading) pairs of the given x, y and heading value rows."""
+        return [((x, y), Heading(heading)) for x, y, heading in np.asarray(robot_array).tolist()]
+
+
+class ScenarioBank:
+    """ This class stores a bank of scenarios of the same game type, grid size and number of robots.
+    The bank is stored as a json header with the settings and the seed of every scenario, a (count, width, height)
+    stacked grid file and a (count, num_robots, 3) robot file. Both are memory mapped, so selecting a scenario by its
+    index reads only that scenario.
+    """
+
+    def __init__(self, game_type, grids, robots, lattice_size=None, target_area=None, num_tiles=None, seeds=None):
+        self.game_type = game_type
+        self.grids = grids
+        self.robots = robots
+        self.lattice_size = lattice_size
+        self.target_area = target_area
+        self.num_tiles = num_tiles
+        self.seeds = seeds
+
+    def __len__(self):
+        return len(self.grids)
+
+    def __getitem__(self, index):
+        """ Returns the scenario with the given index."""
+        return Scenario(self.game_type, self.grids[index], Scenario.robot_positions(self.robots[index]),
+                        self.lattice_size, self.target_area, self.num_tiles)
+
+    @classmethod
+    def from_scenarios(cls, scenarios, seeds=None):
+        """ Stacks the given scenarios, which should all have the same settings, grid size and number of robots."""
+        first = scenarios[0]
+        return cls(first.game_type, np.stack([np.asarray(scenario.grid, dtype=np.uint8) for scenario in scenarios]),
+                   np.stack([Scenario.robot_array(scenario.robot_pos) for scenario in scenarios]),
+                   first.lattice_size, first.target_area, first.num_tiles, seeds)
+
+    @staticmethod
+    def grids_path(header_path):
+        """ Returns the path of the stacked grids that belong to the given header path."""
+        return os.path.splitext(header_path)[0] + '.grids.npy'
+
+    @staticmethod
+    def robots_path(header_path):
+        """ Returns the path of the stacked robot positions that belong to the given header path."""
+        return os.path.splitext(header_path)[0] + '.robots.npy'
+
+    def save(self, header_path):
+        """ Writes the bank to the given header path (.json) and its grids and robots next to it."""
+        write_array(self.grids_path(header_path), np.asarray(self.grids, dtype=np.uint8))
+        write_array(self.robots_path(header_path), np.asarray(self.robots, dtype=np.int16))
+
+        header = {
+            'format': BANK_FORMAT,
+            'version': BANK_VERSION,
+            'game_type': self.game_type,
+            'count': len(self),
+            'grid_size': list(np.shape(self.grids)[1:]),
+            'num_robots': int(np.shape(self.robots)[1]),
+            'grids': os.path.basename(self.grids_path(header_path)),
+            'robots': os.path.basename(self.robots_path(header_path)),
+            'lattice_size': self.lattice_size,
+            'target_area': None if self.target_area is None else [int(value) for value in self.target_area],
+            'num_tiles': self.num_tiles,
+            'seeds': None if self.seeds is None else [int(seed) for seed in self.seeds],
+        }
+        with open(header_path, 'w') as handle:
+            json.dump(header, handle)
+
+    @classmethod
+    def load(cls, header_path, mmap_mode='r'):
+        """ Loads the bank of the given header path, the grids and robots are memory mapped (read-only) by default."""
+        header = read_header(header_path, BANK_FORMAT)
+        directory = os.path.dirname(header_path)
+        grids = np.load(os.path.join(directory, header['grids']), mmap_mode=mmap_mode)
+        robots = np.load(os.path.join(directory, header['robots']), mmap_mode=mmap_mode)
+        target_area = None if header['target_area'] is None else tuple(header['target_area'])
+
+        return cls(header['game_type'], grids, robots, header['lattice_size'], target_area, header['num_tiles'],
+                   header['seeds'])
+
+
+class ScenarioCache:
+    """ This class is a bounded least recently used cache of loaded scenarios.
+    Entries are keyed on the resolved path of the file and are reloaded when the modification time or size of the file
+    or its grid changes.
+    The hits and misses of the cache are counted.
+    """
+
+    def __init__(self, max_size=32):
+        self.max_size = max_size
+        self.entries = collections.OrderedDict()    # Resolved path to (version, scenario).
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, path, load):
+        """ Returns the scenario of the given path, loading it with load(path) if it is not cached or changed."""
+        path = os.path.realpath(path)
+        version = self.version(path)
+
+        entry = self.entries.get(path)
+        if entry is not None and entry[0] == version:
+            self.hits += 1
+            self.entries.move_to_end(path)
+            return entry[1]
+
+        self.misses += 1
+        scenario = load(path)
+        self.entries[path] = (version, scenario)
+        self.entries.move_to_end(path)
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+        return scenario
+
+    @staticmethod
+    def version(path):
+        """ Returns the modification times and sizes of the file and of the arrays next to it (if any)."""
+        version = ()
+        for file_path in (path, Scenario.grid_path(path), ScenarioBank.grids_path(path),
+                          ScenarioBank.robots_path(path)):
+            if file_path == path or os.path.exists(file_path):
+                stat = os.stat(file_path)
+                version += (stat.st_mtime_ns, stat.st_size)
+
+        return version
+
+    def clear(self):
+        """ Removes all entries and resets the counters."""
+        self.entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def info(self):
+        """ Returns the counters and size of the cache."""
+        return {'hits': self.hits, 'misses': self.misses, 'size': len(self.entries), 'max_size': self.max_size}
+
+
+def convert_pickle(pickle_path, header_path=None):
+    """ Converts a pickled game storage into a scenario, written next to it by default."""
+    with open(pickle_path, 'rb') as handle:
+        scenario = Scenario.from_storage(pickle.load(handle))
+
+    header_path = header_path or os.path.splitext(pickle_path)[0] + '.json'
+    scenario.save(header_path)
+    return header_path
+
+
+def convert_grid(grid_path, header_path=None, robots_path=None, lattice_size=2):
+    """ Converts a loose tile grid (.npy) into a tiling pattern scenario, written next to it by default as
+    <name>.tiling.json (with grid <name>.tiling.grid.npy), so it does not overwrite the scenario converted from a
+    pickled game storage of the same name. The robot positions are read from a pickled list of (location, heading)
+    pairs if given."""
+    robot_pos = []
+    if robots_path is not None:
+        with open(robots_path, 'rb') as handle:
+            robot_pos = pickle.load(handle)
+
+    scenario = Scenario(Scenario.TILING_PATTERN, np.load(grid_path), robot_pos, lattice_size=lattice_size)
+    header_path = header_path or os.path.splitext(grid_path)[0] + '.tiling.json'
+    scenario.save(header_path)
+    return header_path
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description="Converts pickled game storages and loose tile grids (.npy) into "
+                                                 "scenario files.")
+    parser.add_argument('paths', nargs='+', help="The .pickle and .npy files to convert.")
+    parser.add_argument('--robots', help="Pickled robot positions to use for the .npy grids.")
+    parser.add_argument('--lattice-size', type=int, default=2, help="The lattice size to use for the .npy grids.")
+    args = parser.parse_args(args)
+
+    for path in args.paths:
+        if path.endswith('.npy'):
+            header_path = convert_grid(path, robots_path=args.robots, lattice_size=args.lattice_size)
+        else:
+            header_path = convert_pickle(path)
+        print("%s -> %s" % (path, header_path))
+
+
+if __name__ == '__main__':
+    main()
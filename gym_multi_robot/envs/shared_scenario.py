@@ -0,0 +1,113 @@
+from collections import namedtuple
+
+import numpy as np
+
+from gym_multi_robot.envs.scenario import Scenario, ScenarioBank
+
+try:
+    from multiprocessing import shared_memory
+except ImportError:     # Before Python 3.8, the scenarios are then loaded by every process.
+    shared_memory = None
+
+# The name of a shared memory block and the shape and dtype of the array stored in it.
+SharedArray = namedtuple('SharedArray', ['name', 'shape', 'dtype'])
+
+
+def share_array(array):
+    """ Copies the given array into a new shared memory block, returns the block and its SharedArray."""
+    array = np.ascontiguousarray(array)
+    memory = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+    np.ndarray(array.shape, array.dtype, buffer=memory.buf)[...] = array
+    return memory, SharedArray(memory.name, array.shape, array.dtype.str)
+
+
+class SharedScenarios:
+    """ This class holds scenarios and scenario banks of which the arrays are in shared memory, so all processes that
+    use them share a single copy, however many scenarios the banks hold.
+    The process that creates them owns the shared memory and unlinks it on close, other processes attach to it with
+    the handles (which can be pickled, for example as arguments of a pool initializer) and get read-only arrays.
+    The games copy the grid of their scenario into their own grid on every reset, so the shared grids are never
+    written.
+    Attached processes close their view on close, the memory is freed when the owner and all views are closed.
+    """
+
+    def __init__(self, handles, memories, owner):
+        self.handles = handles      # Resolved path to the settings and SharedArrays of its scenario (bank).
+        self.memories = memories
+        self.owner = owner
+        self.scenarios = {}         # Resolved path to the scenario (bank) with shared arrays.
+
+        buffers = {memory.name: memory.buf for memory in memories}
+        for path, (bank, settings, shared_arrays) in handles.items():
+            views = {key: np.ndarray(shared.shape, np.dtype(shared.dtype), buffer=buffers[shared.name])
+                     for key, shared in shared_arrays.items()}
+            for view in views.values():
+                view.flags.writeable = False
+
+            if bank:
+                self.scenarios[path] = ScenarioBank(grids=views['grids'], robots=views['robots'], **settings)
+            else:
+                self.scenarios[path] = Scenario(grid=views['grid'], **settings)
+
+    @classmethod
+    def create(cls, storages):
+        """ Copies the arrays of the given resolved path to scenario (bank) mapping into shared memory."""
+        handles, memories = {}, []
+        try:
+            for path, storage in storages.items():
+                bank = isinstance(storage, ScenarioBank)
+                settings = {'game_type': storage.game_type, 'lattice_size': storage.lattice_size,
+                            'target_area': storage.target_area, 'num_tiles': storage.num_tiles}
+                if bank:
+                    settings['seeds'] = storage.seeds
+                    arrays = {'grids': storage.grids, 'robots': storage.robots}
+                else:
+                    settings['robot_pos'] = storage.robot_pos
+                    arrays = {'grid': storage.grid}
+
+                shared_arrays = {}
+                for key, array in arrays.items():
+                    memory, shared_arrays[key] = share_array(array)
+                    memories.append(memory)
+                handles[path] = (bank, settings, shared_arrays)
+        except BaseException:
+            for memory in memories:
+                memory.close()
+                memory.unlink()
+            raise
+
+        return cls(handles, memories, owner=True)
+
+    @classmethod
+    def attach(cls, handles):
+        """ Attaches to the shared scenarios of the given handles, which were created by another process."""
+        names = {shared.name for _, _, shared_arrays in handles.values() for shared in shared_arrays.values()}
+        return cls(handles, [shared_memory.SharedMemory(name=name) for name in sorted(names)], owner=False)
+
+    def get(self, path):
+        """ Returns the shared scenario (bank) of the given resolved path, None if it is not shared."""
+        return self.scenarios.get(path)
+
+    def nbytes(self):
+        """ Returns the size of the shared arrays in bytes."""
+        return sum(int(np.prod(shared.shape)) * np.dtype(shared.dtype).itemsize
+                   for _, _, shared_arrays in self.handles.values() for shared in shared_arrays.values())
+
+    def close(self):
+        """ Closes the views on the shared memory and unlinks it in the owner process.
+        Memory that is still used by environments is unmapped when they are gone."""
+        self.scenarios = {}
+        for memory in self.memories:
+            try:
+                memory.close()
+            except BufferError:     # Still exported to the arrays of an environment.
+                pass
+            if self.owner:
+                memory.unlink()
+        self.memories = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,132 @@
+import functools
+import unittest
+
+import numpy as np
+
+from gym_multi_robot.envs.async_vector_env import (AsyncVectorForagingEnv, AsyncVectorMultiRobotEnv,
+                                                   AsyncVectorTilingPatternEnv)
+from gym_multi_robot.envs.shared_scenario import shared_memory
+from gym_multi_robot.envs.tiling_pattern_env import TilingPatternEnv
+from gym_multi_robot.envs.vector_env import VectorForagingEnv, VectorTilingPatternEnv
+
+
+class FailingStepEnv(TilingPatternEnv):
+    """ An environment of which every step fails."""
+
+    def step(self, actions):
+        raise ValueError("Step failed.")
+
+
+class FailingResetEnv(TilingPatternEnv):
+    """ An environment of which every reset in a worker fails."""
+
+    def reset(self, seed=None):
+        if getattr(self, 'in_worker', False):
+            raise ValueError("Reset failed.")
+        return super().reset(seed)
+
+
+def failing_reset_env():
+    env = FailingResetEnv()
+    env.in_worker = True
+    return env
+
+
+class ClosedAsyncVectorEnv(AsyncVectorMultiRobotEnv):
+    """ An asynchronous vector environment that keeps the names of its shared memory when it is closed."""
+
+    closed_envs = []
+
+    def close(self):
+        if not self.closed:
+            self.memory_names = [memory.name for memory in self.memories]
+            self.closed_envs.append(self)
+        super().close()
+
+
+@unittest.skipIf(shared_memory is None, "Shared memory is not available.")
+class TestAsyncVectorEnv(unittest.TestCase):
+
+    def assert_same_as_vector(self, async_env, vector_env):
+        with async_env:
+            self.assertTrue(np.array_equal(vector_env.reset(seed=5), async_env.reset(seed=5)))
+
+            action_random = np.random.RandomState(0)
+            for _ in range(50):
+                actions = action_random.uniform(-1, 2, size=vector_env.locations.shape[:2] + (4,))
+                async_env.step_async(actions)
+                vector_observations, _, vector_dones, _ = vector_env.step(actions)
+                observations, _, dones, _ = async_env.step_wait()
+
+                self.assertTrue(np.array_equal(vector_observations, observations))
+                self.assertTrue(np.array_equal(vector_dones, dones))
+
+            self.assertEqual(vector_env.get_fitness().tolist(), async_env.get_fitness().tolist())
+            self.assertEqual(vector_env.get_fitness(1), async_env.get_fitness(1))
+
+    def test_tiling_same_as_vector(self):
+        self.assert_same_as_vector(AsyncVectorTilingPatternEnv(3, x_dim=11, y_dim=11),
+                                   VectorTilingPatternEnv(3, x_dim=11, y_dim=11))
+
+    def test_foraging_same_as_vector(self):
+        kwargs = dict(x_dim=6, y_dim=6, num_tiles=10, target_area=(0, 0, 2, 2), num_robots=8)
+        self.assert_same_as_vector(AsyncVectorForagingEnv(2, max_steps=20, **kwargs),
+                                   VectorForagingEnv(2, max_steps=20, **kwargs))
+
+    def test_auto_reset(self):
+        with AsyncVectorForagingEnv(2, max_steps=3) as env:
+            actions = np.ones((2, 5, 4))
+            for _ in range(2):
+                _, _, dones, info = env.step(actions)
+                self.assertFalse(dones.any())
+                self.assertTrue(np.isnan(info['final_fitness']).all())
+
+            _, _, dones, info = env.step(actions)
+            self.assertTrue(dones.all())
+            self.assertFalse(np.isnan(info['final_fitness']).any())
+            self.assertTrue((env.steps == 0).all())
+
+    def test_step_order(self):
+        with AsyncVectorTilingPatternEnv(2) as env:
+            self.assertRaises(RuntimeError, env.step_wait)
+            env.step_async(np.ones((2, 5, 4)))
+            self.assertRaises(RuntimeError, env.step_async, np.ones((2, 5, 4)))
+            self.assertRaises(RuntimeError, env.get_fitness)
+            env.step_wait()
+
+    def test_worker_error(self):
+        with AsyncVectorMultiRobotEnv([FailingStepEnv, TilingPatternEnv]) as env:
+            with self.assertRaisesRegex(RuntimeError, "Step failed"):
+                env.step(np.ones((2, 5, 4)))
+
+            self.assertEqual((2,), env.get_fitness().shape)
+
+    def test_close_after_failed_step(self):
+        env = AsyncVectorMultiRobotEnv([FailingStepEnv, TilingPatternEnv])
+        names = [memory.name for memory in env.memories]
+        env.step_async(np.ones((2, 5, 4)))
+
+        with self.assertRaisesRegex(RuntimeError, "Step failed"):
+            env.close()
+        self.assertFalse(any(process.is_alive() for process in env.processes))
+        for name in names:
+            self.assertRaises(FileNotFoundError, shared_memory.SharedMemory, name=name)
+
+    def test_close_after_failed_reset(self):
+        ClosedAsyncVectorEnv.closed_envs.clear()
+        with self.assertRaisesRegex(RuntimeError, "Reset failed"):
+            ClosedAsyncVectorEnv([TilingPatternEnv, failing_reset_env])
+
+        env, = ClosedAsyncVectorEnv.closed_envs
+        self.assertFalse(any(process.is_alive() for process in env.processes))
+        for name in env.memory_names:
+            self.assertRaises(FileNotFoundError, shared_memory.SharedMemory, name=name)
+
+    def test_close(self):
+        env = AsyncVectorMultiRobotEnv([functools.partial(TilingPatternEnv, x_dim=5, y_dim=5)])
+        names = [memory.name for memory in env.memories]
+        env.close()
+
+        self.assertFalse(any(process.is_alive() for process in env.processes))
+        for name in names:
+            self.assertRaises(FileNotFoundError, shared_memory.SharedMemory, name=name)
@@ -1,7 +1,10 @@
+import math
+
 import numpy as np
 import unittest
 
 from gym_multi_robot.envs.foraging_game import ForagingGame, ForagingGameStorage
+from gym_multi_robot.envs.foraging_game_alternative import ClosestGame
 from gym_multi_robot.envs.foraging_robot import ForagingRobot
 from gym_multi_robot.envs.gripping_robot import Heading
 from gym_multi_robot.envs.robot_reset import RandomRobotReset, StaticRobotReset
@@ -40,6 +43,38 @@ class TestForagingGame(unittest.TestCase):
 
         return ForagingGame(world_size, num_tiles, target_area, robot_reset, world_reset)
 
+    def test_closest_fitness(self):
+        game = ClosestGame((9, 6), 20, (3, 1, 2, 2), RandomRobotReset(ForagingRobot, 0), RandomWorldReset())
+        game.reset()
+        game.collected = 2
+
+        expected = 2
+        for i in range(9):
+            for j in range(6):
+                if game.grid[i][j]:
+                    expected += 1 - math.sqrt((i - 3) ** 2 + (j - 1) ** 2) / math.sqrt(9 ** 2 + 6 ** 2)
+
+        self.assertAlmostEqual(expected, game.get_fitness())
+
+    def test_random_reset_full_grid(self):
+        game = ForagingGame((4, 4), 12, (1, 1, 2, 2), RandomRobotReset(ForagingRobot, 16), RandomWorldReset())
+        game.np_random = np.random.default_rng(3)
+        game.reset()
+
+        self.assertEqual(12, np.sum(game.grid))
+        self.assertFalse(game.grid[1:3, 1:3].any())
+        self.assertEqual(16, len({robot.location for robot in game.robots}))
+
+    def test_random_reset_uses_game_generator(self):
+        grids = []
+        for _ in range(2):
+            game = self.default_game4x4()
+            game.np_random = np.random.default_rng(5)
+            game.reset()
+            grids.append((game.grid.tolist(), [(robot.location, robot.heading) for robot in game.robots]))
+
+        self.assertEqual(grids[0], grids[1])
+
     def test_one_by_one_field(self):
         game = ForagingGame((1, 1), 1, (2, 2, 1, 1), RandomRobotReset(ForagingRobot, 0), RandomWorldReset())
         game.reset()
@@ -0,0 +1,203 @@
+import copy
+import os
+import pickle
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from gym_multi_robot.envs.foraging_env import ForagingEnv
+from gym_multi_robot.envs.foraging_game_alternative import ClosestGame
+from gym_multi_robot.envs.grid_backend import SparseGrid
+from gym_multi_robot.envs.grid_view_2d import create_view
+from gym_multi_robot.envs.scenario import Scenario
+from gym_multi_robot.envs.tiling_pattern_env import TilingPatternEnv
+from gym_multi_robot.envs.tiling_pattern_game import TilingPatternGame
+from gym_multi_robot.envs.tiling_pattern_game_alternative import CountTilingPatternGame
+from gym_multi_robot.envs.vector_env import VectorForagingEnv
+
+
+def copy_state(source, target):
+    """ Gives the target environment the state of the source environment, of which the grid may be stored
+    differently."""
+    state, source_state = target.clone_state(), source.clone_state()
+    for name in set(state.dtype.names) & set(source_state.dtype.names):
+        state[name] = source_state[name]
+    target.restore_state(state)
+    target.game.grid = source.game.grid
+
+
+class TestSparseGrid(unittest.TestCase):
+
+    def setUp(self):
+        self.dense = np.zeros((5, 4), dtype=np.uint8)
+        self.dense[1, 2] = self.dense[4, 0] = self.dense[0, 3] = 1
+        self.grid = SparseGrid((5, 4))
+        self.grid.assign(self.dense)
+
+    def test_index(self):
+        self.assertEqual(1, self.grid[1, 2])
+        self.assertEqual(0, self.grid[2, 1])
+        self.assertEqual(1, self.grid[-1, 0])
+        self.assertRaises(IndexError, self.grid.__getitem__, (5, 0))
+        self.assertEqual(self.dense[[1, 2, 4]].tolist(), self.grid[[1, 2, 4]].tolist())
+
+    def test_index_arrays(self):
+        x, y = np.array([[1, 2], [4, 0]]), np.array([[2, 2], [0, 3]])
+        self.assertTrue(np.array_equal(self.dense[x, y], self.grid[x, y]))
+        self.assertTrue(np.array_equal(self.dense[::2, 1:], self.grid[::2, 1:]))
+
+    def test_set(self):
+        self.grid[1, 2] = 0
+        self.grid[np.array([2, 3]), np.array([1, 1])] = 1
+        self.grid[0] = 0
+        self.dense[1, 2] = 0
+        self.dense[[2, 3], [1, 1]] = 1
+        self.dense[0] = 0
+
+        self.assertEqual({(2, 1): 1, (3, 1): 1, (4, 0): 1}, self.grid.tiles)
+        self.assertTrue(np.array_equal(self.dense, np.asarray(self.grid)))
+
+    def test_set_row_item(self):
+        self.grid[0][1] = 1
+        self.grid[1][2] = 0
+        self.grid[-1][3] = 1
+        self.dense[0][1] = 1
+        self.dense[1][2] = 0
+        self.dense[-1][3] = 1
+
+        self.assertEqual({(0, 1): 1, (0, 3): 1, (4, 0): 1, (4, 3): 1}, self.grid.tiles)
+        self.assertEqual(1, self.grid[4][3])
+        self.assertEqual(self.dense[4].tolist(), np.asarray(self.grid[4]).tolist())
+        self.assertEqual(self.dense[4][1:].tolist(), self.grid[4][1:].tolist())
+        self.assertRaises(IndexError, self.grid.__getitem__, 5)
+
+    def test_dense_operations(self):
+        self.assertTrue(np.array_equal(self.dense == 0, self.grid == 0))
+        self.assertTrue(np.array_equal(np.nonzero(self.dense), np.nonzero(self.grid)))
+        self.assertTrue(np.array_equal(self.dense, np.copy(self.grid)))
+        self.assertEqual(3, self.grid.sum())
+
+        self.grid.fill(0)
+        self.assertEqual({}, self.grid.tiles)
+
+
+class TestGridBackend(unittest.TestCase):
+
+    def assert_same_as_dense(self, env_factory):
+        dense = env_factory('dense')
+        dense.reset(seed=3)
+        state = dense.clone_state()
+
+        for backend in ('uint8', 'sparse'):
+            env = env_factory(backend)
+            env.reset(seed=1)
+            dense.restore_state(state)
+            copy_state(dense, env)
+
+            action_random = np.random.RandomState(0)
+            for _ in range(100):
+                actions = action_random.uniform(-1, 2, size=(len(env.game.robots), 4))
+                self.assertTrue(np.array_equal(dense.step(actions)[0], env.step(actions)[0]))
+                self.assertTrue(np.array_equal(dense.game.grid, np.asarray(env.game.grid)))
+                self.assertEqual(dense.get_fitness(), env.get_fitness())
+
+    def test_tiling_same_as_dense(self):
+        self.assert_same_as_dense(lambda backend: TilingPatternEnv(x_dim=11, y_dim=11, grid_backend=backend))
+        self.assert_same_as_dense(lambda backend: TilingPatternEnv(x_dim=9, y_dim=7, grid_backend=backend,
+                                                                   game_cls=CountTilingPatternGame))
+
+    def test_foraging_same_as_dense(self):
+        self.assert_same_as_dense(lambda backend: ForagingEnv(x_dim=8, y_dim=8, num_tiles=20, target_area=(0, 0, 4, 4),
+                                                              num_robots=10, grid_backend=backend))
+        self.assert_same_as_dense(lambda backend: ForagingEnv(x_dim=12, y_dim=12, num_tiles=30, num_robots=8,
+                                                              target_area=(0, 0, 3, 3), grid_backend=backend,
+                                                              game_cls=ClosestGame))
+
+    def test_grid_types(self):
+        self.assertEqual(np.uint8, TilingPatternEnv(grid_backend='uint8').game.grid.dtype)
+        self.assertIsInstance(TilingPatternEnv(grid_backend='sparse').game.grid, SparseGrid)
+        self.assertRaises(ValueError, TilingPatternEnv, grid_backend='packed')
+
+    def test_sparse_random_reset(self):
+        env = ForagingEnv(x_dim=300, y_dim=200, num_tiles=500, target_area=(0, 0, 20, 20), grid_backend='sparse')
+        env.reset(seed=4)
+        x, y = np.nonzero(env.game.grid)
+
+        self.assertEqual(500, len(x))
+        self.assertFalse(((x < 20) & (y < 20)).any())
+
+        tiles = dict(env.game.grid.tiles)
+        env.reset(seed=4)
+        self.assertEqual(tiles, env.game.grid.tiles)
+
+    def test_sparse_storage(self):
+        env = TilingPatternEnv(x_dim=9, y_dim=7, grid_backend='sparse')
+        env.reset(seed=2)
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'sparse.json')
+            env.game.write(path)
+            self.assertTrue(np.array_equal(np.asarray(env.game.grid), Scenario.load(path).grid))
+
+            copy_env = TilingPatternEnv(env_storage_path=path, grid_backend='sparse')
+            copy_env.reset()
+            self.assertEqual(env.game.grid.tiles, copy_env.game.grid.tiles)
+            self.assertEqual(env.get_fitness(), copy_env.get_fitness())
+
+    def test_sparse_state(self):
+        env = ForagingEnv(x_dim=1000, y_dim=1000, num_tiles=50, num_robots=3, grid_backend='sparse')
+        env.reset(seed=0)
+        state = env.clone_state()
+        tiles = dict(env.game.grid.tiles)
+        self.assertLess(state.nbytes, 1000)
+
+        env.reset(seed=1)
+        env.restore_state(state)
+        self.assertEqual(tiles, env.game.grid.tiles)
+
+    def test_sparse_tiling_stays_sparse(self):
+        for game_cls in (TilingPatternGame, CountTilingPatternGame):
+            env = TilingPatternEnv(lattice_size=100, x_dim=1000, y_dim=1000, num_robots=4, game_cls=game_cls,
+                                   grid_backend='sparse')
+            env.reset(seed=0)
+            dense = TilingPatternEnv(lattice_size=100, x_dim=1000, y_dim=1000, num_robots=4, game_cls=game_cls)
+            dense.reset()
+            dense.game.grid = np.asarray(env.game.grid)
+            self.assertIsNone(env.game.cell_blocks)
+
+            with mock.patch.object(SparseGrid, '__array__', side_effect=AssertionError("dense copy")):
+                env.game.set_tile((100, 200), 1)
+                env.game.set_tile((300, 0), 0)
+                fitness = env.get_fitness()
+                counts = env.game.block_counts.tolist()
+
+            dense.game.set_tile((100, 200), 1)
+            dense.game.set_tile((300, 0), 0)
+            self.assertEqual(dense.get_fitness(), fitness)
+            self.assertEqual(dense.game.block_counts.tolist(), counts)
+
+    def test_sparse_copy(self):
+        env = ForagingEnv(x_dim=10, y_dim=10, num_tiles=10, grid_backend='sparse')
+        env.reset(seed=0)
+
+        for game in (copy.deepcopy(env.game), pickle.loads(pickle.dumps(env.game))):
+            self.assertIsNot(env.game.grid, game.grid)
+            self.assertEqual(env.game.grid.tiles, game.grid.tiles)
+
+    def test_sparse_view(self):
+        envs = [TilingPatternEnv(x_dim=7, y_dim=5, grid_backend=backend) for backend in ('dense', 'sparse')]
+        for env in envs:
+            env.reset(seed=5)
+        copy_state(envs[0], envs[1])
+
+        frames = [create_view(env.game, screen_size=(70, 50)).update('rgb_array') for env in envs]
+        self.assertTrue(np.array_equal(*frames))
+
+    def test_vector_env(self):
+        env = VectorForagingEnv(2, x_dim=6, y_dim=6, num_tiles=5, grid_backend='uint8')
+        self.assertEqual(np.uint8, env.grids.dtype)
+        env.step(np.ones((2, 5, 4)))
+
+        self.assertRaises(ValueError, VectorForagingEnv, 2, grid_backend='sparse')
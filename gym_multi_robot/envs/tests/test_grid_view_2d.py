@@ -0,0 +1,64 @@
+import unittest
+
+import numpy as np
+
+from gym_multi_robot.envs.foraging_env import ForagingEnv
+from gym_multi_robot.envs.foraging_game_alternative import ClosestGame
+from gym_multi_robot.envs.foraging_view_2d import ForagingView2D
+from gym_multi_robot.envs.grid_view_2d import DIGITS, create_view
+from gym_multi_robot.envs.tiling_pattern_env import TilingPatternEnv
+from gym_multi_robot.envs.tiling_pattern_view_2d import TilingPatternView2D
+
+
+class TestGridView2D(unittest.TestCase):
+
+    def test_create_view(self):
+        self.assertIsInstance(create_view(TilingPatternEnv().game), TilingPatternView2D)
+        self.assertIsInstance(create_view(ForagingEnv().game), ForagingView2D)
+        self.assertIsInstance(create_view(ForagingEnv(game_cls=ClosestGame).game), ForagingView2D)
+
+    def test_foraging_view(self):
+        env = ForagingEnv(x_dim=9, y_dim=7, num_tiles=0, target_area=(0, 0, 3, 2), num_robots=1, seed=0)
+        env.reset()
+        env.game.robots.place([[8, 6]], [0])
+        env.game.collected = 37
+
+        frame = env.render('rgb_array')
+        view = env.game_view
+        self.assertEqual((7 * 85 + 1 + 7 * view.text_scale, 9 * 66 + 1, 3), frame.shape)
+        self.assertEqual(view.background_colours[1], tuple(frame[view.CELL_H + 5, 2 * view.CELL_W + 5]))
+        self.assertEqual(view.background_colour, tuple(frame[2 * view.CELL_H + 5, 2 * view.CELL_W + 5]))
+        self.assertEqual(view.background_colour, tuple(frame[view.CELL_H + 5, 3 * view.CELL_W + 5]))
+
+        scale = view.text_scale
+        digits = view.status_bar[scale:6 * scale:scale, :8 * scale:scale, 0] == view.text_colour[0]
+        self.assertTrue(np.array_equal(DIGITS[3], digits[:, 1:4]))
+        self.assertTrue(np.array_equal(DIGITS[7], digits[:, 5:8]))
+
+        env.game.collected = 40
+        env.render('rgb_array')
+        digits = view.status_bar[scale:6 * scale:scale, :8 * scale:scale, 0] == view.text_colour[0]
+        self.assertTrue(np.array_equal(DIGITS[4], digits[:, 1:4]))
+
+    def test_draws_changed_cells(self):
+        env = TilingPatternEnv(x_dim=7, y_dim=5, num_robots=1, seed=0)
+        env.reset()
+        env.game.grid = np.zeros((7, 5), dtype=int)
+        env.game.robots.place([[0, 0]], [1])
+        frame = env.render('rgb_array')
+        view = env.game_view
+
+        # Pixels of unchanged cells are not drawn again.
+        frame[view.CELL_H + 5, view.CELL_W + 5] = (1, 2, 3)
+        env.game.set_tile((3, 3), 1)
+        env.step([[1, 0, 0, 0]])
+        env.render('rgb_array')
+        self.assertEqual((1, 2, 3), tuple(frame[view.CELL_H + 5, view.CELL_W + 5]))
+
+        expected = TilingPatternView2D(env.game).update('rgb_array')
+        frame[view.CELL_H + 5, view.CELL_W + 5] = view.background_colour
+        self.assertTrue(np.array_equal(expected, frame))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,123 @@
+import tracemalloc
+import unittest
+
+import numpy as np
+
+from gym_multi_robot.envs.foraging_env import ForagingEnv
+from gym_multi_robot.envs.foraging_game_alternative import WeightedSumForagingEnv
+from gym_multi_robot.envs.tiling_pattern_env import TilingPatternEnv
+from gym_multi_robot.envs.tiling_pattern_game_alternative import WeightedSumTilingPatternEnv
+
+
+def episode(env, **kwargs):
+    """ Returns the observations and grids of a short episode."""
+    observations = [env.reset(**kwargs).tolist()]
+    grids = [env.game.grid.tolist()]
+    action_random = np.random.RandomState(0)
+    for _ in range(20):
+        observations.append(env.step(action_random.uniform(-1, 2, size=(len(env.game.robots), 4)))[0].tolist())
+        grids.append(env.game.grid.tolist())
+
+    return observations, grids
+
+
+class TestMultiRobotEnv(unittest.TestCase):
+
+    def test_reset_seed_fixes_episode(self):
+        env = TilingPatternEnv(x_dim=9, y_dim=7, num_robots=8)
+        self.assertEqual(episode(env, seed=4), episode(env, seed=4))
+        self.assertNotEqual(episode(env, seed=4), episode(env, seed=5))
+
+    def test_constructor_seed(self):
+        for env_cls in (TilingPatternEnv, ForagingEnv):
+            self.assertEqual(episode(env_cls(seed=2)), episode(env_cls(seed=2)))
+
+    def test_seed_same_as_reset_seed(self):
+        env = ForagingEnv(x_dim=8, y_dim=8, num_tiles=10, seed=1)
+        env.seed(7)
+        self.assertEqual(episode(env), episode(ForagingEnv(x_dim=8, y_dim=8, num_tiles=10), seed=7))
+
+    def test_spaces(self):
+        env = ForagingEnv(num_robots=3)
+        observations = env.reset()
+
+        self.assertEqual((3, 4), env.action_space.shape)
+        self.assertTrue(env.observation_space.contains(observations))
+        self.assertTrue(observations.flags.c_contiguous)
+
+        actions = np.array([[1, -1, 1, 1], [1, 0.6, 0, 1], [0, 1.4, 1, 0]], dtype=np.float32)
+        copy = actions.copy()
+        self.assertIs(observations, env.step(actions)[0])
+        self.assertTrue(np.array_equal(copy, actions))
+        self.assertTrue(env.observation_space.contains(observations))
+
+    def test_sequential_step_keeps_actions(self):
+        env = TilingPatternEnv(num_robots=2)
+        env.reset()
+        env.game.batched = False
+
+        actions = np.array([[1, 0.7, 1, 0], [1, -0.8, 0, 1]])
+        copy = actions.copy()
+        env.step(actions)
+        self.assertTrue(np.array_equal(copy, actions))
+
+    def test_restore_state(self):
+        def rollout(env, action_random):
+            """ Returns the observations, rewards, grids and tile counts of a few steps."""
+            steps = []
+            for _ in range(30):
+                observations, reward, _, _ = env.step(action_random.uniform(-1, 2, size=(len(env.game.robots), 4)))
+                steps.append((observations.tolist(), reward, env.game.grid.tolist(), env.get_fitness()))
+            return steps
+
+        for env in (WeightedSumTilingPatternEnv(x_dim=9, y_dim=9, num_robots=6, seed=3),
+                    ForagingEnv(x_dim=9, y_dim=9, num_tiles=20, target_area=(0, 0, 3, 3), num_robots=6, seed=3)):
+            env.reset()
+            rollout(env, np.random.RandomState(1))
+            state = env.clone_state()
+
+            expected = rollout(env, np.random.RandomState(2))
+            scratch = state.copy()
+            self.assertIs(scratch, env.clone_state(scratch))
+            env.restore_state(state)
+            self.assertEqual(expected, rollout(env, np.random.RandomState(2)))
+
+    def test_restore_state_reuses_buffers(self):
+        def buffers(game):
+            """ Returns the objects that hold the state of the game."""
+            grid = game.grid.tiles if game.padded_grid is None else game.padded_grid
+            return [grid, game.robot_grid, game.robots.locations, game.robots.headings, game.robots.holds,
+                    getattr(game, 'tile_counts', None)]
+
+        for env in (TilingPatternEnv(x_dim=200, y_dim=200, num_robots=6, seed=0),
+                    TilingPatternEnv(x_dim=200, y_dim=200, num_robots=6, seed=0, grid_backend='uint8'),
+                    ForagingEnv(x_dim=200, y_dim=200, num_tiles=50, num_robots=6, seed=0, grid_backend='sparse')):
+            env.reset()
+            state = env.clone_state()
+            env.reset()
+            before = buffers(env.game)
+
+            tracemalloc.start()
+            env.restore_state(state)
+            allocated = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+            self.assertLess(allocated, 20000)
+            self.assertTrue(all(a is b for a, b in zip(before, buffers(env.game))))
+
+    def test_restore_state_keeps_counters(self):
+        env = WeightedSumForagingEnv(x_dim=8, y_dim=8, target_area=(0, 0, 2, 2), seed=0)
+        env.reset()
+        env.game.collected, env.summed_reward, env.step_nr = 3, 7.5, 12
+        state = env.clone_state()
+
+        env.reset()
+        env.restore_state(state)
+        self.assertEqual((3, 7.5, 12), (env.game.collected, env.summed_reward, env.step_nr))
+
+        with self.assertRaises(ValueError):
+            env.restore_state(ForagingEnv(num_robots=4).clone_state())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+import unittest
+
+from gym_multi_robot.envs.gripping_robot import Heading, GripperRobot
+from gym_multi_robot.envs.robot_reset import RandomRobotReset
+from gym_multi_robot.envs.tiling_pattern_game import TilingPatternGame
+from gym_multi_robot.envs.world_reset import RandomWorldReset
+
+
+class TestMultiRobotGame(unittest.TestCase):
+
+    @staticmethod
+    def default_game10x10(num_robots=0):
+        return TilingPatternGame((10, 10), 2, RandomRobotReset(GripperRobot, num_robots), RandomWorldReset())
+
+    def test_add_robot(self):
+        game = self.default_game10x10()
+        self.assertFalse(game.has_robot((3, 4)))
+
+        game.add_robot(GripperRobot(0, Heading.NORTH, (3, 4)))
+        self.assertTrue(game.has_robot((3, 4)))
+        self.assertEqual(1, game.robot_grid.sum())
+
+    def test_move_robot(self):
+        game = self.default_game10x10()
+        robot = GripperRobot(0, Heading.EAST, (3, 4))
+        game.add_robot(robot)
+
+        robot.move(True, 0, game)
+        self.assertFalse(game.has_robot((3, 4)))
+        self.assertTrue(game.has_robot((4, 4)))
+
+    def test_set_location_moves_occupancy(self):
+        game = self.default_game10x10()
+        robot = GripperRobot(0, Heading.EAST, (0, 0))
+        game.add_robot(robot)
+        game.add_robot(GripperRobot(1, Heading.EAST, (5, 5)))
+
+        robot.location = (2, 0)
+        self.assertTrue(game.has_robot((2, 0)))
+        self.assertFalse(game.has_robot((0, 0)))
+        self.assertEqual(2, game.robot_grid.sum())
+        self.assertTrue(game.robots.batchable())
+
+    def test_move_blocked_by_robot(self):
+        game = self.default_game10x10()
+        robot = GripperRobot(0, Heading.EAST, (3, 4))
+        game.add_robot(robot)
+        game.add_robot(GripperRobot(1, Heading.EAST, (4, 4)))
+
+        robot.move(True, 0, game)
+        self.assertEqual((3, 4), robot.location)
+        self.assertEqual(2, game.robot_grid.sum())
+
+    def test_move_robot_not_in_game(self):
+        game = self.default_game10x10()
+        robot = GripperRobot(0, Heading.EAST, (3, 4))
+
+        robot.move(True, 0, game)
+        self.assertEqual((4, 4), robot.location)
+        self.assertFalse(game.has_robot((4, 4)))
+
+    def test_remove_robot(self):
+        game = self.default_game10x10()
+        robot = GripperRobot(0, Heading.EAST, (3, 4))
+        game.add_robot(robot)
+
+        game.robots.remove(robot)
+        self.assertFalse(game.has_robot((3, 4)))
+
+    def test_reset_occupancy(self):
+        game = self.default_game10x10(num_robots=5)
+        for _ in range(3):
+            game.reset()
+            self.assertEqual(5, game.robot_grid.sum())
+            for robot in game.robots:
+                self.assertTrue(game.has_robot(robot.location))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,106 @@
+import json
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from gym_multi_robot.envs.foraging_game_alternative import WeightedSumForagingEnv
+from gym_multi_robot.envs.profiler import PhaseProfiler, merge_stats
+from gym_multi_robot.envs.tiling_pattern_env import TilingPatternEnv
+from gym_multi_robot.envs.vector_env import VectorTilingPatternEnv
+
+
+class TestPhaseProfiler(unittest.TestCase):
+
+    def test_add(self):
+        profiler = PhaseProfiler()
+        profiler.add('step', 3e-6)
+        profiler.add('step', 1e-6)
+        stats = profiler.stats()['step']
+
+        self.assertEqual(2, stats['count'])
+        self.assertAlmostEqual(4e-6, stats['total'])
+        self.assertAlmostEqual(2e-6, stats['mean'])
+        self.assertEqual((1e-6, 3e-6), (stats['min'], stats['max']))
+        self.assertEqual({'1024': 1, '4096': 1}, stats['histogram'])
+        self.assertEqual({'step': 1e-6}, profiler.last)
+
+    def test_merge_stats(self):
+        profiler, other = PhaseProfiler(), PhaseProfiler()
+        profiler.add('step', 3e-6)
+        other.add('step', 1e-6)
+        other.add('reset', 1e-3)
+        merged = merge_stats(profiler.stats(), other.stats())
+
+        self.assertEqual(2, merged['step']['count'])
+        self.assertEqual(1e-6, merged['step']['min'])
+        self.assertEqual({'1024': 1, '4096': 1}, merged['step']['histogram'])
+        self.assertEqual(other.stats()['reset'], merged['reset'])
+        self.assertEqual({'4096': 1}, profiler.stats()['step']['histogram'])
+
+    def test_write_json(self):
+        profiler = PhaseProfiler()
+        profiler.add('step', 1e-6)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'profile.json')
+            profiler.write_json(path, generation=3)
+            with open(path) as handle:
+                self.assertEqual({'generation': 3, 'phases': profiler.stats()}, json.load(handle))
+
+
+class TestProfiling(unittest.TestCase):
+
+    def test_disabled_by_default(self):
+        env = TilingPatternEnv(x_dim=7, y_dim=5)
+        env.reset()
+        _, _, _, info = env.step(np.ones((5, 4)))
+
+        self.assertNotIn('phase_times', info)
+        self.assertEqual({}, env.stats())
+
+    def test_batched_phases(self):
+        env = TilingPatternEnv(x_dim=7, y_dim=5)
+        env.enable_profiling()
+        env.reset()
+        for _ in range(3):
+            _, _, _, info = env.step(np.ones((5, 4)))
+        env.get_fitness()
+        stats = env.stats()
+
+        self.assertEqual({'actions', 'movement', 'observations', 'tiles', 'step'}, set(info['phase_times']))
+        self.assertEqual({'reset', 'actions', 'movement', 'observations', 'tiles', 'step', 'fitness'}, set(stats))
+        self.assertEqual(1, stats['reset']['count'])
+        self.assertEqual(3, stats['step']['count'])
+        self.assertEqual(1, stats['fitness']['count'])
+
+    def test_sequential_phases(self):
+        env = TilingPatternEnv(x_dim=7, y_dim=5)
+        env.enable_profiling()
+        env.reset()
+        env.game.batched = False
+        _, _, _, info = env.step(np.ones((5, 4)))
+
+        self.assertEqual({'sequential_step', 'step'}, set(info['phase_times']))
+
+    def test_stepped_reward_fitness(self):
+        env = WeightedSumForagingEnv(x_dim=6, y_dim=6, target_area=(0, 0, 2, 2))
+        env.enable_profiling()
+        env.reset()
+        env.step(np.ones((5, 4)))
+
+        self.assertIn('fitness', env.stats())
+
+    def test_vector_env(self):
+        env = VectorTilingPatternEnv(2, x_dim=7, y_dim=5)
+        env.enable_profiling()
+        env.reset()
+        _, _, _, info = env.step(np.ones((2, 5, 4)))
+        stats = env.stats()
+
+        self.assertEqual(2, stats['reset']['count'])
+        self.assertEqual(1, stats['step']['count'])
+        self.assertIn('movement', info['phase_times'])
+
+        env.disable_profiling()
+        self.assertNotIn('phase_times', env.step(np.ones((2, 5, 4)))[3])
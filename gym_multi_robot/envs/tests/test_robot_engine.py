@@ -0,0 +1,128 @@
+import unittest
+
+import numpy as np
+
+from gym_multi_robot.envs.foraging_game import ForagingGame
+from gym_multi_robot.envs.foraging_robot import ForagingRobot
+from gym_multi_robot.envs.gripping_robot import Heading, GripperRobot
+from gym_multi_robot.envs.robot_reset import RandomRobotReset
+from gym_multi_robot.envs.tiling_pattern_game import TilingPatternGame
+from gym_multi_robot.envs.world_reset import RandomWorldReset
+
+
+class TestRobotEngine(unittest.TestCase):
+
+    @staticmethod
+    def crowded_tiling_game():
+        return TilingPatternGame((7, 5), 2, RandomRobotReset(GripperRobot, 20), RandomWorldReset())
+
+    @staticmethod
+    def crowded_foraging_game():
+        return ForagingGame((6, 6), 10, (0, 0, 2, 2), RandomRobotReset(ForagingRobot, 15), RandomWorldReset())
+
+    @staticmethod
+    def empty_game():
+        return TilingPatternGame((5, 5), 2, RandomRobotReset(GripperRobot, 0), RandomWorldReset())
+
+    def assert_same_as_sequential(self, create_game, seed):
+        game = create_game()
+        game.np_random = np.random.default_rng(seed)
+        game.reset()
+        sequential_game = create_game()
+        sequential_game.np_random = np.random.default_rng(seed)
+        sequential_game.reset()
+        sequential_game.batched = False
+
+        action_random = np.random.RandomState(seed)
+        for _ in range(100):
+            actions = np.round(action_random.uniform(-1.2, 2.0, size=(len(game.robots), 4)) * 2) / 2
+
+            observations = game.update_robots(actions)
+            sequential_observations = sequential_game.update_robots(actions.tolist())
+
+            self.assertEqual(sequential_observations, observations)
+            self.assertTrue(np.array_equal(sequential_game.grid, game.grid))
+            self.assertTrue(np.array_equal(sequential_game.robot_grid, game.robot_grid))
+            self.assertEqual([robot.location for robot in sequential_game.robots],
+                             [robot.location for robot in game.robots])
+            self.assertEqual(sequential_game.get_fitness(), game.get_fitness())
+
+    def test_same_as_sequential_tiling(self):
+        for seed in range(5):
+            self.assert_same_as_sequential(self.crowded_tiling_game, seed)
+
+    def test_same_as_sequential_foraging(self):
+        for seed in range(5):
+            self.assert_same_as_sequential(self.crowded_foraging_game, seed)
+
+    def test_first_robot_wins_location(self):
+        game = self.empty_game()
+        game.grid = np.zeros((5, 5))
+        game.add_robot(GripperRobot(0, Heading.EAST, (1, 2)))
+        game.add_robot(GripperRobot(1, Heading.WEST, (3, 2)))
+        game.update_robots([[True, 0, False, False], [True, 0, False, False]])
+
+        self.assertEqual((2, 2), game.robots[0].location)
+        self.assertEqual((3, 2), game.robots[1].location)
+
+    def test_follow_robot_before(self):
+        game = self.empty_game()
+        game.grid = np.zeros((5, 5))
+        game.add_robot(GripperRobot(0, Heading.EAST, (2, 2)))
+        game.add_robot(GripperRobot(1, Heading.EAST, (1, 2)))
+        game.update_robots([[True, 0, False, False], [True, 0, False, False]])
+
+        self.assertEqual((3, 2), game.robots[0].location)
+        self.assertEqual((2, 2), game.robots[1].location)
+
+    def test_blocked_by_robot_after(self):
+        game = self.empty_game()
+        game.grid = np.zeros((5, 5))
+        game.add_robot(GripperRobot(0, Heading.EAST, (1, 2)))
+        game.add_robot(GripperRobot(1, Heading.EAST, (2, 2)))
+        observations = game.update_robots([[True, 0, False, False], [True, 0, False, False]])
+
+        self.assertEqual((1, 2), game.robots[0].location)
+        self.assertEqual((3, 2), game.robots[1].location)
+        self.assertEqual(1, observations[0][10])    # Robot 1 had not moved when robot 0 observed.
+
+    def test_pickup_before_drop(self):
+        game = self.empty_game()
+        game.grid = np.zeros((5, 5))
+        game.grid[2][2] = 1
+        game.add_robot(GripperRobot(0, Heading.EAST, (2, 2)))
+        game.update_robots([[False, 0, True, True]])
+
+        self.assertFalse(game.robots[0].hold_object)
+        self.assertTrue(game.grid[2][2])
+
+    def test_observations_same_as_robot(self):
+        for create_game in (self.crowded_tiling_game, self.crowded_foraging_game):
+            game = create_game()
+            game.reset()
+            for _ in range(20):
+                game.update_robots(np.random.uniform(-1, 2, size=(len(game.robots), 4)))
+
+                observations = game.get_observations()
+                self.assertEqual(np.int8, observations.dtype)
+                self.assertEqual([robot.get_observation(game) for robot in game.robots], observations.tolist())
+
+    def test_array_observations(self):
+        game = self.crowded_foraging_game()
+        game.array_observations = True
+        observations = game.reset()
+        self.assertEqual((15, ForagingRobot.observation_size), observations.shape)
+
+        self.assertIs(observations, game.update_robots(np.zeros((15, 4))))
+
+    def test_grid_assignment_keeps_padding(self):
+        game = self.empty_game()
+        game.grid = np.ones((5, 5))
+
+        self.assertEqual(25, game.padded_grid.sum())
+        self.assertTrue(game.has_tile((4, 4)))
+        self.assertFalse(game.has_tile((5, 4)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,142 @@
+import json
+import os
+import pickle
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from gym_multi_robot.envs.foraging_env import ForagingEnv
+from gym_multi_robot.envs.gripping_robot import Heading
+from gym_multi_robot.envs.multi_robot_env import check_path, MultiRobotEnv
+from gym_multi_robot.envs.scenario import Scenario, ScenarioCache, convert_grid, convert_pickle
+from gym_multi_robot.envs.tiling_pattern_env import TilingPatternEnv
+
+
+class TestScenario(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def path(self, name):
+        return os.path.join(self.directory.name, name)
+
+    def test_save_load(self):
+        grid = np.zeros((6, 4), dtype=int)
+        grid[1, 2] = grid[5, 3] = 1
+        Scenario(Scenario.FORAGING, grid, [((1, 1), Heading.EAST), ((0, 3), Heading.WEST)], target_area=(0, 0, 2, 2),
+                 num_tiles=2).save(self.path('scenario.json'))
+
+        scenario = Scenario.load(self.path('scenario.json'))
+        self.assertEqual(Scenario.FORAGING, scenario.game_type)
+        self.assertTrue(np.array_equal(grid, scenario.grid))
+        self.assertIsInstance(scenario.grid, np.memmap)
+        self.assertFalse(scenario.grid.flags.writeable)
+        self.assertEqual([((1, 1), Heading.EAST), ((0, 3), Heading.WEST)], scenario.robot_pos)
+        self.assertEqual((0, 0, 2, 2), scenario.target_area)
+        self.assertEqual(2, scenario.num_tiles)
+        self.assertIsNone(scenario.lattice_size)
+
+    def test_newer_version(self):
+        Scenario(Scenario.TILING_PATTERN, np.zeros((3, 3)), [], lattice_size=2).save(self.path('scenario.json'))
+        with open(self.path('scenario.json')) as handle:
+            header = json.load(handle)
+        header['version'] += 1
+        with open(self.path('scenario.json'), 'w') as handle:
+            json.dump(header, handle)
+
+        with self.assertRaises(ValueError):
+            Scenario.load(self.path('scenario.json'))
+
+    def test_convert_samples(self):
+        for env_cls, name in ((TilingPatternEnv, 'tiles7x5'), (ForagingEnv, 'foraging11x11')):
+            header_path = convert_pickle(check_path(name + '.pickle'), self.path(name + '.json'))
+
+            scenario_env, pickle_env = env_cls(env_storage_path=header_path), env_cls(env_storage_path=name + '.pickle')
+            self.assertTrue(np.array_equal(pickle_env.reset(), scenario_env.reset()))
+            self.assertTrue(np.array_equal(pickle_env.game.grid, scenario_env.game.grid))
+            self.assertEqual(pickle_env.get_fitness(), scenario_env.get_fitness())
+
+    def test_convert_grid(self):
+        header_path = convert_grid(check_path('tiles.npy'), self.path('tiles.json'), check_path('robots.pickle'))
+        scenario = Scenario.load(header_path)
+
+        with open(check_path('robots.pickle'), 'rb') as handle:
+            self.assertEqual(pickle.load(handle), scenario.robot_pos)
+        self.assertTrue(np.array_equal(np.load(check_path('tiles.npy')), scenario.grid))
+        self.assertEqual(2, scenario.lattice_size)
+
+    def test_grid_samples_reproducible(self):
+        for name in ('tiles', 'tiles11x11'):
+            shutil.copy(check_path(name + '.npy'), self.path(name + '.npy'))
+            header_path = convert_grid(self.path(name + '.npy'), robots_path=check_path('robots.pickle'))
+
+            with open(header_path) as converted, open(check_path(name + '.tiling.json')) as sample:
+                self.assertEqual(json.load(sample), json.load(converted))
+            self.assertTrue(np.array_equal(np.load(Scenario.grid_path(header_path)),
+                                           np.load(check_path(name + '.tiling.grid.npy'))))
+
+            env = TilingPatternEnv(env_storage_path=name + '.tiling.json')
+            env.reset()
+            self.assertEqual(5, len(env.game.robots))
+
+    def test_convert_siblings(self):
+        for extension in ('.npy', '.pickle'):
+            shutil.copy(check_path('tiles11x11_block' + extension), self.path('tiles11x11_block' + extension))
+
+        grid_header = convert_grid(self.path('tiles11x11_block.npy'))
+        pickle_header = convert_pickle(self.path('tiles11x11_block.pickle'))
+
+        self.assertEqual(self.path('tiles11x11_block.tiling.json'), grid_header)
+        self.assertEqual(self.path('tiles11x11_block.tiling.grid.npy'), Scenario.grid_path(grid_header))
+        self.assertNotEqual(Scenario.grid_path(grid_header), Scenario.grid_path(pickle_header))
+        self.assertTrue(np.array_equal(np.load(self.path('tiles11x11_block.npy')), Scenario.load(grid_header).grid))
+        with open(self.path('tiles11x11_block.pickle'), 'rb') as handle:
+            self.assertEqual(pickle.load(handle).robot_pos, Scenario.load(pickle_header).robot_pos)
+
+    def test_cache_hits(self):
+        cache = MultiRobotEnv.storage_cache
+        cache.clear()
+
+        first_env, second_env = TilingPatternEnv(env_storage_path='tiles7x5.json'), \
+            TilingPatternEnv(env_storage_path='tiles7x5.json')
+        self.assertEqual(1, cache.misses)
+        self.assertEqual(1, cache.hits)
+        self.assertIs(first_env.game.world_reset.default_grid, second_env.game.world_reset.default_grid)
+
+        storage = MultiRobotEnv.get_static_storage('tiles7x5.pickle')
+        self.assertFalse(storage.grid.flags.writeable)
+        self.assertEqual(2, cache.misses)
+
+    def test_cache_reloads_changed_file(self):
+        cache = ScenarioCache()
+        path = self.path('scenario.json')
+        Scenario(Scenario.TILING_PATTERN, np.zeros((3, 3)), [], lattice_size=2).save(path)
+        first = cache.get(path, Scenario.load)
+        self.assertIs(first, cache.get(path, Scenario.load))
+
+        Scenario(Scenario.TILING_PATTERN, np.ones((3, 4)), [], lattice_size=2).save(path)
+        second = cache.get(path, Scenario.load)
+        self.assertEqual((3, 4), second.grid.shape)
+        self.assertEqual((3, 3), first.grid.shape)
+        self.assertFalse(first.grid.any())
+        self.assertEqual({'hits': 1, 'misses': 2, 'size': 1, 'max_size': 32}, cache.info())
+
+    def test_cache_bounded(self):
+        cache = ScenarioCache(max_size=2)
+        for name in ('a', 'b', 'a', 'c'):
+            path = self.path(name + '.json')
+            if not os.path.exists(path):
+                Scenario(Scenario.TILING_PATTERN, np.zeros((3, 3)), [], lattice_size=2).save(path)
+            cache.get(path, Scenario.load)
+
+        self.assertEqual([os.path.realpath(self.path(name + '.json')) for name in ('a', 'c')], list(cache.entries))
+        self.assertEqual((1, 3), (cache.hits, cache.misses))
+
+
+if __name__ == '__main__':
+    unittest.main()
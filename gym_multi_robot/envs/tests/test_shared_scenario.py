@@ -0,0 +1,84 @@
+import multiprocessing
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from gym_multi_robot.envs.multi_robot_env import MultiRobotEnv
+from gym_multi_robot.envs.scenario import Scenario
+from gym_multi_robot.envs.shared_scenario import SharedScenarios, shared_memory
+from gym_multi_robot.envs.tiling_pattern_env import TilingPatternEnv
+from gym_multi_robot.generate_scenarios import generate_bank, generate_scenario
+
+
+def reset_grid(task):
+    """ Returns whether the scenario of a new environment is shared and its grid after a reset."""
+    path, index = task
+    env = TilingPatternEnv(env_storage_path=path, scenario_index=index)
+    env.reset()
+    return MultiRobotEnv.shared_storage is not None, env.game.grid.copy()
+
+
+@unittest.skipIf(shared_memory is None, "Shared memory is not available.")
+class TestSharedScenarios(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.bank_path = os.path.join(self.directory.name, 'bank.json')
+        self.scenario_path = os.path.join(self.directory.name, 'scenario.json')
+        self.bank = generate_bank(6, Scenario.TILING_PATTERN, (7, 5), 5, num_workers=0)
+        self.bank.save(self.bank_path)
+        generate_scenario(3, Scenario.TILING_PATTERN, (9, 9), 4).save(self.scenario_path)
+
+    def tearDown(self):
+        MultiRobotEnv.attach_static_storage(None)
+        self.directory.cleanup()
+
+    def test_attach(self):
+        with MultiRobotEnv.share_static_storage([self.bank_path, self.scenario_path]) as shared:
+            attached = SharedScenarios.attach(shared.handles)
+            bank = attached.get(os.path.realpath(self.bank_path))
+            scenario = attached.get(os.path.realpath(self.scenario_path))
+
+            self.assertEqual(len(self.bank), len(bank))
+            self.assertTrue(np.array_equal(self.bank.grids, bank.grids))
+            self.assertTrue(np.array_equal(self.bank.robots, bank.robots))
+            self.assertEqual(self.bank[2].robot_pos, bank[2].robot_pos)
+            self.assertEqual(Scenario.load(self.scenario_path).robot_pos, scenario.robot_pos)
+            self.assertFalse(bank.grids.flags.writeable)
+            self.assertFalse(scenario.grid.flags.writeable)
+            self.assertEqual(self.bank.grids.nbytes + self.bank.robots.nbytes + 81, shared.nbytes())
+            attached.close()
+
+    def test_environment_uses_shared_grid(self):
+        with MultiRobotEnv.share_static_storage([self.bank_path]) as shared:
+            MultiRobotEnv.attach_static_storage(shared.handles)
+            env = TilingPatternEnv(env_storage_path=self.bank_path, scenario_index=2)
+            env.reset()
+
+            template = env.game.world_reset.default_grid
+            self.assertTrue(np.shares_memory(template, MultiRobotEnv.shared_storage.get(
+                os.path.realpath(self.bank_path)).grids))
+            self.assertFalse(np.shares_memory(template, env.game.grid))
+            self.assertTrue(np.array_equal(self.bank.grids[2], env.game.grid))
+
+            env.step(np.ones((5, 4)))
+            self.assertTrue(np.array_equal(self.bank.grids[2], template))
+
+    def test_worker_processes(self):
+        with MultiRobotEnv.share_static_storage([self.bank_path]) as shared:
+            with multiprocessing.Pool(2, initializer=MultiRobotEnv.attach_static_storage,
+                                      initargs=(shared.handles,)) as pool:
+                results = pool.map(reset_grid, [(self.bank_path, index) for index in range(len(self.bank))])
+
+        for index, (is_shared, grid) in enumerate(results):
+            self.assertTrue(is_shared)
+            self.assertTrue(np.array_equal(self.bank.grids[index], grid))
+
+    def test_close_unlinks(self):
+        shared = MultiRobotEnv.share_static_storage([self.scenario_path])
+        shared.close()
+
+        self.assertRaises(FileNotFoundError, SharedScenarios.attach, shared.handles)
+        self.assertIsNone(shared.get(os.path.realpath(self.scenario_path)))
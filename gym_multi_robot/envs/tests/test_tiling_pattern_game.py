@@ -5,6 +5,7 @@ import numpy as np
 from gym_multi_robot.envs.gripping_robot import Heading, GripperRobot
 from gym_multi_robot.envs.robot_reset import RandomRobotReset, StaticRobotReset
 from gym_multi_robot.envs.tiling_pattern_game import TilingPatternGame, TilingPatternGameStorage
+from gym_multi_robot.envs.tiling_pattern_game_alternative import CountTilingPatternGame
 from gym_multi_robot.envs.world_reset import RandomWorldReset, StaticWorldReset
 
 
@@ -87,6 +88,7 @@ class TestTilingPatternGame(unittest.TestCase):
 
         game.grid[0][0] = 0
         game.grid[0][3] = 1
+        game.count_tiles()
 
         self.assertLessEqual(game.get_fitness(), 99.5)
         game.reset()
@@ -94,6 +96,55 @@ class TestTilingPatternGame(unittest.TestCase):
         self.assertEqual(12, game.num_tiles)
         self.assertAlmostEqual(100, game.get_fitness())
 
+    def test_tile_counts_follow_steps(self):
+        for batched in (True, False):
+            game = TilingPatternGame((9, 8), 3, RandomRobotReset(GripperRobot, 12), RandomWorldReset())
+            game.batched = batched
+            game.reset()
+
+            action_random = np.random.RandomState(1)
+            for _ in range(100):
+                game.update_robots(action_random.uniform(-1, 2, size=(12, 4)))
+
+                counts = [np.sum(game.grid[i:i + 4, j:j + 4]) for i in range(0, 8, 3) for j in range(0, 7, 3)]
+                self.assertEqual(counts, game.block_counts.tolist())
+
+    def test_border_tile_counts_for_all_blocks(self):
+        game = TilingPatternGame((5, 5), 2, RandomRobotReset(GripperRobot, 0), RandomWorldReset())
+        game.grid = np.zeros((5, 5), dtype=int)
+
+        game.set_tile((2, 2), 1)
+        self.assertEqual([1, 1, 1, 1], game.block_counts.tolist())
+
+        game.set_tile((2, 2), 0)
+        game.set_tile((4, 1), 1)
+        self.assertEqual([0, 0, 1, 0], game.block_counts.tolist())
+
+    def test_direct_grid_writes_counted_by_count_tiles(self):
+        for grid_backend in ('dense', 'uint8', 'sparse'):
+            game = TilingPatternGame((9, 8), 3, RandomRobotReset(GripperRobot, 0), RandomWorldReset(), grid_backend)
+            game.reset()
+
+            game.grid[1, 1] = 1 - game.grid[1, 1]
+            game.grid[8, 7] = 1 - game.grid[8, 7]
+            game.grid[3, 3] = 1 - game.grid[3, 3]
+            game.count_tiles()
+            game.set_tile((8, 7), 1 - game.grid[8, 7])
+            game.set_tile((4, 4), 1 - game.grid[4, 4])
+
+            counts = [np.sum(np.asarray(game.grid)[i:i + 4, j:j + 4]) for i in range(0, 8, 3)
+                      for j in range(0, 7, 3)]
+            self.assertEqual(counts, game.block_counts.tolist())
+
+    def test_count_fitness(self):
+        game = CountTilingPatternGame((7, 5), 2, RandomRobotReset(GripperRobot, 0), RandomWorldReset())
+        game.grid = np.zeros((7, 5), dtype=int)
+        game.set_tile((0, 0), 1)
+        game.set_tile((6, 4), 1)
+        game.set_tile((1, 2), 1)
+
+        self.assertEqual(2, game.get_fitness())
+
     def test_static_robot_reset(self):
         storage = static_correct_storage()
         storage.robot_pos = [((0, 0), Heading.NORTH)]
@@ -111,6 +162,28 @@ class TestTilingPatternGame(unittest.TestCase):
         self.assertEqual(Heading.NORTH, game.robots[0].heading)
         self.assertTrue(game.has_robot((0, 0)))
 
+    def test_reset_reuses_grid_and_robots(self):
+        storage = static_correct_storage()
+        storage.robot_pos = [((0, 0), Heading.NORTH), ((3, 3), Heading.SOUTH)]
+        game = create_static_game(storage)
+        game.reset()
+        grid, robots = game.grid, list(game.robots)
+
+        game.robots[0].hold_object = True
+        game.robots[0].move(1, 1, game)
+        game.set_tile((0, 1), 1)
+        game.reset()
+
+        self.assertIs(grid, game.grid)
+        self.assertTrue(all(a is b for a, b in zip(robots, game.robots)))
+        self.assertTrue(np.array_equal(storage.grid, game.grid))
+        self.assertEqual((0, 0), game.robots[0].location)
+        self.assertEqual(Heading.NORTH, game.robots[0].heading)
+        self.assertFalse(game.robots[0].hold_object)
+        self.assertTrue(game.has_robot((0, 0)))
+        self.assertFalse(game.has_robot((1, 0)))
+        self.assertAlmostEqual(100, game.get_fitness())
+
     def test_static_robots_reset(self):
         storage = static_correct_storage()
         storage.robot_pos = [((0, 0), Heading.NORTH), ((3, 3), Heading.SOUTH)]
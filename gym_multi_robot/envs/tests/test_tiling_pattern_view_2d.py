@@ -0,0 +1,58 @@
+import unittest
+
+import numpy as np
+
+from gym_multi_robot.envs.gripping_robot import Heading
+from gym_multi_robot.envs.tiling_pattern_env import TilingPatternEnv
+from gym_multi_robot.envs.tiling_pattern_view_2d import TilingPatternView2D
+
+
+class TestTilingPatternView2D(unittest.TestCase):
+
+    def test_rgb_array(self):
+        env = TilingPatternEnv(x_dim=7, y_dim=5, num_robots=2, seed=0)
+        env.reset()
+        env.game.grid = np.zeros((7, 5), dtype=int)
+        env.game.set_tile((1, 0), 1)
+        env.game.set_tile((2, 3), 1)
+        env.game.robots.place([[4, 1], [2, 3]], [Heading.EAST.value, Heading.NORTH.value])
+        env.game.robots[0].hold_object = True
+
+        frame = env.render('rgb_array')
+        view = env.game_view
+        self.assertIsNone(view.screen)
+        self.assertEqual((5 * 119 + 1, 7 * 85 + 1, 3), frame.shape)
+        self.assertEqual(np.uint8, frame.dtype)
+
+        def pixel(x, y, dx=0, dy=0):
+            """ Returns the colour of the pixel at the given offset from the centre of a cell."""
+            return tuple(frame[y * view.CELL_H + int(view.CELL_H * 0.5 + 0.5) + dy,
+                               x * view.CELL_W + int(view.CELL_W * 0.5 + 0.5) + dx])
+
+        self.assertEqual(view.tile_colour, pixel(1, 0))
+        self.assertEqual(view.background_colour, pixel(0, 0))
+        self.assertEqual(view.line_colour, tuple(frame[0, 10]))
+        self.assertEqual(view.line_colour, tuple(frame[-1, -1]))
+        self.assertEqual(view.object_colour, pixel(4, 1))
+        self.assertEqual(view.line_colour, pixel(4, 1, dx=30))
+        self.assertEqual(view.robot_colour, pixel(4, 1, dx=-30))
+        self.assertEqual(view.robot_colour, pixel(2, 3, dy=30))
+        self.assertEqual(view.line_colour, pixel(2, 3, dy=-30))
+
+        env.step([[1, 0, 0, 0], [0, 0, 0, 0]])
+        self.assertIs(frame, env.render('rgb_array'))
+        self.assertEqual(view.background_colour, pixel(4, 1))
+        self.assertEqual(view.object_colour, pixel(5, 1))
+
+    def test_layers_follow_grid_size(self):
+        env = TilingPatternEnv(x_dim=7, y_dim=5, num_robots=1)
+        env.reset()
+        view = TilingPatternView2D(env.game, screen_size=(100, 100))
+        self.assertEqual((5 * 19 + 1, 7 * 14 + 1, 3), view.update('rgb_array').shape)
+
+        env.game.grid = np.zeros((3, 3), dtype=int)
+        self.assertEqual((3 * 33 + 1, 3 * 33 + 1, 3), view.update('rgb_array').shape)
+
+
+if __name__ == '__main__':
+    unittest.main()
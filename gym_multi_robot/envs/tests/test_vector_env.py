@@ -0,0 +1,121 @@
+import copy
+import unittest
+
+import numpy as np
+
+from gym_multi_robot.envs.foraging_env import ForagingEnv
+from gym_multi_robot.envs.tiling_pattern_game_alternative import WeightedSumTilingPatternEnv
+from gym_multi_robot.envs.vector_env import VectorMultiRobotEnv, VectorTilingPatternEnv, VectorForagingEnv
+
+
+class TestVectorEnv(unittest.TestCase):
+
+    def assert_same_as_single(self, vector_env):
+        games = [copy.deepcopy(game) for game in vector_env.games]
+        for game in games:
+            game.array_observations = True
+
+        action_random = np.random.RandomState(0)
+        for _ in range(50):
+            actions = action_random.uniform(-1, 2, size=vector_env.locations.shape[:2] + (4,))
+            observations, _, _, _ = vector_env.step(actions)
+
+            for index, game in enumerate(games):
+                self.assertTrue(np.array_equal(game.update_robots(actions[index]), observations[index]))
+                self.assertTrue(np.array_equal(game.grid, vector_env.games[index].grid))
+                self.assertEqual(game.get_fitness(), vector_env.get_fitness(index))
+
+    def test_tiling_same_as_single(self):
+        self.assert_same_as_single(VectorTilingPatternEnv(4, x_dim=11, y_dim=11))
+
+    def test_foraging_same_as_single(self):
+        self.assert_same_as_single(VectorForagingEnv(4, x_dim=6, y_dim=6, num_tiles=10, target_area=(0, 0, 2, 2),
+                                                     num_robots=8))
+
+    def test_mixed_target_areas_same_as_single(self):
+        env = VectorMultiRobotEnv([ForagingEnv(x_dim=6, y_dim=6, num_tiles=12, target_area=area, num_robots=8, seed=i)
+                                   for i, area in enumerate(((0, 0, 2, 2), (3, 2, 3, 4), (1, 4, 4, 2)))])
+        self.assert_same_as_single(env)
+
+    def test_tile_listeners_of_all_worlds(self):
+        env = VectorForagingEnv(3, x_dim=6, y_dim=6, num_tiles=12, num_robots=8, seed=0)
+        changes = []
+        env.games[1].add_tile_listener(lambda x, y, change: changes.append(np.sum(change)))
+
+        action_random = np.random.RandomState(0)
+        grid = env.games[1].grid.sum()
+        for _ in range(30):
+            env.step(action_random.uniform(-1, 2, size=env.locations.shape[:2] + (4,)))
+
+        self.assertTrue(changes)
+        self.assertEqual(env.games[1].grid.sum() - grid, sum(changes))
+
+    def test_static_same_as_single(self):
+        self.assert_same_as_single(VectorTilingPatternEnv(3, env_storage_path='tiles11x11_block.pickle'))
+
+    def test_unbatched_same_as_single(self):
+        env = VectorTilingPatternEnv(3, x_dim=11, y_dim=11)
+        for game in env.games:
+            game.batched = False
+        self.assert_same_as_single(env)
+
+    def test_compact_grids(self):
+        env = VectorForagingEnv(2, x_dim=6, y_dim=6, num_tiles=5, grid_backend='uint8')
+
+        self.assertEqual(np.uint8, env.grids.dtype)
+        self.assertEqual(np.int16, env.robot_grids.dtype)
+        self.assertEqual(np.int16, env.games[0].padded_robot_grid.dtype)
+
+    def test_env_step_rewards(self):
+        vector_env = VectorMultiRobotEnv([WeightedSumTilingPatternEnv(seed=i) for i in range(3)])
+        envs = [copy.deepcopy(env) for env in vector_env.envs]
+
+        action_random = np.random.RandomState(0)
+        for _ in range(20):
+            actions = action_random.uniform(-1, 2, size=vector_env.locations.shape[:2] + (4,))
+            observations, rewards, _, _ = vector_env.step(actions)
+
+            for index, env in enumerate(envs):
+                observation, reward, _, _ = env.step(actions[index])
+                self.assertTrue(np.array_equal(observation, observations[index]))
+                self.assertEqual(reward, rewards[index])
+
+        self.assertTrue(np.array_equal([env.get_fitness() for env in envs], vector_env.get_fitness()))
+        self.assertTrue((vector_env.get_fitness() != 0).any())
+
+    def test_reset_seed(self):
+        env = VectorTilingPatternEnv(3, x_dim=7, y_dim=5)
+        observations = env.reset(seed=8).copy()
+        grids = env.grids.copy()
+
+        env.step(np.ones(env.locations.shape[:2] + (4,)))
+        self.assertTrue(np.array_equal(observations, env.reset(seed=8)))
+        self.assertTrue(np.array_equal(grids, env.grids))
+        self.assertTrue(np.array_equal(grids, VectorTilingPatternEnv(3, x_dim=7, y_dim=5, seed=8).grids))
+
+    def test_reset_shapes(self):
+        env = VectorTilingPatternEnv(3)
+        observations = env.reset()
+
+        self.assertEqual((3, 5, 17), observations.shape)
+        self.assertEqual((3,), env.get_fitness().shape)
+
+    def test_auto_reset(self):
+        env = VectorForagingEnv(2, max_steps=3)
+        env.reset()
+        actions = np.ones((2, 5, 4))
+
+        for _ in range(2):
+            _, _, dones, info = env.step(actions)
+            self.assertFalse(dones.any())
+            self.assertTrue(np.isnan(info['final_fitness']).all())
+
+        _, _, dones, info = env.step(actions)
+        self.assertTrue(dones.all())
+        self.assertFalse(np.isnan(info['final_fitness']).any())
+        self.assertTrue((env.steps == 0).all())
+        self.assertTrue((env.get_fitness() == 0).all())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,7 @@
 from gym_multi_robot.envs.gripping_robot import GripperRobot
 from gym_multi_robot.envs.robot_reset import RandomRobotReset, StaticRobotReset
-from gym_multi_robot.envs.tiling_pattern_game import TilingPatternGame, TilingPatternGameStorage
+from gym_multi_robot.envs.scenario import Scenario
+from gym_multi_robot.envs.tiling_pattern_game import TilingPatternGame
 from gym_multi_robot.envs.multi_robot_env import MultiRobotEnv
 from gym_multi_robot.envs.world_reset import RandomWorldReset, StaticWorldReset
 
@@ -12,15 +13,20 @@ class TilingPatternEnv(MultiRobotEnv):
         action = [[actions robot 1], ... [actions robot n]]
     The fitness returned by step is always 0, this is because the fitness is only important in the end.
     Then the fitness can be requested using env.get_fitness()
+    Actions can be given as (num_robots, 4) array, which is not changed, and the observations are returned as a
+    (num_robots, observation_size) int8 array, which is reused by the next step or reset
+    (or as lists without array_observations).
+    The env_storage_path is either a scenario or a scenario bank, of which scenario_index selects the scenario.
+    The grid_backend selects how the game stores its tiles, see MultiRobotGame.
     """
 
     def __init__(self, lattice_size=2, x_dim=7, y_dim=5, seed=None, num_robots=5, env_storage_path=None,
-                 game_cls=TilingPatternGame):
+                 game_cls=TilingPatternGame, array_observations=True, scenario_index=None, grid_backend='dense'):
         super().__init__(seed)
 
         if env_storage_path is not None:
-            env_storage = self.get_static_storage(env_storage_path)
-            assert isinstance(env_storage, TilingPatternGameStorage)
+            env_storage = self.get_static_storage(env_storage_path, scenario_index)
+            assert env_storage.game_type == Scenario.TILING_PATTERN
 
             robot_reset = StaticRobotReset(GripperRobot, env_storage.robot_pos)
             world_reset = StaticWorldReset(env_storage.grid)
@@ -31,4 +37,7 @@ class TilingPatternEnv(MultiRobotEnv):
             world_reset = RandomWorldReset()
             world_size = (x_dim, y_dim)
 
-        self.game = game_cls(world_size, lattice_size, robot_reset, world_reset)
+        self.game = game_cls(world_size, lattice_size, robot_reset, world_reset, grid_backend=grid_backend)
+        self.game.array_observations = array_observations
+        self.game.np_random = self.np_random
+        self.create_spaces()
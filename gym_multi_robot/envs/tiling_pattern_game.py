@@ -1,56 +1,132 @@
-import pickle
 import math
 import numpy as np
 
 from gym_multi_robot.envs.gripping_robot import GripperRobot
 from gym_multi_robot.envs.multi_robot_game import MultiRobotGame
+from gym_multi_robot.envs.scenario import Scenario
 
 
 class TilingPatternGame(MultiRobotGame):
-    """ This class represents a grid used for the tiling pattern problem."""
+    """ This class represents a grid used for the tiling pattern problem.
+    The number of tiles in every lattice block is kept up to date with every change of the grid, a block counts the
+    tiles of the (lattice_size + 1) x (lattice_size + 1) locations starting at its corner,
+    so the locations on the border of two blocks count for both.
+    Tiles written directly into the grid are not counted, count_tiles should be called after such writes.
+    """
 
-    def __init__(self, grid_size, lattice_size, robot_reset, world_reset):
-        super().__init__(grid_size, self.get_num_tiles(grid_size, lattice_size), robot_reset, world_reset)
+    tracks_tiles = True
+    view_entry_point = 'gym_multi_robot.envs.tiling_pattern_view_2d:TilingPatternView2D'
+
+    def __init__(self, grid_size, lattice_size, robot_reset, world_reset, grid_backend='dense'):
+        super().__init__(grid_size, self.get_num_tiles(grid_size, lattice_size), robot_reset, world_reset,
+                         grid_backend)
 
         self.lattice_size = lattice_size
         self.robot_cls = GripperRobot
+        self.axis_blocks = None
+        self.cell_blocks = None
+        self.count_tiles()
 
     @staticmethod
     def get_num_tiles(grid_size, lattice_size):
 
         return int(math.ceil(grid_size[0] / lattice_size) * math.ceil(grid_size[1] / lattice_size))
 
+    def count_tiles(self):
+        """ Counts the tiles in every lattice block of the grid."""
+        if self.axis_blocks is None or tuple(map(len, self.axis_blocks[:2])) != self.grid.shape:
+            (x_blocks, num_x_blocks), (y_blocks, num_y_blocks) = self.get_axis_blocks(self.grid.shape,
+                                                                                      self.lattice_size)
+            self.num_blocks = num_x_blocks * num_y_blocks
+            self.axis_blocks = x_blocks, y_blocks, num_y_blocks
+
+            # The blocks of a sparse grid are found from the coordinates, so they take no memory per location.
+            self.cell_blocks = None
+            if self.grid_backend != 'sparse':
+                self.cell_blocks = self.combine_blocks(x_blocks[:, None], y_blocks[None, :], num_y_blocks,
+                                                       self.num_blocks)
+
+        # The last count belongs to a dummy block, to which locations belonging to less than four blocks are mapped.
+        x, y = np.nonzero(self.grid)
+        self.tile_counts = np.bincount(self.blocks(x, y).ravel(), weights=np.repeat(self.grid[x, y], 4),
+                                       minlength=self.num_blocks + 1).astype(int)
+
+    def blocks(self, x, y):
+        """ Returns the indices of the (at most) four blocks of the given locations as (..., 4) array."""
+        if self.cell_blocks is not None:
+            return self.cell_blocks[x, y]
+
+        x_blocks, y_blocks, num_y_blocks = self.axis_blocks
+        return self.combine_blocks(x_blocks[x], y_blocks[y], num_y_blocks, self.num_blocks)
+
+    def tiles_changed(self, x, y, changes):
+        """ Updates the counts of the blocks that the changed locations belong to."""
+        np.add.at(self.tile_counts, self.blocks(x, y), np.expand_dims(changes, -1))
+        super().tiles_changed(x, y, changes)
+
+    def state_fields(self):
+        """ The block counts are stored with the grid, so they need not be counted again on a restore."""
+        return super().state_fields() + [('tile_counts', np.int32, self.tile_counts.shape)]
+
+    def save_state(self, state):
+        super().save_state(state)
+        state['tile_counts'] = self.tile_counts
+
+    def load_state(self, state):
+        super().load_state(state)
+        self.tile_counts[...] = state['tile_counts']
+
+    @property
+    def block_counts(self):
+        """ Returns the number of tiles in every lattice block."""
+        return self.tile_counts[:-1]
+
+    @staticmethod
+    def get_axis_blocks(grid_size, lattice_size):
+        """ Returns for both axes the indices of the (at most) two blocks along the axis that each coordinate belongs
+        to (or -1) as (size, 2) array, with the number of blocks along the axis. Blocks start at every lattice_size
+        coordinate, except for the last coordinate."""
+        block_indices = []
+        for size in grid_size:
+            num_blocks = len(range(0, size - 1, lattice_size))
+            location = np.arange(size)
+            first, second = location // lattice_size, location // lattice_size - 1
+            first[first >= num_blocks] = -1
+            second[(location % lattice_size != 0) | (second >= num_blocks)] = -1
+            block_indices.append((np.stack((first, second), axis=-1), num_blocks))
+
+        return block_indices
+
+    @staticmethod
+    def combine_blocks(x_blocks, y_blocks, num_y_blocks, num_blocks):
+        """ Returns the (..., 4) block indices of locations given the (..., 2) block indices of their coordinates,
+        locations that belong to less than four blocks are mapped to the dummy block num_blocks."""
+        x_blocks = x_blocks[..., :, None]
+        y_blocks = y_blocks[..., None, :]
+        blocks = np.where((x_blocks >= 0) & (y_blocks >= 0), x_blocks * num_y_blocks + y_blocks, num_blocks)
+        return blocks.reshape(blocks.shape[:-2] + (4,))
+
     def get_fitness(self):
         """ This function gets the fitness the current tile construction.
             The grid is divided in grid blocks, which all need to have the same number of tiles on it in order to
             be a perfect tile construction.
         """
         s = -100
-        p_js = []
-
-        for i in range(0, len(self.grid) - 1, self.lattice_size):  # -1 to not take into account the last block.
-            for j in range(0, len(self.grid[0]) - 1, self.lattice_size):
-
-                sub_grid = self.grid[i:i + self.lattice_size + 1, j:j + self.lattice_size + 1]
-                count = np.sum(np.sum(sub_grid))
-                p_js.append(count)
+        p_js = self.block_counts
 
-        summed_p_j = sum(p_js)
-        f = 0
-        for p in p_js:
-                p /= summed_p_j         # Divide by sum of all elements.
-                if p != 0:
-                    f += p * math.log(p)    # Calculate entropy.
+        with np.errstate(invalid='ignore', divide='ignore'):
+            p_js = p_js / p_js.sum()                    # Divide by sum of all elements.
+            p_js = p_js[p_js != 0]
+            f = float(np.sum(p_js * np.log(p_js)))      # Calculate entropy.
 
-        f *= s / math.log(len(p_js))
+        f *= s / math.log(self.num_blocks)
         # TODO: possibly count tiles that robot holds.
 
         return f
 
-    def write(self, storage_file='tiling_pattern_game.pickle'):
-        """ Writes the current configuration of robots and tiles to 2 different files."""
-        storage = TilingPatternGameStorage(self)
-        pickle.dump(storage, open(storage_file, 'wb'))
+    def write(self, storage_file='tiling_pattern_game.json'):
+        """ Writes the current configuration of robots and tiles as scenario (a header and a grid file)."""
+        Scenario.from_storage(TilingPatternGameStorage(self)).save(storage_file)
 
 
 class TilingPatternGameStorage:
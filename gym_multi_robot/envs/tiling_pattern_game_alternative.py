@@ -1,6 +1,7 @@
 import numpy as np
 
 from gym_multi_robot.envs import TilingPatternEnv
+from gym_multi_robot.envs.grid_backend import SparseGrid
 from gym_multi_robot.envs.tiling_pattern_game import TilingPatternGame
 
 
@@ -11,12 +12,10 @@ class CountTilingPatternGame(TilingPatternGame):
 
     def get_fitness(self):
         """ Alternative fitness function that counts the number of locations that are correctly occupied."""
-        fitness = 0
-        for i in range(0, len(self.grid), self.lattice_size):  # -1 to not take into account the last block.
-            for j in range(0, len(self.grid[0]), self.lattice_size):
-                fitness += self.grid[i, j]
-
-        return fitness
+        if isinstance(self.grid, SparseGrid):
+            return sum(value for (x, y), value in self.grid.tiles.items()
+                       if x % self.lattice_size == 0 and y % self.lattice_size == 0)
+        return self.grid[::self.lattice_size, ::self.lattice_size].sum()
 
 
 class DifferenceTilingPatternGame(TilingPatternGame):
@@ -26,18 +25,9 @@ class DifferenceTilingPatternGame(TilingPatternGame):
 
     def get_fitness(self):
         """ This function returns the difference by taking the difference from the ideal field."""
-        p_js = []
-
-        for i in range(0, len(self.grid) - 1, self.lattice_size):  # -1 to not take into account the last block.
-            for j in range(0, len(self.grid[0]) - 1, self.lattice_size):
-
-                sub_grid = self.grid[i:i + self.lattice_size + 1, j:j + self.lattice_size + 1]
-                count = np.sum(np.sum(sub_grid))
-                p_js.append(count)
 
         # Alternative fitness calculation, difference from 4 per square.
-        p_js = np.array(p_js)
-        difference = sum(abs(p_js - 4))
+        difference = np.abs(self.block_counts - 4).sum()
         return -difference
 
 
@@ -45,28 +35,38 @@ class SteppedTilingPatternEnv(TilingPatternEnv):
     """ Child classes of this class should set summed_reward in update function which can be returned by get_fitness."""
 
     def __init__(self, lattice_size=2, x_dim=7, y_dim=5, seed=None, num_robots=5, env_storage_path=None,
-                 game_cls=TilingPatternGame):
-        super().__init__(lattice_size, x_dim, y_dim, seed, num_robots, env_storage_path, game_cls)
+                 game_cls=TilingPatternGame, array_observations=True, scenario_index=None, grid_backend='dense'):
+        super().__init__(lattice_size, x_dim, y_dim, seed, num_robots, env_storage_path, game_cls,
+                         array_observations=array_observations, scenario_index=scenario_index,
+                         grid_backend=grid_backend)
 
         self.summed_reward = 0
 
-    def reset(self):
+    def reset(self, seed=None):
         self.summed_reward = 0
-        return super().reset()
+        return super().reset(seed)
 
     def get_fitness(self):
         return self.summed_reward
 
+    def state_fields(self):
+        return super().state_fields() + [('summed_reward', np.float64, ())]
+
+    def save_state(self, state):
+        super().save_state(state)
+        state['summed_reward'] = self.summed_reward
+
+    def load_state(self, state):
+        super().load_state(state)
+        self.summed_reward = float(state['summed_reward'])
+
 
 class SummedTilingPatternEnv(SteppedTilingPatternEnv):
     """ This function returns a fitness at every time step. """
 
     def step(self, actions):
-
-        observation = self.game.update_robots(actions)
-        reward = self.game.get_fitness()
-        done = self.game.game_over
-        info = dict()
+        observation, _, done, info = super().step(actions)
+        reward = self.game_fitness()
 
         self.summed_reward += reward
 
@@ -77,20 +77,31 @@ class WeightedSumTilingPatternEnv(SteppedTilingPatternEnv):
     """ This class calculates the fitness by getting a weighted sum over all timesteps. (weight increases with step) """
 
     def __init__(self, lattice_size=2, x_dim=7, y_dim=5, seed=None, num_robots=5, env_storage_path=None,
-                 game_cls=TilingPatternGame):
-        super().__init__(lattice_size, x_dim, y_dim, seed, num_robots, env_storage_path, game_cls)
+                 game_cls=TilingPatternGame, array_observations=True, scenario_index=None, grid_backend='dense'):
+        super().__init__(lattice_size, x_dim, y_dim, seed, num_robots, env_storage_path, game_cls,
+                         array_observations=array_observations, scenario_index=scenario_index,
+                         grid_backend=grid_backend)
 
         self.step_nr = 0
 
-    def reset(self):
+    def reset(self, seed=None):
         self.step_nr = 0
-        return super().reset()
+        return super().reset(seed)
+
+    def state_fields(self):
+        return super().state_fields() + [('step_nr', np.int64, ())]
+
+    def save_state(self, state):
+        super().save_state(state)
+        state['step_nr'] = self.step_nr
+
+    def load_state(self, state):
+        super().load_state(state)
+        self.step_nr = int(state['step_nr'])
 
     def step(self, actions):
-        observation = self.game.update_robots(actions)
-        reward = self.game.get_fitness()
-        done = self.game.game_over
-        info = dict()
+        observation, _, done, info = super().step(actions)
+        reward = self.game_fitness()
 
         self.summed_reward += (reward * self.step_nr)
         self.step_nr += 1
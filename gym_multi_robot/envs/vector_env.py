@@ -0,0 +1,210 @@
+import numpy as np
+
+from gym_multi_robot.envs.foraging_env import ForagingEnv
+from gym_multi_robot.envs.multi_robot_env import MultiRobotEnv
+from gym_multi_robot.envs.profiler import PhaseProfiler
+from gym_multi_robot.envs.robot_engine import RobotEngine
+from gym_multi_robot.envs.tiling_pattern_env import TilingPatternEnv
+
+
+class WorldSettings:
+    """ This class gives the RobotEngine the settings of the games of all worlds. The world_attributes of the robot
+    class are stacked over the games into (..., num_worlds, 1) arrays, which broadcast against the robot arrays, so
+    every world keeps for example its own target area. The tiles are tracked if any of the games tracks them.
+    """
+
+    def __init__(self, games, robot_cls):
+        self.games = games
+        self.profiler = None
+        for name in robot_cls.world_attributes:
+            values = np.array([getattr(game, name) for game in games])
+            setattr(self, name, np.moveaxis(values, 0, -1)[..., None])
+
+    @property
+    def tracks_tiles(self):
+        return any(game.tracks_tiles for game in self.games)
+
+
+class VectorMultiRobotEnv:
+    """ This class runs a number of independent, equally sized environments in lockstep.
+    The grids of all worlds are stored in (num_worlds, width + 2, height + 2) arrays and the robots of all worlds in
+    (num_worlds, num_robots, ...) arrays, which the games of the environments use as their own.
+    This way all worlds are stepped at once with a single RobotEngine, unless a game is not batched or its robots
+    cannot be stepped at once. The settings of the games may differ, see WorldSettings. Environments that override
+    step (for example to sum a reward over the steps) are stepped one after another with their own step, so their
+    bookkeeping is kept, and their rewards are returned.
+    Actions are given as (num_worlds, num_robots, 4) array and observations are returned as
+    (num_worlds, num_robots, observation_size) array, which is reused by the next step or reset.
+    A world is reset automatically when its game is over or after max_steps steps (if given),
+    the fitness it reached is then given in info['final_fitness'] (which is nan for the other worlds).
+    After enable_profiling the phases of all worlds are timed by a single profiler, see MultiRobotEnv.
+    """
+
+    def __init__(self, envs, max_steps=None):
+        self.envs = envs
+        self.games = [env.game for env in envs]
+        self.max_steps = max_steps
+        self.steps = np.zeros(self.num_worlds, dtype=int)
+        self.profiler = None
+        self.env_steps = any(type(env).step is not MultiRobotEnv.step for env in envs)
+
+        # Reset every world once to know the number of robots.
+        for env in envs:
+            env.reset()
+
+        game = self.games[0]
+        num_robots = len(game.robots)
+        if any(other.padded_grid is None for other in self.games):
+            raise ValueError("The environments should have a dense grid.")
+        if any(len(other.robots) != num_robots or other.grid.shape != game.grid.shape for other in self.games):
+            raise ValueError("All environments should have the same grid size and number of robots.")
+        if any(other.grid_backend != game.grid_backend for other in self.games):
+            raise ValueError("All environments should have the same grid backend.")
+
+        self.grids = np.zeros((self.num_worlds,) + game.padded_grid.shape, dtype=game.padded_grid.dtype)
+        self.robot_grids = np.zeros((self.num_worlds,) + game.padded_robot_grid.shape,
+                                    dtype=game.padded_robot_grid.dtype)
+        self.locations = np.zeros((self.num_worlds, num_robots, 2), dtype=int)
+        self.headings = np.zeros((self.num_worlds, num_robots), dtype=int)
+        self.holds = np.zeros((self.num_worlds, num_robots), dtype=bool)
+        self.observations = np.zeros((self.num_worlds,) + game.get_observations().shape, dtype=game.observation_dtype)
+
+        for index, game in enumerate(self.games):
+            game.bind_grids(self.grids[index], self.robot_grids[index])
+            game.robots.bind_arrays(self.locations[index], self.headings[index], self.holds[index])
+            game.array_observations = True
+            game.observations = self.observations[index]
+            game.get_observations()
+
+        self.robot_engine = RobotEngine(game.robots.robot_cls)
+        self.settings = WorldSettings(self.games, game.robots.robot_cls)
+
+    @property
+    def num_worlds(self):
+        return len(self.envs)
+
+    def seed(self, seed=None):
+        """ Seeds the environment of world i with seed + i, or randomly if no seed is given."""
+        return [env.seed(None if seed is None else seed + index) for index, env in enumerate(self.envs)]
+
+    def enable_profiling(self, profiler=None):
+        """ Times the phases of the resets and steps of all worlds with the given profiler (a new one by default),
+        returns it."""
+        self.profiler = self.settings.profiler = PhaseProfiler() if profiler is None else profiler
+        for env in self.envs:
+            env.enable_profiling(self.profiler)
+        return self.profiler
+
+    def disable_profiling(self):
+        self.profiler = self.settings.profiler = None
+        for env in self.envs:
+            env.disable_profiling()
+
+    def stats(self):
+        """ Returns the statistics of the timed phases, see PhaseProfiler.stats."""
+        return {} if self.profiler is None else self.profiler.stats()
+
+    def reset(self, seed=None):
+        """ Resets all worlds and returns their observations, seeding them first if a seed is given."""
+        if seed is not None:
+            self.seed(seed)
+
+        for index in range(self.num_worlds):
+            self.reset_world(index)
+
+        return self.observations
+
+    def reset_world(self, index):
+        """ Resets the world with the given index, its observations are written to the observations of all worlds."""
+        self.steps[index] = 0
+        self.envs[index].reset()
+
+        if len(self.games[index].robots) != self.headings.shape[1]:
+            raise ValueError("The number of robots of a world should not change on reset.")
+
+    def step(self, actions):
+        """ Executes the (num_worlds, num_robots, 4) actions in all worlds."""
+        if self.env_steps:
+            return self.__step_envs(actions)
+
+        profiler = self.profiler
+        if profiler is not None:
+            profiler.last.clear()
+            start = profiler.clock()
+
+        if all(game.batchable() and game.robots.robot_cls is self.robot_engine.robot_cls for game in self.games):
+            collected = self.robot_engine.step(self.settings, self.grids, self.robot_grids, self.locations,
+                                               self.headings, self.holds, actions, self.observations)
+            for index in np.flatnonzero(collected):
+                self.robot_engine.robot_cls.collect(self.games[index], int(collected[index]))
+            if self.settings.tracks_tiles:
+                self.__tiles_changed(*self.robot_engine.tile_changes)
+            if profiler is not None:
+                profiler.lap('tiles')
+        else:
+            for game, world_actions in zip(self.games, actions):
+                game.update_robots(world_actions)
+
+        dones, info = self.__end_step()
+        if profiler is not None:
+            profiler.add('step', profiler.clock() - start)
+            info['phase_times'] = dict(profiler.last)
+        return self.observations, np.zeros(self.num_worlds), dones, info
+
+    def __step_envs(self, actions):
+        """ Steps the environments one after another with their own step, which time their own steps when profiling,
+        so info['phase_times'] sums the phases of all worlds."""
+        rewards = np.zeros(self.num_worlds)
+        phase_times = {}
+        for index, env in enumerate(self.envs):
+            rewards[index] = env.step(actions[index])[1]
+            if self.profiler is not None:
+                for phase, seconds in self.profiler.last.items():
+                    phase_times[phase] = phase_times.get(phase, 0.0) + seconds
+
+        dones, info = self.__end_step()
+        if self.profiler is not None:
+            info['phase_times'] = phase_times
+        return self.observations, rewards, dones, info
+
+    def __end_step(self):
+        """ Counts the step, resets the worlds that are done and returns which worlds were done and the info."""
+        self.steps += 1
+        dones = np.array([game.game_over for game in self.games])
+        if self.max_steps is not None:
+            dones |= self.steps >= self.max_steps
+
+        final_fitness = np.full(self.num_worlds, np.nan)
+        for index in np.flatnonzero(dones):
+            final_fitness[index] = self.get_fitness(index)
+            self.reset_world(index)
+
+        return dones, {'final_fitness': final_fitness}
+
+    def __tiles_changed(self, x, y, changes):
+        """ Passes the tile changes of the last step to the games of the worlds in which they took place."""
+        for index in np.flatnonzero(changes.any(axis=1)):
+            self.games[index].tiles_changed(x[index], y[index], changes[index])
+
+    def get_fitness(self, index=None):
+        """ Returns the fitness of the world with the given index, or an array with the fitness of every world."""
+        if index is not None:
+            return self.envs[index].get_fitness()
+
+        return np.array([env.get_fitness() for env in self.envs], dtype=float)
+
+
+class VectorTilingPatternEnv(VectorMultiRobotEnv):
+    """ This class runs num_worlds tiling pattern environments, created with the given arguments, in lockstep."""
+
+    def __init__(self, num_worlds, max_steps=None, seed=None, **kwargs):
+        super().__init__([TilingPatternEnv(seed=None if seed is None else seed + i, **kwargs)
+                          for i in range(num_worlds)], max_steps)
+
+
+class VectorForagingEnv(VectorMultiRobotEnv):
+    """ This class runs num_worlds foraging environments, created with the given arguments, in lockstep."""
+
+    def __init__(self, num_worlds, max_steps=None, seed=None, **kwargs):
+        super().__init__([ForagingEnv(seed=None if seed is None else seed + i, **kwargs)
+                          for i in range(num_worlds)], max_steps)
@@ -1,7 +1,7 @@
-import random
-
 import numpy as np
 
+from gym_multi_robot.envs.grid_backend import SparseGrid
+
 
 class WorldReset:
     """ This class resets the world"""
@@ -11,22 +11,48 @@ class WorldReset:
 
     @staticmethod
     def clear_world(game):
-        """ This function clears all robots from the given game."""
+        """ This function clears all tiles from the grid of the given game, in place."""
 
-        game.grid = np.zeros((game.GRID_W, game.GRID_H), dtype=int)
+        game.grid.fill(0)
+        game.count_tiles()
 
 
 class RandomWorldReset(WorldReset):
-    """ This class randomly resets the world by randomly dropping the required number of tiles."""
+    """ This class randomly resets the world by dropping the required number of tiles on distinct locations,
+    drawn at once from the locations that are valid initial drops using the random generator of the game.
+    The drops on a sparse grid are drawn by rejection instead, without going over all locations."""
+
+    MAX_DRAWS = 100     # The number of times the drops on a sparse grid are drawn before giving up.
+
     def reset(self, game):
 
         self.clear_world(game)
-        for _ in range(game.num_tiles):
-            while True:
-                rand_loc = (random.randrange(0, game.GRID_W), random.randrange(0, game.GRID_H))
-                if game.valid_initial_drop(rand_loc):
-                    game.grid[rand_loc[0]][rand_loc[1]] = 1
-                    break
+        if isinstance(game.grid, SparseGrid) and game.num_tiles <= game.grid.size // 2:
+            x, y = self.draw_sparse_drops(game)
+        else:
+            locations = np.flatnonzero(game.initial_drop_mask())
+            if len(locations) < game.num_tiles:
+                raise ValueError("Cannot drop %d tiles on %d locations." % (game.num_tiles, len(locations)))
+
+            x, y = np.unravel_index(game.np_random.choice(locations, game.num_tiles, replace=False), game.grid.shape)
+
+        game.grid[x, y] = 1
+        game.count_tiles()
+
+    def draw_sparse_drops(self, game):
+        """ Returns the x and y coordinates of distinct valid initial drops, drawn by rejection."""
+        cells = np.zeros(0, dtype=np.int64)
+        for _ in range(self.MAX_DRAWS):
+            candidates = game.np_random.integers(0, game.grid.size, 2 * (game.num_tiles - len(cells)))
+            candidates = candidates[game.valid_initial_drops(*np.unravel_index(candidates, game.grid.shape))]
+            cells = np.concatenate((cells, candidates))
+            _, first = np.unique(cells, return_index=True)
+            cells = cells[np.sort(first)][:game.num_tiles]
+
+            if len(cells) == game.num_tiles:
+                return np.unravel_index(cells, game.grid.shape)
+
+        raise ValueError("Cannot drop %d tiles on the valid locations." % game.num_tiles)
 
 
 class StaticWorldReset(WorldReset):
@@ -36,4 +62,4 @@ class StaticWorldReset(WorldReset):
         self.default_grid = default_grid
 
     def reset(self, game):
-        game.grid = np.copy(self.default_grid)
+        game.grid = self.default_grid   # Copied into the grid of the game.
@@ -0,0 +1,88 @@
+import argparse
+import functools
+import multiprocessing
+
+import numpy as np
+
+from gym_multi_robot.envs.foraging_game import ForagingGame
+from gym_multi_robot.envs.foraging_robot import ForagingRobot
+from gym_multi_robot.envs.gripping_robot import GripperRobot
+from gym_multi_robot.envs.robot_reset import RandomRobotReset
+from gym_multi_robot.envs.scenario import Scenario, ScenarioBank
+from gym_multi_robot.envs.tiling_pattern_game import TilingPatternGame
+from gym_multi_robot.envs.world_reset import RandomWorldReset
+
+
+def create_game(game_type, grid_size, num_robots, lattice_size=2, num_tiles=None, target_area=(0, 0, 1, 1)):
+    """ Returns a randomly resetting game of the given type."""
+    if game_type == Scenario.TILING_PATTERN:
+        return TilingPatternGame(grid_size, lattice_size, RandomRobotReset(GripperRobot, num_robots),
+                                 RandomWorldReset())
+    if game_type == Scenario.FORAGING:
+        return ForagingGame(grid_size, num_tiles, target_area, RandomRobotReset(ForagingRobot, num_robots),
+                            RandomWorldReset())
+
+    raise ValueError("Unknown game type %s." % game_type)
+
+
+def generate_scenario(seed, game_type, grid_size, num_robots, lattice_size=2, num_tiles=None,
+                      target_area=(0, 0, 1, 1)):
+    """ Returns the scenario of a game of the given type after a reset with the given seed."""
+    game = create_game(game_type, grid_size, num_robots, lattice_size, num_tiles, target_area)
+    game.np_random = np.random.default_rng(seed)
+    game.reset()
+
+    robot_pos = [(robot.location, robot.heading) for robot in game.robots]
+    if game_type == Scenario.TILING_PATTERN:
+        return Scenario(game_type, np.copy(game.grid), robot_pos, lattice_size=lattice_size)
+
+    return Scenario(game_type, np.copy(game.grid), robot_pos, target_area=tuple(target_area), num_tiles=num_tiles)
+
+
+def generate_bank(count, game_type, grid_size, num_robots, lattice_size=2, num_tiles=None, target_area=(0, 0, 1, 1),
+                  seed=0, num_workers=None, chunksize=16):
+    """ Generates a bank of count scenarios, scenario k is generated with seed + k.
+    The scenarios are generated in a pool of num_workers processes (all cpus by default, serial with 0 workers),
+    the result does not depend on the number of workers."""
+    seeds = list(range(seed, seed + count))
+    generate = functools.partial(generate_scenario, game_type=game_type, grid_size=tuple(grid_size),
+                                 num_robots=num_robots, lattice_size=lattice_size, num_tiles=num_tiles,
+                                 target_area=tuple(target_area))
+
+    if num_workers == 0:
+        scenarios = [generate(s) for s in seeds]
+    else:
+        with multiprocessing.Pool(num_workers) as pool:
+            scenarios = pool.map(generate, seeds, chunksize=chunksize)
+
+    return ScenarioBank.from_scenarios(scenarios, seeds)
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description="Generates a bank of seeded random scenarios, stored as a json "
+                                                 "index with stacked grid and robot arrays next to it.")
+    parser.add_argument('output', help="The header (.json) of the bank to write.")
+    parser.add_argument('--game', choices=(Scenario.TILING_PATTERN, Scenario.FORAGING),
+                        default=Scenario.TILING_PATTERN, help="The game type of the scenarios.")
+    parser.add_argument('--count', type=int, default=100, help="The number of scenarios.")
+    parser.add_argument('--seed', type=int, default=0, help="The seed of the first scenario.")
+    parser.add_argument('--size', type=int, nargs=2, default=(7, 5), metavar=('X', 'Y'), help="The grid size.")
+    parser.add_argument('--robots', type=int, default=5, help="The number of robots.")
+    parser.add_argument('--lattice-size', type=int, default=2, help="The lattice size of tiling pattern scenarios.")
+    parser.add_argument('--tiles', type=int, default=2, help="The number of tiles of foraging scenarios.")
+    parser.add_argument('--target-area', type=int, nargs=4, default=(0, 0, 1, 1),
+                        metavar=('X', 'Y', 'X_LENGTH', 'Y_LENGTH'), help="The target area of foraging scenarios.")
+    parser.add_argument('--workers', type=int, default=None, help="The number of worker processes (0 is serial).")
+    parser.add_argument('--chunksize', type=int, default=16, help="The number of scenarios per worker task.")
+    args = parser.parse_args(args)
+
+    num_tiles = args.tiles if args.game == Scenario.FORAGING else None
+    bank = generate_bank(args.count, args.game, args.size, args.robots, args.lattice_size, num_tiles,
+                         args.target_area, args.seed, args.workers, args.chunksize)
+    bank.save(args.output)
+    print("Generated %d %s scenarios of %dx%d -> %s" % (len(bank), args.game, args.size[0], args.size[1],
+                                                       args.output))
+
+
+if __name__ == '__main__':
+    main()
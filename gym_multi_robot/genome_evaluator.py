@@ -0,0 +1,156 @@
+import json
+import multiprocessing
+import time
+
+import numpy as np
+
+from gym_multi_robot.envs.multi_robot_env import MultiRobotEnv
+from gym_multi_robot.envs.profiler import merge_stats
+
+# The worker of the current process, created by the pool initializer.
+_worker = None
+
+
+def seed_environment(env, seed):
+    """ Seeds the random generators that are used when resetting the given (possibly wrapped) environment."""
+    getattr(env, 'unwrapped', env).seed(seed)
+
+
+class EvaluationWorker:
+    """ This class holds the environment of a worker process and evaluates trials of genomes in it.
+    If profile is set, the phases of the environment are timed per trial."""
+
+    def __init__(self, env_factory, eval_function, config, profile=False):
+        self.env = env_factory()
+        self.eval_function = eval_function
+        self.config = config
+        self.profiler = getattr(self.env, 'unwrapped', self.env).enable_profiling() if profile else None
+
+    def run(self, task):
+        """ Runs a single trial, returns the genome index, trial, fitness, runtime in seconds and the statistics of
+        the timed phases (None without profiling)."""
+        index, trial, seed, genome = task
+        start_time = time.time()
+        if self.profiler is not None:
+            self.profiler.clear()
+
+        seed_environment(self.env, seed)
+        fitness = self.eval_function(genome, self.config, self.env)
+
+        stats = None if self.profiler is None else self.profiler.stats()
+        return index, trial, fitness, time.time() - start_time, stats
+
+
+def _init_worker(env_factory, eval_function, config, profile, shared_handles):
+    global _worker
+    if shared_handles is not None:
+        MultiRobotEnv.attach_static_storage(shared_handles)
+    _worker = EvaluationWorker(env_factory, eval_function, config, profile)
+
+
+def _run_task(task):
+    return _worker.run(task)
+
+
+class GenomeEvaluator:
+    """ This class evaluates genomes in a pool of worker processes, each with its own environment.
+    The eval_function is called as eval_function(genome, config, env) and returns the fitness of a single trial,
+    the fitness of a genome is the mean fitness of its num_trials trials.
+    Trial t of every genome starts with the environment seeded with seed + t, so the fitness of a genome does not
+    depend on the worker that runs it and equals the fitness of a serial evaluation (num_workers=0).
+    The env_factory and eval_function should be picklable, for example module level functions or classes.
+    Can be used directly as the fitness function of a neat population: population.run(evaluator.evaluate, n).
+    With profile set, the phases of the environments are timed and the statistics of all trials of the last
+    evaluation are kept in profile_stats, which write_profile writes as json.
+    The scenarios (and scenario banks) at the shared_scenarios paths are placed in shared memory once, which the
+    workers use instead of loading their own copy. They are freed on close.
+    """
+
+    def __init__(self, env_factory, eval_function, num_trials=1, num_workers=None, chunksize=1, seed=0,
+                 profile=False, shared_scenarios=()):
+        self.env_factory = env_factory
+        self.eval_function = eval_function
+        self.num_trials = num_trials
+        self.num_workers = multiprocessing.cpu_count() if num_workers is None else num_workers
+        self.chunksize = chunksize
+        self.seed = seed
+
+        self.profile = profile
+        self.shared_scenarios = list(shared_scenarios)
+        self.shared_storage = None
+        self.timings = {}       # The runtime in seconds of every genome id in the last evaluation.
+        self.profile_stats = {}
+        self.generation = 0     # The number of evaluations.
+        self.config = None
+        self.pool = None
+        self.worker = None
+
+    def evaluate(self, genomes, config):
+        """ Evaluates the given (genome id, genome) pairs, sets their fitness and returns the fitness array."""
+        genomes = list(genomes)
+        tasks = [(index, trial, self.seed + trial, genome)
+                 for index, (_, genome) in enumerate(genomes) for trial in range(self.num_trials)]
+
+        if self.num_workers == 0:
+            results = map(self.__serial_worker(config).run, tasks)
+        else:
+            results = self.__pool(config).imap_unordered(_run_task, tasks, self.chunksize)
+
+        fitnesses = np.zeros((len(genomes), self.num_trials))
+        runtimes = np.zeros(len(genomes))
+        self.profile_stats = {}
+        for index, trial, fitness, runtime, stats in results:
+            fitnesses[index, trial] = fitness
+            runtimes[index] += runtime
+            if stats is not None:
+                self.profile_stats = merge_stats(self.profile_stats, stats)
+
+        self.timings = {}
+        for (genome_id, genome), fitness, runtime in zip(genomes, fitnesses.mean(axis=1), runtimes):
+            genome.fitness = float(fitness)
+            self.timings[genome_id] = runtime
+
+        self.generation += 1
+        return fitnesses.mean(axis=1)
+
+    def write_profile(self, path):
+        """ Writes the statistics of the timed phases of the last evaluation to the given json file."""
+        with open(path, 'w') as handle:
+            json.dump({'generation': self.generation - 1, 'phases': self.profile_stats}, handle, indent=2)
+
+    def close(self):
+        """ Stops the worker processes and frees the shared scenarios."""
+        if self.pool is not None:
+            self.pool.close()
+            self.pool.join()
+            self.pool = None
+        if self.shared_storage is not None:
+            self.shared_storage.close()
+            self.shared_storage = None
+
+    def __del__(self):
+        if self.pool is not None:
+            self.pool.terminate()
+        if self.shared_storage is not None:
+            self.shared_storage.close()
+
+    def __serial_worker(self, config):
+        if self.worker is None or self.worker.config is not config:
+            self.worker = EvaluationWorker(self.env_factory, self.eval_function, config, self.profile)
+
+        return self.worker
+
+    def __pool(self, config):
+        """ Returns the pool of workers, which is restarted when the config changes."""
+        if self.pool is None or self.config is not config:
+            self.close()
+            self.config = config
+            if self.shared_scenarios:
+                self.shared_storage = MultiRobotEnv.share_static_storage(self.shared_scenarios)
+
+            shared_handles = None if self.shared_storage is None else self.shared_storage.handles
+            self.pool = multiprocessing.Pool(self.num_workers, initializer=_init_worker,
+                                             initargs=(self.env_factory, self.eval_function, config, self.profile,
+                                                       shared_handles))
+
+        return self.pool
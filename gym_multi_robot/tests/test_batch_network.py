@@ -0,0 +1,63 @@
+import os
+import random
+import unittest
+
+import numpy as np
+
+from gym_multi_robot.batch_network import BatchNetwork
+
+try:
+    import neat
+except ImportError:
+    neat = None
+
+CONFIG_PATH = os.path.join(os.path.dirname(__file__), '..', '..', 'experiments', 'tiling_pattern_neat',
+                           'config-feedforward')
+
+
+@unittest.skipIf(neat is None, "neat is not installed")
+class TestBatchNetwork(unittest.TestCase):
+
+    def setUp(self):
+        random.seed(0)      # neat mutates genomes using the random module.
+        self.config = neat.Config(neat.DefaultGenome, neat.DefaultReproduction, neat.DefaultSpeciesSet,
+                                  neat.DefaultStagnation, CONFIG_PATH)
+
+    def create_genomes(self, num_genomes, num_mutations):
+        genomes = []
+        for key in range(num_genomes):
+            genome = neat.DefaultGenome(key)
+            genome.configure_new(self.config.genome_config)
+            for _ in range(num_mutations):
+                genome.mutate(self.config.genome_config)
+            genomes.append(genome)
+
+        return genomes
+
+    def assert_same_as_network(self, genomes):
+        inputs = np.random.RandomState(0).randint(0, 2, size=(3, 5, 17)).astype(np.int8)
+
+        for genome in genomes:
+            network = neat.nn.FeedForwardNetwork.create(genome, self.config)
+            expected = [[network.activate(robot_inputs.tolist()) for robot_inputs in world] for world in inputs]
+
+            outputs = BatchNetwork.create(genome, self.config).activate(inputs)
+            self.assertEqual((3, 5, 4), outputs.shape)
+            self.assertTrue(np.allclose(expected, outputs))
+
+    def test_same_as_network(self):
+        self.assert_same_as_network(self.create_genomes(10, 20))
+
+    def test_other_functions_same_as_network(self):
+        genome_config = self.config.genome_config
+        genome_config.activation_options = ['sigmoid', 'tanh', 'relu', 'gauss', 'inv', 'hat', 'identity']
+        genome_config.activation_mutate_rate = 0.5
+        genome_config.aggregation_options = ['sum', 'mean', 'product', 'max', 'maxabs', 'median']
+        genome_config.aggregation_mutate_rate = 0.5
+
+        self.assert_same_as_network(self.create_genomes(10, 20))
+
+    def test_wrong_number_of_inputs(self):
+        network = BatchNetwork.create(self.create_genomes(1, 0)[0], self.config)
+        with self.assertRaises(RuntimeError):
+            network.activate(np.zeros((5, 16)))
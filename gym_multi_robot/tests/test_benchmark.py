@@ -0,0 +1,67 @@
+import json
+import os
+import tempfile
+import unittest
+
+from gym_multi_robot.benchmark import (Case, compare, default_cases, main, registered_env_ids, run_benchmark,
+                                       sweep_cases)
+
+
+class TestBenchmark(unittest.TestCase):
+
+    def test_registered_env_ids(self):
+        env_ids = registered_env_ids()
+
+        self.assertEqual('tiling-pattern-v0', env_ids[0])
+        self.assertEqual('foraging50x50-v0', env_ids[-1])
+        self.assertEqual(env_ids, [case.env_id for case in default_cases()[:len(env_ids)]])
+
+    def test_sweep_cases(self):
+        names = [case.name for case in sweep_cases(grid_sizes=((7, 5), (9, 9)), robot_counts=(1, 5),
+                                                   robot_grid_size=(9, 9))]
+
+        self.assertEqual(['tiling-7x5-r5', 'tiling-9x9-r5', 'tiling-9x9-r1',
+                          'foraging-7x5-r5', 'foraging-9x9-r5', 'foraging-9x9-r1'], names)
+
+    def test_run_benchmark(self):
+        cases = [Case('tiling', 'tiling-pattern-v0', {'num_robots': 3}),
+                 Case('foraging', 'foraging11x11-static-v0', {})]
+        results = run_benchmark(cases, isolate=False, num_steps=20, num_resets=2, num_fitness=2, repeats=1)
+
+        self.assertEqual([('tiling', 'random'), ('tiling', 'fixed'), ('foraging', 'random'), ('foraging', 'fixed')],
+                         [(result['case'], result['controller']) for result in results])
+        self.assertEqual(3, results[0]['num_robots'])
+        self.assertEqual([11, 11], results[2]['grid_size'])
+        for result in results:
+            self.assertGreater(result['steps_per_sec'], 0)
+            self.assertGreater(result['resets_per_sec'], 0)
+            self.assertGreater(result['fitness_seconds'], 0)
+            self.assertGreater(result['peak_rss_kb'], 0)
+
+    def test_compare(self):
+        baseline = [{'case': 'a', 'controller': 'fixed', 'steps_per_sec': 100.0, 'resets_per_sec': 10.0,
+                     'fitness_seconds': 1.0, 'peak_rss_kb': 1000}]
+        results = [dict(baseline[0], steps_per_sec=70.0, resets_per_sec=9.0, fitness_seconds=1.5),
+                   dict(baseline[0], case='b', steps_per_sec=1.0)]
+
+        self.assertEqual([('a', 'fixed', 'steps_per_sec', 100.0, 70.0), ('a', 'fixed', 'fitness_seconds', 1.0, 1.5)],
+                         compare(results, baseline, tolerance=0.2))
+        self.assertEqual([], compare(results, baseline, tolerance=0.6))
+
+    def test_main(self):
+        with tempfile.TemporaryDirectory() as directory:
+            output, baseline = os.path.join(directory, 'results.json'), os.path.join(directory, 'baseline.json')
+            args = ['--output', output, '--baseline', baseline, '--cases', 'tiling-pattern-v0', '--controllers',
+                    'fixed', '--steps', '10', '--resets', '2', '--fitness-calls', '2', '--repeats', '1',
+                    '--no-isolate']
+
+            self.assertEqual(0, main(args + ['--save-baseline']))
+            with open(baseline) as handle:
+                saved = json.load(handle)
+            self.assertEqual(10, saved['settings']['steps'])
+            self.assertEqual(['tiling-pattern-v0'], [result['case'] for result in saved['results']])
+
+            saved['results'][0]['steps_per_sec'] *= 1000
+            with open(baseline, 'w') as handle:
+                json.dump(saved, handle)
+            self.assertEqual(1, main(args))
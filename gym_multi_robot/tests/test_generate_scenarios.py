@@ -0,0 +1,64 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from gym_multi_robot.envs.foraging_env import ForagingEnv
+from gym_multi_robot.envs.scenario import Scenario, ScenarioBank
+from gym_multi_robot.envs.tiling_pattern_env import TilingPatternEnv
+from gym_multi_robot.generate_scenarios import generate_bank, generate_scenario, main
+
+
+class TestGenerateScenarios(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def path(self, name):
+        return os.path.join(self.directory.name, name)
+
+    def test_parallel_equals_serial(self):
+        serial = generate_bank(6, Scenario.TILING_PATTERN, (7, 5), 3, seed=4, num_workers=0)
+        parallel = generate_bank(6, Scenario.TILING_PATTERN, (7, 5), 3, seed=4, num_workers=2, chunksize=2)
+
+        self.assertTrue(np.array_equal(serial.grids, parallel.grids))
+        self.assertTrue(np.array_equal(serial.robots, parallel.robots))
+        self.assertEqual(list(range(4, 10)), parallel.seeds)
+        self.assertEqual((6, 7, 5), serial.grids.shape)
+        self.assertEqual((6, 3, 3), serial.robots.shape)
+        self.assertTrue(all(serial.grids.reshape((6, -1)).sum(axis=1) == 12))
+
+        scenario = generate_scenario(7, Scenario.TILING_PATTERN, (7, 5), 3)
+        self.assertTrue(np.array_equal(scenario.grid, serial.grids[3]))
+        self.assertFalse(np.array_equal(serial.grids[0], serial.grids[1]))
+
+    def test_env_selects_scenario(self):
+        path = self.path('bank.json')
+        main([path, '--game', 'foraging', '--count', '5', '--size', '9', '9', '--tiles', '10', '--robots', '4',
+              '--target-area', '0', '0', '2', '2', '--seed', '3', '--workers', '0'])
+
+        bank = ScenarioBank.load(path)
+        self.assertIsInstance(bank.grids, np.memmap)
+        self.assertEqual(5, len(bank))
+
+        for index in (0, 4):
+            env = ForagingEnv(env_storage_path=path, scenario_index=index)
+            env.reset()
+            self.assertTrue(np.array_equal(bank.grids[index], env.game.grid))
+            self.assertEqual(Scenario.robot_positions(bank.robots[index]),
+                             [(robot.location, robot.heading) for robot in env.game.robots])
+            self.assertEqual((0, 0, 2, 2), env.game.target_area)
+            self.assertEqual(10, env.game.num_tiles)
+
+        with self.assertRaises(ValueError):
+            ForagingEnv(env_storage_path=path)
+        with self.assertRaises(ValueError):
+            TilingPatternEnv(env_storage_path='tiles7x5.json', scenario_index=0)
+
+
+if __name__ == '__main__':
+    unittest.main()
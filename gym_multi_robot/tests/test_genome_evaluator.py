@@ -0,0 +1,76 @@
+import functools
+import json
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from gym_multi_robot.envs.scenario import Scenario
+from gym_multi_robot.envs.tiling_pattern_env import TilingPatternEnv
+from gym_multi_robot.generate_scenarios import generate_bank
+from gym_multi_robot.genome_evaluator import GenomeEvaluator
+
+
+class LinearGenome:
+    """ A genome that maps observations linearly to actions."""
+
+    def __init__(self, seed):
+        self.weights = np.random.RandomState(seed).uniform(-1, 1, size=(17, 4))
+        self.fitness = None
+
+
+def eval_linear_genome(genome, config, env):
+    observations = env.reset()
+    for _ in range(30):
+        observations, _, _, _ = env.step(np.asarray(observations) @ genome.weights)
+
+    return env.get_fitness()
+
+
+class TestGenomeEvaluator(unittest.TestCase):
+
+    def setUp(self):
+        self.env_factory = functools.partial(TilingPatternEnv, x_dim=7, y_dim=5, num_robots=5)
+
+    def evaluate(self, **kwargs):
+        genomes = [(genome_id, LinearGenome(genome_id)) for genome_id in range(6)]
+        evaluator = GenomeEvaluator(self.env_factory, eval_linear_genome, num_trials=3, **kwargs)
+        fitnesses = evaluator.evaluate(genomes, None)
+        evaluator.close()
+
+        self.assertEqual([genome.fitness for _, genome in genomes], fitnesses.tolist())
+        self.assertEqual(set(evaluator.timings), set(range(6)))
+        return fitnesses
+
+    def test_parallel_same_as_serial(self):
+        serial = self.evaluate(num_workers=0)
+        self.assertEqual(serial.tolist(), self.evaluate(num_workers=2, chunksize=2).tolist())
+        self.assertEqual(serial.tolist(), self.evaluate(num_workers=3, chunksize=1).tolist())
+
+    def test_seed_changes_trials(self):
+        self.assertNotEqual(self.evaluate(num_workers=0, seed=0).tolist(),
+                            self.evaluate(num_workers=0, seed=10).tolist())
+
+    def test_profile(self):
+        genomes = [(genome_id, LinearGenome(genome_id)) for genome_id in range(2)]
+        evaluator = GenomeEvaluator(self.env_factory, eval_linear_genome, num_trials=3, num_workers=0, profile=True)
+        evaluator.evaluate(genomes, None)
+        evaluator.close()
+
+        self.assertEqual(6, evaluator.profile_stats['reset']['count'])
+        self.assertEqual(6 * 30, evaluator.profile_stats['step']['count'])
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'profile.json')
+            evaluator.write_profile(path)
+            with open(path) as handle:
+                self.assertEqual({'generation': 0, 'phases': evaluator.profile_stats}, json.load(handle))
+
+    def test_shared_scenarios(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'bank.json')
+            generate_bank(4, Scenario.TILING_PATTERN, (7, 5), 5, num_workers=0).save(path)
+            self.env_factory = functools.partial(TilingPatternEnv, env_storage_path=path, scenario_index=1)
+
+            serial = self.evaluate(num_workers=0)
+            self.assertEqual(serial.tolist(), self.evaluate(num_workers=2, shared_scenarios=[path]).tolist())
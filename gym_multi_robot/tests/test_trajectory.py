@@ -0,0 +1,100 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from gym_multi_robot.envs.foraging_env import ForagingEnv
+from gym_multi_robot.envs.tiling_pattern_env import TilingPatternEnv
+from gym_multi_robot.trajectory import TrajectoryReader, TrajectoryRecorder
+
+
+class TestTrajectory(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'trajectory.npz')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def record(self, env, num_steps, chunk_size):
+        """ Records two episodes and returns the grids, robot states and actions of all frames."""
+        recorder = TrajectoryRecorder(env, self.path, chunk_size=chunk_size)
+        game = env.unwrapped.game
+        action_random = np.random.RandomState(0)
+
+        frames = []
+        for episode in range(2):
+            recorder.reset(seed=episode)
+            frames.append((game.grid.copy(), game.robots.locations[:len(game.robots)].copy(), None))
+            for _ in range(num_steps):
+                actions = action_random.uniform(-1, 2, size=(len(game.robots), 4)).astype(np.float32)
+                recorder.step(actions)
+                frames.append((game.grid.copy(), game.robots.locations[:len(game.robots)].copy(), actions))
+        recorder.close()
+
+        return frames
+
+    def test_seek(self):
+        for env in (TilingPatternEnv(x_dim=9, y_dim=7, num_robots=6),
+                    ForagingEnv(x_dim=12, y_dim=12, num_tiles=30, target_area=(0, 0, 3, 3), num_robots=6)):
+            frames = self.record(env, 60, 16)
+
+            with TrajectoryReader(self.path) as reader:
+                self.assertEqual(len(frames), len(reader))
+                for t in (100, 0, 17, 15, 16, 61, 60, 121, 33):
+                    frame = reader.frame(t)
+                    grid, locations, actions = frames[t]
+                    self.assertTrue(np.array_equal(grid, frame.grid))
+                    self.assertTrue(np.array_equal(locations, frame.locations))
+                    self.assertEqual(actions is None, frame.reset)
+                    if actions is not None:
+                        self.assertTrue(np.array_equal(actions, frame.actions))
+
+                self.assertEqual((len(frames), 6, 2), reader.column('locations').shape)
+                self.assertEqual([0, 61], np.flatnonzero(reader.column('resets')).tolist())
+                self.assertTrue(reader.column('delta_changes').all())
+
+                with self.assertRaises(IndexError):
+                    reader.frame(len(frames))
+
+    def test_sequential_steps(self):
+        env = TilingPatternEnv(x_dim=9, y_dim=7, num_robots=6)
+        env.game.batched = False
+        frames = self.record(env, 40, 16)
+
+        with TrajectoryReader(self.path) as reader:
+            for t, (grid, locations, _) in enumerate(frames):
+                self.assertTrue(np.array_equal(grid, reader.frame(t).grid))
+                self.assertTrue(np.array_equal(locations, reader.frame(t).locations))
+
+    def test_reset_records_direct_writes(self):
+        env = ForagingEnv(x_dim=8, y_dim=8, num_tiles=10, num_robots=2)
+        recorder = TrajectoryRecorder(env, self.path, chunk_size=8)
+        recorder.reset(seed=0)
+        recorder.step(np.ones((2, 4)))
+        env.game.grid[3, 3] = 1 - env.game.grid[3, 3]
+        env.game.grid[5, 2] = 1 - env.game.grid[5, 2]
+        recorder.step(np.ones((2, 4)))
+        recorder.reset(seed=0)
+        grid = env.game.grid.copy()
+        recorder.close()
+
+        self.assertFalse(env.game.tracks_tiles)
+        self.assertEqual([], env.game.tile_listeners)
+        with TrajectoryReader(self.path) as reader:
+            self.assertTrue(np.array_equal(grid, reader.frame(3).grid))
+
+    def test_robot_count_fixed(self):
+        recorder = TrajectoryRecorder(TilingPatternEnv(num_robots=3), self.path)
+        recorder.reset()
+        recorder.unwrapped.game.robots.pop()
+
+        with self.assertRaises(ValueError):
+            recorder.step(np.zeros((2, 4)))
+        recorder.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+import os
+import tempfile
+import unittest
+import zlib
+
+import numpy as np
+
+from gym_multi_robot.envs.foraging_env import ForagingEnv
+from gym_multi_robot.envs.tiling_pattern_env import TilingPatternEnv
+from gym_multi_robot.envs.tiling_pattern_view_2d import TilingPatternView2D
+from gym_multi_robot.trajectory import TrajectoryReader, TrajectoryRecorder
+from gym_multi_robot.video_export import FrameGame, encode_png, export_trajectory, render_frames
+
+
+def decode_png(data):
+    """ Decodes the rgb pngs written by encode_png."""
+    width, height = int.from_bytes(data[16:20], 'big'), int.from_bytes(data[20:24], 'big')
+    rows = np.frombuffer(zlib.decompress(data[41:-12]), dtype=np.uint8).reshape((height, width * 3 + 1))
+    return rows[:, 1:].reshape((height, width, 3))
+
+
+class TestVideoExport(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.trajectory_path = os.path.join(self.directory.name, 'trajectory.npz')
+        self.images = self.record(TilingPatternEnv(x_dim=7, y_dim=5, num_robots=4, seed=0), self.trajectory_path, 20)
+
+    @staticmethod
+    def record(env, path, num_steps):
+        """ Records an episode of the environment and returns the images rendered by its view."""
+        env = TrajectoryRecorder(env, path, chunk_size=8)
+        env.reset()
+        action_random = np.random.RandomState(0)
+        images = [env.render('rgb_array').copy()]
+        for _ in range(num_steps):
+            env.step(action_random.uniform(-1, 2, size=(len(env.game.robots), 4)))
+            images.append(env.render('rgb_array').copy())
+        env.close()
+
+        return images
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_encode_png(self):
+        image = np.random.RandomState(0).randint(0, 256, size=(5, 7, 3)).astype(np.uint8)
+        self.assertTrue(np.array_equal(image, decode_png(encode_png(image))))
+
+    def test_frames_match_view(self):
+        frames = [20, 3, 8, 0]
+        serial = list(render_frames(self.trajectory_path, frames, encoding='raw', num_workers=0))
+        parallel = list(render_frames(self.trajectory_path, frames, encoding='raw', num_workers=2, batch_size=1,
+                                      queue_size=2))
+
+        self.assertEqual(serial, parallel)
+        for t, data in zip(frames, parallel):
+            self.assertEqual(self.images[t].tobytes(), data)
+
+    def test_export_image_sequence(self):
+        output = os.path.join(self.directory.name, 'frames')
+        self.assertEqual(11, export_trajectory(self.trajectory_path, output, frames=range(0, 21, 2), num_workers=2,
+                                               batch_size=3, queue_size=1))
+
+        self.assertEqual(['frame_%06d.png' % i for i in range(11)], sorted(os.listdir(output)))
+        with open(os.path.join(output, 'frame_000005.png'), 'rb') as handle:
+            self.assertTrue(np.array_equal(self.images[10], decode_png(handle.read())))
+
+    def test_frame_game(self):
+        with TrajectoryReader(self.trajectory_path) as reader:
+            game = FrameGame(reader.grid_shape, reader.num_robots, reader.header)
+            game.load(reader.frame(7))
+
+        self.assertTrue(np.array_equal(self.images[7], TilingPatternView2D(game).update('rgb_array')))
+
+    def test_foraging_view(self):
+        path = os.path.join(self.directory.name, 'foraging.npz')
+        env = ForagingEnv(x_dim=6, y_dim=6, num_tiles=12, target_area=(0, 0, 3, 3), num_robots=8, seed=1)
+        images = self.record(env, path, 60)
+        self.assertGreater(env.game.collected, 0)
+
+        with TrajectoryReader(path) as reader:
+            self.assertEqual('gym_multi_robot.envs.foraging_game:ForagingGame', reader.header['game'])
+            self.assertEqual([0, 0, 3, 3], reader.header['view_parameters']['target_area'])
+
+        frames = list(render_frames(path, range(len(images)), encoding='raw', num_workers=0))
+        self.assertEqual([image.tobytes() for image in images], frames)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,268 @@
+import collections
+import io
+import json
+import zipfile
+
+import gym
+import numpy as np
+
+# The state of the game at a frame of a trajectory, reset tells whether the frame was recorded after a reset
+# (without actions) or after a step. The counters are the values of the view_counters of the game.
+Frame = collections.namedtuple('Frame', ['grid', 'locations', 'headings', 'holds', 'actions', 'reset', 'counters'])
+
+# The columns stored for every frame.
+COLUMNS = ('locations', 'headings', 'holds', 'actions', 'resets', 'counters')
+
+# The columns that store the tile changes of a chunk.
+DELTA_COLUMNS = ('delta_frames', 'delta_cells', 'delta_changes')
+
+# The columns that are stored without compression, as the actions of most controllers hardly compress.
+STORED_COLUMNS = ('actions',)
+
+# The deflate level of the other columns, higher levels take about four times longer for a few percent smaller files.
+COMPRESS_LEVEL = 1
+
+
+class TrajectoryWriter:
+    """ This class writes the frames of a game to a compressed .npz file in chunks of chunk_size frames.
+    The frames of a chunk are collected in preallocated columns: the robot locations, headings and hold flags,
+    the actions and whether the frame followed a reset. The grid of the first frame of every chunk is stored as key
+    frame, after that only the changes of the tiles are stored (as frame, cell and change), so any frame can be
+    rebuilt from its chunk alone.
+    The header names the game and its view, with the view_parameters of the game, so the trajectory can be rendered
+    without the game. The view_counters of the game are stored for every frame.
+    The changes made by the steps are taken from the tile changes the game reports (see add_tile_listener) and kept
+    as reported until the chunk is written, so recording a step costs little more than copying the robots, about 7%
+    of a batched step of 20 robots. Frames after a reset are compared to the grid of the previous frame as a whole,
+    tiles written directly into the grid between resets are not recorded.
+    """
+
+    def __init__(self, path, num_robots, grid_shape, chunk_size=1024):
+        self.path = path
+        self.num_robots = num_robots
+        self.grid_shape = tuple(grid_shape)
+        self.chunk_size = chunk_size
+        self.num_chunks = 0
+        self.num_frames = 0
+        self.size = 0           # The number of frames in the current chunk.
+        self.game = None        # The game of which the tile changes are followed.
+        self.header = None      # The game type and view of the trajectory, set by the first frame.
+        self.deltas = []        # The (frame, x, y, changes) reported since the deltas were last collected.
+
+        self.locations = np.zeros((chunk_size, num_robots, 2), dtype=np.int16)
+        self.headings = np.zeros((chunk_size, num_robots), dtype=np.int8)
+        self.holds = np.zeros((chunk_size, num_robots), dtype=np.bool_)
+        self.actions = np.zeros((chunk_size, num_robots, 4), dtype=np.float32)
+        self.resets = np.zeros(chunk_size, dtype=np.bool_)
+        self.counters = None
+
+        self.key_frame = np.zeros(self.grid_shape, dtype=np.uint8)
+        self.delta_frames = np.zeros(0, dtype=np.int32)
+        self.delta_cells = np.zeros(0, dtype=np.int32)
+        self.delta_changes = np.zeros(0, dtype=np.int8)
+
+        self.file = zipfile.ZipFile(path, 'w', compression=zipfile.ZIP_DEFLATED)
+
+    def tiles_changed(self, x, y, changes):
+        """ Keeps the tile changes reported by the game for the frame that is added next."""
+        self.deltas.append((self.size, x, y, changes))
+
+    def add(self, game, actions=None):
+        """ Adds the current state of the game as frame, reached by the given actions or by a reset if None.
+        The writer follows the tile changes of the game of the first frame, which cannot change."""
+        i = self.size
+        robots = game.robots
+        if len(robots) != self.num_robots or game.grid.shape != self.grid_shape:
+            raise ValueError("The number of robots and grid size of the game cannot change during a recording.")
+        if self.game is None:
+            self.game = game
+            game.add_tile_listener(self.tiles_changed)
+            self.header = {'game': '%s:%s' % (type(game).__module__, type(game).__qualname__),
+                           'view_entry_point': game.view_entry_point,
+                           'view_parameters': {name: getattr(game, name) for name in game.view_parameters},
+                           'view_counters': list(game.view_counters)}
+            self.counters = np.zeros((self.chunk_size, len(game.view_counters)), dtype=np.int64)
+        elif game is not self.game:
+            raise ValueError("A trajectory records a single game.")
+
+        self.locations[i] = robots.locations[:self.num_robots]
+        self.headings[i] = robots.headings[:self.num_robots]
+        self.holds[i] = robots.holds[:self.num_robots]
+        if actions is None:
+            self.actions[i] = 0
+        else:
+            self.actions[i] = actions
+        self.resets[i] = actions is None
+        for j, name in enumerate(game.view_counters):
+            self.counters[i, j] = getattr(game, name)
+
+        if i == 0:
+            self.deltas.clear()
+            self.key_frame[...] = game.grid
+        elif actions is None:
+            previous_grid = self.grid()
+            x, y = np.nonzero(game.grid != previous_grid)
+            self.deltas.append((i, x, y, np.asarray(game.grid[x, y], dtype=int) - previous_grid[x, y]))
+
+        self.size += 1
+        self.num_frames += 1
+        if self.size == self.chunk_size:
+            self.flush()
+
+    def __collect_deltas(self):
+        """ Appends the tile changes reported since the last collection to the delta columns. The changes are only
+        collected when a whole grid is needed, so a step merely keeps the arrays reported by the game."""
+        if not self.deltas:
+            return
+
+        frames, x, y, changes = zip(*self.deltas)
+        frames = np.repeat(frames, [getattr(values, 'size', 1) for values in x])
+        x, y, changes = (np.concatenate(column, axis=None) for column in (x, y, changes))
+
+        # The steps report the locations of all robots, most of which did not change.
+        changed = changes != 0
+        cells = np.multiply(x, self.grid_shape[1]) + y
+        for name, values in zip(DELTA_COLUMNS, (frames, cells, changes)):
+            column = getattr(self, name)
+            setattr(self, name, np.concatenate((column, values[changed].astype(column.dtype))))
+        self.deltas.clear()
+
+    def grid(self):
+        """ Returns the grid of the last frame, rebuilt from the key frame and the tile changes of the chunk."""
+        self.__collect_deltas()
+        grid = self.key_frame.astype(int)
+        np.add.at(grid.reshape(-1), self.delta_cells, self.delta_changes)
+        return grid
+
+    def flush(self):
+        """ Writes the frames of the current chunk to the file."""
+        if self.size == 0:
+            return
+
+        self.__collect_deltas()
+        arrays = {name: getattr(self, name)[:self.size] for name in COLUMNS}
+        arrays.update((name, getattr(self, name)) for name in DELTA_COLUMNS)
+        arrays['key_frame'] = self.key_frame
+        for name, array in arrays.items():
+            self.__write('chunk%06d/%s' % (self.num_chunks, name), array, name not in STORED_COLUMNS)
+
+        self.num_chunks += 1
+        self.size = 0
+        for name in DELTA_COLUMNS:
+            setattr(self, name, getattr(self, name)[:0])
+
+    def close(self):
+        """ Writes the remaining frames and the sizes of the trajectory and closes the file."""
+        if self.file is None:
+            return
+
+        self.flush()
+        if self.game is not None:
+            self.game.remove_tile_listener(self.tiles_changed)
+            self.game = None
+        self.__write('meta', np.array([self.chunk_size, self.num_frames, self.num_robots] + list(self.grid_shape)))
+        self.__write('header', np.array([json.dumps(self.header)]))
+        self.file.close()
+        self.file = None
+
+    def __write(self, name, array, compress=True):
+        buffer = io.BytesIO()
+        np.lib.format.write_array(buffer, np.ascontiguousarray(array), allow_pickle=False)
+        info = zipfile.ZipInfo(name + '.npy', date_time=(1980, 1, 1, 0, 0, 0))
+        self.file.writestr(info, buffer.getbuffer(), zipfile.ZIP_DEFLATED if compress else zipfile.ZIP_STORED,
+                           COMPRESS_LEVEL)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+class TrajectoryReader:
+    """ This class reads the frames of a trajectory written by a TrajectoryWriter.
+    Only the chunk of a requested frame is read and decompressed, the last read chunk is kept.
+    The header written by the writer (the game type and its view) is read as dictionary.
+    """
+
+    def __init__(self, path):
+        self.file = np.load(path)
+        self.chunk_size, self.num_frames, self.num_robots, width, height = self.file['meta'].tolist()
+        self.grid_shape = (width, height)
+        self.header = json.loads(self.file['header'][0])
+        self.__chunk = None     # The index and columns of the last read chunk.
+
+    def __len__(self):
+        return self.num_frames
+
+    def chunk(self, index):
+        """ Returns the columns of the chunk with the given index as dictionary."""
+        if self.__chunk is None or self.__chunk[0] != index:
+            names = COLUMNS + DELTA_COLUMNS + ('key_frame',)
+            self.__chunk = index, {name: self.file['chunk%06d/%s' % (index, name)] for name in names}
+
+        return self.__chunk[1]
+
+    def frame(self, t):
+        """ Returns frame t, of which the grid is rebuilt from the key frame and the tile changes of its chunk."""
+        if not 0 <= t < self.num_frames:
+            raise IndexError("Frame %d is not in the trajectory of %d frames." % (t, self.num_frames))
+
+        columns = self.chunk(t // self.chunk_size)
+        i = t % self.chunk_size
+
+        num_deltas = np.searchsorted(columns['delta_frames'], i, side='right')
+        grid = columns['key_frame'].astype(int)
+        np.add.at(grid.reshape(-1), columns['delta_cells'][:num_deltas], columns['delta_changes'][:num_deltas])
+
+        return Frame(grid, columns['locations'][i], columns['headings'][i], columns['holds'][i], columns['actions'][i],
+                     bool(columns['resets'][i]), columns['counters'][i])
+
+    def column(self, name):
+        """ Returns a column of all frames, for example the locations as (num_frames, num_robots, 2) array."""
+        num_chunks = -(-self.num_frames // self.chunk_size)
+        return np.concatenate([self.file['chunk%06d/%s' % (index, name)] for index in range(num_chunks)])
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+class TrajectoryRecorder(gym.Wrapper):
+    """ This wrapper records every reset and step of a multi robot environment (not a vector env) to a trajectory
+    file, which can be read with TrajectoryReader. The file is complete once the recorder is closed.
+    """
+
+    def __init__(self, env, path, chunk_size=1024):
+        super().__init__(env)
+        self.path = path
+        self.chunk_size = chunk_size
+        self.writer = None
+
+    def reset(self, **kwargs):
+        observations = self.env.reset(**kwargs)
+
+        game = self.env.unwrapped.game
+        if self.writer is None:
+            self.writer = TrajectoryWriter(self.path, len(game.robots), game.grid.shape, self.chunk_size)
+        self.writer.add(game)
+
+        return observations
+
+    def step(self, actions):
+        if self.writer is None:
+            raise RuntimeError("The environment should be reset before it is stepped.")
+
+        result = self.env.step(actions)
+        self.writer.add(self.env.unwrapped.game, actions)
+        return result
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+        super().close()
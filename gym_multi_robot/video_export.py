@@ -0,0 +1,244 @@
+import argparse
+import collections
+import multiprocessing
+import os
+import shutil
+import struct
+import subprocess
+import tempfile
+import zlib
+
+import numpy as np
+
+from gym_multi_robot.envs.grid_view_2d import create_view
+from gym_multi_robot.trajectory import TrajectoryReader, TrajectoryRecorder
+
+# The extensions of the output files that are encoded as video with ffmpeg, other outputs are image sequences.
+VIDEO_EXTENSIONS = ('.mp4', '.avi', '.mkv', '.mov', '.webm', '.gif')
+
+# The renderer of the current process, created by the pool initializer.
+_renderer = None
+
+
+def encode_png(frame, level=6):
+    """ Returns the (height, width, 3) uint8 frame encoded as png."""
+    height, width, _ = frame.shape
+    rows = np.zeros((height, width * 3 + 1), dtype=np.uint8)    # Every row starts with filter type 0.
+    rows[:, 1:] = frame.reshape((height, -1))
+
+    def chunk(chunk_type, data):
+        return struct.pack('>I', len(data)) + chunk_type + data + struct.pack('>I', zlib.crc32(chunk_type + data))
+
+    return b'\x89PNG\r\n\x1a\n' + chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0)) \
+        + chunk(b'IDAT', zlib.compress(rows.tobytes(), level)) + chunk(b'IEND', b'')
+
+
+class FrameRobots:
+    """ This class holds the robot arrays of a frame in the form the views read them from a robot list."""
+
+    def __init__(self, num_robots):
+        self.locations = np.zeros((num_robots, 2), dtype=int)
+        self.headings = np.zeros(num_robots, dtype=int)
+        self.holds = np.zeros(num_robots, dtype=bool)
+
+    def __len__(self):
+        return len(self.headings)
+
+
+class FrameGame:
+    """ This class holds a frame of a trajectory, which can be drawn by the views like a game.
+    The view and the attributes it reads besides the grid and the robots are taken from the trajectory header."""
+
+    def __init__(self, grid_shape, num_robots, header):
+        self.grid = np.zeros(grid_shape, dtype=int)
+        self.robots = FrameRobots(num_robots)
+        self.view_entry_point = header['view_entry_point']
+        self.view_counters = header['view_counters']
+        for name, value in header['view_parameters'].items():
+            setattr(self, name, value)
+        for name in self.view_counters:
+            setattr(self, name, 0)
+
+    def load(self, frame):
+        self.grid[...] = frame.grid
+        self.robots.locations[...] = frame.locations
+        self.robots.headings[...] = frame.headings
+        self.robots.holds[...] = frame.holds
+        for name, value in zip(self.view_counters, frame.counters):
+            setattr(self, name, int(value))
+
+    @property
+    def GRID_W(self):
+        return self.grid.shape[0]
+
+    @property
+    def GRID_H(self):
+        return self.grid.shape[1]
+
+
+class FrameRenderer:
+    """ This class renders frames of a trajectory file, encoded as png or as raw rgb bytes."""
+
+    def __init__(self, trajectory_path, screen_size=(600, 600), encoding='png'):
+        self.reader = TrajectoryReader(trajectory_path)
+        self.game = FrameGame(self.reader.grid_shape, self.reader.num_robots, self.reader.header)
+        self.view = create_view(self.game, screen_size=screen_size)
+        self.encoding = encoding
+
+    def render(self, frames):
+        """ Returns the encoded frames of the given frame numbers."""
+        encoded = []
+        for t in frames:
+            self.game.load(self.reader.frame(t))
+            image = self.view.update('rgb_array')
+            encoded.append(encode_png(image) if self.encoding == 'png' else image.tobytes())
+
+        return encoded
+
+
+def _init_renderer(trajectory_path, screen_size, encoding):
+    global _renderer
+    _renderer = FrameRenderer(trajectory_path, screen_size, encoding)
+
+
+def _render(frames):
+    return _renderer.render(frames)
+
+
+def render_frames(trajectory_path, frames, screen_size=(600, 600), encoding='png', num_workers=None, batch_size=8,
+                  queue_size=16):
+    """ Yields the encoded frames with the given frame numbers in order.
+    The frames are rendered in batches of batch_size frames by a pool of num_workers processes (all cpus by default,
+    serial with 0 workers). At most queue_size batches are rendered ahead of the consumer, which bounds the memory."""
+    batches = [frames[i:i + batch_size] for i in range(0, len(frames), batch_size)]
+
+    if num_workers == 0:
+        renderer = FrameRenderer(trajectory_path, screen_size, encoding)
+        for batch in batches:
+            yield from renderer.render(batch)
+        return
+
+    with multiprocessing.Pool(num_workers, initializer=_init_renderer,
+                              initargs=(trajectory_path, screen_size, encoding)) as pool:
+        pending = collections.deque()
+        for batch in batches:
+            if len(pending) == queue_size:
+                yield from pending.popleft().get()
+            pending.append(pool.apply_async(_render, (batch,)))
+
+        while pending:
+            yield from pending.popleft().get()
+
+
+def frame_size(trajectory_path, screen_size=(600, 600)):
+    """ Returns the (width, height) in pixels of the frames of the given trajectory."""
+    with TrajectoryReader(trajectory_path) as reader:
+        game = FrameGame(reader.grid_shape, reader.num_robots, reader.header)
+        game.load(reader.frame(0))
+
+    image = create_view(game, screen_size=screen_size).update('rgb_array')
+    return image.shape[1], image.shape[0]
+
+
+def export_trajectory(trajectory_path, output, fps=10, frames=None, screen_size=(600, 600), num_workers=None,
+                      batch_size=8, queue_size=16):
+    """ Renders the given frames (all by default) of a trajectory to an image sequence or a video.
+    Outputs ending with a video extension are encoded by ffmpeg, which reads the raw frames from a pipe, other
+    outputs are directories to which the frames are written as frame_000000.png, ... Returns the number of frames."""
+    if frames is None:
+        with TrajectoryReader(trajectory_path) as reader:
+            frames = range(len(reader))
+    frames = list(frames)
+
+    if not output.lower().endswith(VIDEO_EXTENSIONS):
+        os.makedirs(output, exist_ok=True)
+        for i, data in enumerate(render_frames(trajectory_path, frames, screen_size, 'png', num_workers, batch_size,
+                                               queue_size)):
+            with open(os.path.join(output, 'frame_%06d.png' % i), 'wb') as handle:
+                handle.write(data)
+        return len(frames)
+
+    if shutil.which('ffmpeg') is None:
+        raise RuntimeError("ffmpeg is required to export %s, export to a directory for an image sequence." % output)
+
+    # Most video codecs need yuv420p frames with an even width and height.
+    width, height = frame_size(trajectory_path, screen_size)
+    encoding = ['-pix_fmt', 'yuv420p', '-vf', 'pad=ceil(iw/2)*2:ceil(ih/2)*2']
+    if output.lower().endswith('.gif'):
+        encoding = []
+    command = ['ffmpeg', '-loglevel', 'error', '-y', '-f', 'rawvideo', '-pix_fmt', 'rgb24',
+               '-s', '%dx%d' % (width, height), '-r', str(fps), '-i', '-'] + encoding + [output]
+
+    with subprocess.Popen(command, stdin=subprocess.PIPE) as process:
+        for data in render_frames(trajectory_path, frames, screen_size, 'raw', num_workers, batch_size, queue_size):
+            process.stdin.write(data)
+        process.stdin.close()
+        if process.wait() != 0:
+            raise RuntimeError("ffmpeg failed to encode %s." % output)
+
+    return len(frames)
+
+
+def record_genome(genome_path, config_path, env_id, trajectory_path, num_steps=3000, seed=0):
+    """ Records an episode of the environment with the given id controlled by a genome saved with
+    ObjectSerializer.serialize (the path may include the .pickle extension)."""
+    import gym
+    import neat
+    import gym_multi_robot  # noqa: F401, registers the environments.
+    from gym_multi_robot.batch_network import BatchNetwork
+    from gym_multi_robot.object_serializer import ObjectSerializer
+
+    config = neat.Config(neat.DefaultGenome, neat.DefaultReproduction, neat.DefaultSpeciesSet,
+                         neat.DefaultStagnation, config_path)
+    genome = ObjectSerializer.load(genome_path[:-len('.pickle')] if genome_path.endswith('.pickle') else genome_path)
+    net = BatchNetwork.create(genome, config)
+
+    env = TrajectoryRecorder(gym.make(env_id, disable_env_checker=True).unwrapped, trajectory_path)
+    observations = env.reset(seed=seed)
+    for _ in range(num_steps):
+        observations, _, _, _ = env.step(net.activate(observations))
+    fitness = env.get_fitness()
+    env.close()
+
+    return fitness
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description="Exports a recorded trajectory, or an episode of a saved genome, as "
+                                                 "video (%s, with ffmpeg) or as png image sequence (a directory)."
+                                                 % ', '.join(VIDEO_EXTENSIONS))
+    parser.add_argument('output', help="The video file or the directory of the image sequence.")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--trajectory', help="The trajectory (.npz) written by a TrajectoryRecorder.")
+    source.add_argument('--genome', help="The genome pickle written by ObjectSerializer.serialize.")
+    parser.add_argument('--config', help="The neat config of the genome.")
+    parser.add_argument('--env', default='tiling-pattern11x11-block-v0', help="The environment id to run the genome.")
+    parser.add_argument('--steps', type=int, default=3000, help="The number of steps to run the genome.")
+    parser.add_argument('--seed', type=int, default=0, help="The seed of the episode of the genome.")
+    parser.add_argument('--every', type=int, default=1, help="Export every n-th frame.")
+    parser.add_argument('--fps', type=int, default=10, help="The frame rate of the video.")
+    parser.add_argument('--screen-size', type=int, nargs=2, default=(600, 600), metavar=('W', 'H'))
+    parser.add_argument('--workers', type=int, default=None, help="The number of render processes (0 is serial).")
+    parser.add_argument('--batch-size', type=int, default=8, help="The number of frames per render task.")
+    parser.add_argument('--queue-size', type=int, default=16, help="The number of batches rendered ahead.")
+    args = parser.parse_args(args)
+
+    with tempfile.TemporaryDirectory() as directory:
+        trajectory_path = args.trajectory
+        if args.genome is not None:
+            if args.config is None:
+                parser.error("--config is required with --genome.")
+            trajectory_path = os.path.join(directory, 'trajectory.npz')
+            fitness = record_genome(args.genome, args.config, args.env, trajectory_path, args.steps, args.seed)
+            print("Fitness of the genome: %s" % fitness)
+
+        with TrajectoryReader(trajectory_path) as reader:
+            frames = range(0, len(reader), args.every)
+
+        num_frames = export_trajectory(trajectory_path, args.output, args.fps, frames, tuple(args.screen_size),
+                                       args.workers, args.batch_size, args.queue_size)
+        print("Exported %d frames -> %s" % (num_frames, args.output))
+
+
+if __name__ == '__main__':
+    main()